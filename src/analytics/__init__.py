@@ -1,15 +1,31 @@
 """
 Analytics module for hospital queue simulation
-Includes analyzer, visualizer and collector
+Includes analyzer, visualizer and collectors
+
+Submodules are imported on first attribute access (PEP 562), so headless runs
+never pay for the plotting stack behind SimulationVisualizer.
 """
 
-from .analyzer import SimulationAnalyzer
-from .visualizer import SimulationVisualizer
-from .collector import StatisticsCollector
+import importlib
+
+_EXPORTS = {
+    'SimulationAnalyzer': '.analyzer',
+    'SimulationVisualizer': '.visualizer',
+    'StatisticsCollector': '.collector',
+    'StreamingStatisticsCollector': '.streaming',
+    'ResultExporter': '.exporter'
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-__all__ = [
-    'SimulationAnalyzer',
-    'SimulationVisualizer',
-    'StatisticsCollector'
-]
 
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -1,42 +1,215 @@
 import numpy as np
-from typing import List, Dict
+from typing import List, Dict, Optional
+
+from models.patient_table import PatientTable
+from analytics.timeline import queue_timeline, timeline_averages
 
 
 class SimulationAnalyzer:
-    def __init__(self, patients: List, counters: List, total_simulation_time: float):
-        self.patients = patients
+    def __init__(self, patients: List, counters: List, total_simulation_time: float,
+                 warmup_time: float = 0.0, class_names: Optional[List[str]] = None,
+                 analytic: Optional[Dict] = None, time_averages: Optional[Dict] = None):
+        # A PatientTable is shared with the caller, and copied only once update() appends to it
+        self.patients = PatientTable.from_patients(patients)
+        self._owns_patients = self.patients is not patients
         self.counters = counters
         self.total_simulation_time = total_simulation_time
+        self.warmup_time = warmup_time or 0.0
+        # Triage class names by priority index; per-class metrics are reported when set
+        self.class_names = list(class_names) if class_names else None
+        # Closed-form M/G/c estimate for the same settings (analytics.queueing_theory), if any
+        self.analytic = analytic
+        # Time-weighted queue length, busy counters and number in system integrated by the
+        # engine over the same window; rebuilt from the patient table when not given or
+        # once the patients change
+        self.time_averages = time_averages
+        self._time_averages_version = self.patients.version
 
-        self.waiting_times = [p.waiting_time for p in self.patients if p.waiting_time is not None]
+        # Running totals over the first `_rows` patients, valid while the table version
+        # and warm-up match `_aggregate_key`; the report is derived from them on demand
+        self._aggregate_key = None
+        self._report_key = None
+        self._report = None
+        self._utilization = None
 
-    def get_essential_report(self) -> Dict:
-        total_arrivals = len(self.patients)
+    def _reset_aggregates(self):
+        self._rows = 0
+        self._arrivals = 0
+        self._served = 0
+        self._wait_count = 0
+        self._wait_sum = 0.0
+        self._wait_max = 0.0
+        self._wait_chunks = []
+        self._waiting_times = None
+        self._busy_by_id = np.zeros(max([c.id for c in self.counters], default=0) + 1)
 
-        total_served = len([p for p in self.patients if p.service_end_time is not None])
+        classes = len(self.class_names) if self.class_names else 1
+        self._class_arrivals = np.zeros(classes, dtype=np.int64)
+        self._class_served = np.zeros(classes, dtype=np.int64)
+        self._class_wait_count = np.zeros(classes, dtype=np.int64)
+        self._class_wait_sum = np.zeros(classes)
+        self._class_wait_max = np.zeros(classes)
 
-        total_remaining = total_arrivals - total_served
+    def _fold(self, stop):
+        # Add patients [_rows, stop) to the running totals
+        rows = slice(self._rows, stop)
+        columns = self.patients.columns
 
-        avg_wait = np.mean(self.waiting_times) if self.waiting_times else 0.0
-        max_wait = np.max(self.waiting_times) if self.waiting_times else 0.0
+        # Patients arriving during the warm-up period are excluded from every metric
+        observed = columns['arrival_time'][rows] >= self.warmup_time
+        self._arrivals += int(np.count_nonzero(observed))
+        self._served += int(np.count_nonzero(observed & ~np.isnan(columns['service_end_time'][rows])))
 
-        throughput = total_served / self.total_simulation_time if self.total_simulation_time > 0 else 0.0
+        if self.class_names:
+            self._fold_classes(rows, observed)
 
-        counter_utilization = [
-            counter.calculate_utilization(self.total_simulation_time)
-            for counter in self.counters
-        ]
-        avg_utilization = np.mean(counter_utilization) if counter_utilization else 0.0
+        waiting = columns['waiting_time'][rows][observed]
+        waiting = waiting[~np.isnan(waiting)]
+        if len(waiting):
+            self._wait_count += len(waiting)
+            self._wait_sum += float(waiting.sum())
+            self._wait_max = max(self._wait_max, float(waiting.max()))
+            self._wait_chunks.append(waiting)
+            self._waiting_times = None
 
-        return {
-            "total_arrivals": total_arrivals,
-            "total_served": total_served,
-            "total_remaining": total_remaining,
+        # Busy time of each counter inside [warm-up, end], from the service intervals
+        start = np.maximum(columns['service_start_time'][rows], self.warmup_time)
+        end = np.minimum(columns['service_end_time'][rows], self.total_simulation_time)
+        busy = np.nan_to_num(np.clip(end - start, 0.0, None))
+        busy_by_id = np.bincount(columns['assigned_counter'][rows], weights=busy,
+                                 minlength=len(self._busy_by_id))
+        self._busy_by_id += busy_by_id[:len(self._busy_by_id)]
+
+        self._rows = stop
+
+    def _fold_classes(self, rows, observed):
+        columns = self.patients.columns
+        classes = len(self._class_arrivals)
+        priority = columns['priority'][rows][observed]
+        served = ~np.isnan(columns['service_end_time'][rows][observed])
+        waiting = columns['waiting_time'][rows][observed]
+        waited = ~np.isnan(waiting)
+
+        self._class_arrivals += np.bincount(priority, minlength=classes)
+        self._class_served += np.bincount(priority[served], minlength=classes)
+        self._class_wait_count += np.bincount(priority[waited], minlength=classes)
+        self._class_wait_sum += np.bincount(priority[waited], weights=waiting[waited], minlength=classes)
+        np.maximum.at(self._class_wait_max, priority[waited], waiting[waited])
+
+    def _refresh(self):
+        key = (self.patients.version, self.warmup_time)
+        if key != self._aggregate_key:
+            self._reset_aggregates()
+            self._fold(len(self.patients))
+            self._aggregate_key = key
+
+    def update(self, new_patients):
+        # Append patients (e.g. those finished since the last checkpoint) without rescanning history
+        self._refresh()
+        if not self._owns_patients:
+            self.patients = self.patients.copy()
+            self._owns_patients = True
+        self.patients.extend(PatientTable.from_patients(new_patients))
+        # The engine's time averages no longer cover these patients
+        self.time_averages = None
+        self._fold(len(self.patients))
+        self._aggregate_key = (self.patients.version, self.warmup_time)
+        return self
+
+    @property
+    def waiting_times(self) -> np.ndarray:
+        self._refresh()
+        if self._waiting_times is None:
+            self._waiting_times = np.concatenate(self._wait_chunks) if self._wait_chunks else np.empty(0)
+            self._wait_chunks = [self._waiting_times]
+        return self._waiting_times
+
+    @property
+    def observation_time(self) -> float:
+        return max(self.total_simulation_time - self.warmup_time, 0.0)
+
+    def _update_report(self):
+        self._refresh()
+        key = (self._aggregate_key, self.total_simulation_time)
+        if key == self._report_key:
+            return
+
+        if self.observation_time > 0:
+            self._utilization = np.array([self._busy_by_id[c.id] for c in self.counters]) \
+                / self.observation_time * 100.0
+        else:
+            self._utilization = np.zeros(len(self.counters))
+
+        throughput = self._served / self.observation_time if self.observation_time > 0 else 0.0
+        avg_wait = self._wait_sum / self._wait_count if self._wait_count else 0.0
+        avg_utilization = np.mean(self._utilization) if len(self._utilization) else 0.0
+
+        self._report = {
+            "total_arrivals": self._arrivals,
+            "total_served": self._served,
+            "total_remaining": self._arrivals - self._served,
             "average_waiting_time": float(avg_wait),
-            "max_waiting_time": float(max_wait),
+            "max_waiting_time": float(self._wait_max),
             "throughput": float(throughput),
             "average_utilization": float(avg_utilization)
         }
+        self._report.update(self._time_averages())
+
+        # Flat per-class keys, so replications aggregate them like the overall metrics
+        for name, stats in self._class_stats().items():
+            for metric, value in stats.items():
+                self._report[f"{metric}_{name}"] = value
+        self._report_key = key
+
+    def _time_averages(self):
+        if self.time_averages is not None and self.patients.version == self._time_averages_version:
+            return {name: float(value) for name, value in self.time_averages.items()}
+        timeline = queue_timeline(self.patients, self.total_simulation_time)
+        start = min(self.warmup_time, self.total_simulation_time)
+        return timeline_averages(timeline, start, self.total_simulation_time)
+
+    def _class_stats(self):
+        if not self.class_names:
+            return {}
+        counts = np.maximum(self._class_wait_count, 1)
+        return {
+            name: {
+                "total_arrivals": int(self._class_arrivals[k]),
+                "total_served": int(self._class_served[k]),
+                "average_waiting_time": float(self._class_wait_sum[k] / counts[k]),
+                "max_waiting_time": float(self._class_wait_max[k])
+            }
+            for k, name in enumerate(self.class_names)
+        }
+
+    def class_report(self) -> Dict[str, Dict]:
+        # Arrivals, patients served and waiting times of each triage class, most urgent first
+        self._update_report()
+        return self._class_stats()
+
+    def analytic_comparison(self) -> Dict[str, Dict]:
+        # Closed-form and simulated value of each metric side by side, as a sanity check
+        if self.analytic is None:
+            return {}
+        report = self.get_essential_report()
+        waits = self.waiting_times
+        estimate = self.analytic
+        return {
+            "average_waiting_time": (estimate["expected_waiting_time"], report["average_waiting_time"]),
+            "wait_probability": (estimate["wait_probability"], float(np.mean(waits > 0)) if len(waits) else 0.0),
+            "average_queue_length": (estimate["expected_queue_length"], report["average_queue_length"]),
+            "average_utilization": (min(estimate["utilization"], 1.0) * 100.0, report["average_utilization"]),
+            "throughput": (estimate["throughput"], report["throughput"])
+        }
+
+    def counter_utilization(self) -> np.ndarray:
+        self._update_report()
+        return self._utilization.copy()
+
+    def get_essential_report(self) -> Dict:
+        # Copy, so callers can annotate the report without touching the cache
+        self._update_report()
+        return dict(self._report)
 
     def print_summary(self):
         report = self.get_essential_report()
@@ -50,5 +223,18 @@ class SimulationAnalyzer:
         print(f"5. Maximum waiting time:           {report['max_waiting_time']:.2f} minutes")
         print(f"6. Throughput:                     {report['throughput']:.2f} patients/min")
         print(f"7. Average service efficiency:     {report['average_utilization']:.2f}%")
+        print(f"8. Average queue length:           {report['average_queue_length']:.2f} patients")
+        print(f"9. Average number in system:       {report['average_number_in_system']:.2f} patients")
+        for name, stats in self.class_report().items():
+            print(f"   - {name:<12} {stats['total_served']:>6}/{stats['total_arrivals']:<6} served, "
+                  f"wait {stats['average_waiting_time']:.2f} avg / {stats['max_waiting_time']:.2f} max")
+        comparison = self.analytic_comparison()
+        if comparison:
+            method = "Erlang C" if self.analytic["method"] == "erlang_c" else "Allen-Cunneen"
+            print(f"\nAnalytic vs simulated ({method}, rho = {self.analytic['utilization']:.3f}):")
+            if self.analytic["unstable"]:
+                print("   rho >= 1: the queue grows without bound, simulated waits depend on the run length")
+            print(f"   {'':<24} {'analytic':>10} {'simulated':>10}")
+            for name, (analytic, simulated) in comparison.items():
+                print(f"   - {name:<22} {analytic:>10.3f} {simulated:>10.3f}")
         print("=" * 40)
-
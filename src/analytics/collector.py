@@ -1,29 +1,43 @@
 import numpy as np
 from typing import List
 
+from models.patient_table import PatientTable
+from analytics.timeline import queue_timeline, resample_timeline, timeline_averages
+
+PATIENT_SERIES = {
+    'waiting_times': 'waiting_time',
+    'service_times': 'service_time',
+    'time_in_system': 'total_time_in_system'
+}
+
 
 class StatisticsCollector:
     def __init__(self):
-        self.data = {
-            'waiting_times': [],
-            'service_times': [],
-            'time_in_system': [],
-            'queue_lengths': [],
-            'counter_utilization': []
-        }
+        self.data = {}
+        self.clear()
+
+    def collect_from_patients(self, patients, warmup_time=0.0, class_names=None):
+        table = PatientTable.from_patients(patients)
+        observed = table.column('arrival_time') >= warmup_time
+        for key, field in PATIENT_SERIES.items():
+            column = table.column(field)[observed]
+            self.data[key] = np.concatenate([self.data[key], column[~np.isnan(column)]])
 
-    def collect_from_patients(self, patients):
-        for patient in patients:
-            if patient.waiting_time is not None:
-                self.data['waiting_times'].append(patient.waiting_time)
-            if patient.service_time is not None:
-                self.data['service_times'].append(patient.service_time)
-            if patient.total_time_in_system is not None:
-                self.data['time_in_system'].append(patient.total_time_in_system)
+        # Per triage class series, e.g. 'waiting_times_urgent'
+        priority = table.column('priority')[observed]
+        for patient_class, name in enumerate(class_names or []):
+            in_class = priority == patient_class
+            for key, field in PATIENT_SERIES.items():
+                column = table.column(field)[observed][in_class]
+                series = f"{key}_{name}"
+                self.data[series] = np.concatenate([self.data.get(series, np.empty(0)),
+                                                    column[~np.isnan(column)]])
 
-    def collect_from_counters(self, counters, total_simulation_time):
+    def collect_from_counters(self, counters, total_simulation_time, warmup_time=0.0):
+        # Counter totals are reset at the end of warm-up, so only the remaining time counts
+        observation_time = total_simulation_time - warmup_time
         for counter in counters:
-            utilization = counter.calculate_utilization(total_simulation_time)
+            utilization = counter.calculate_utilization(observation_time)
             self.data['counter_utilization'].append({
                 'counter_id': counter.id,
                 'utilization': utilization,
@@ -31,34 +45,56 @@ class StatisticsCollector:
                 'total_busy_time': counter.total_busy_time
             })
     
-    def collect_from_queue_snapshots(self, queue_snapshots):
+    def collect_from_queue_snapshots(self, queue_snapshots, warmup_time=0.0):
         if queue_snapshots:
-            self.data['queue_lengths'] = [snapshot['queue_length'] 
-                                         for snapshot in queue_snapshots]
+            self.data['queue_lengths'] = np.array([snapshot['queue_length']
+                                                   for snapshot in queue_snapshots
+                                                   if snapshot['time'] >= warmup_time], dtype=float)
+
+    def collect_from_timeline(self, patients, total_simulation_time, warmup_time=0.0, interval=1.0):
+        # Exact time-weighted means over `interval`-minute bins, rebuilt from the patient
+        # table instead of sampled snapshots; their plain mean is the exact time average
+        start = min(warmup_time, total_simulation_time)
+        timeline = queue_timeline(patients, total_simulation_time)
+        series = resample_timeline(patients, interval, total_simulation_time, start, timeline)
+        self.data['queue_lengths'] = series['queue_length']
+        self.data['busy_counters'] = series['busy_counters']
+        self.data['number_in_system'] = series['number_in_system']
+        self.time_averages = timeline_averages(timeline, start, total_simulation_time)
+
+    def collect_time_averages(self, time_averages):
+        # Time averages integrated by the engine (SimulationEnvironment.time_averages())
+        self.time_averages = dict(time_averages)
     
     def get_data_summary(self) -> dict:
         summary = {}
         
         for key, values in self.data.items():
-            if values and isinstance(values[0], (int, float)):
-                arr = np.array(values)
+            if isinstance(values, np.ndarray) and len(values):
                 summary[key] = {
-                    'count': len(arr),
-                    'mean': float(np.mean(arr)),
-                    'std': float(np.std(arr)),
-                    'min': float(np.min(arr)),
-                    'max': float(np.max(arr)),
-                    'median': float(np.median(arr))
+                    'count': len(values),
+                    'mean': float(np.mean(values)),
+                    'std': float(np.std(values)),
+                    'min': float(np.min(values)),
+                    'max': float(np.max(values)),
+                    'median': float(np.median(values))
                 }
             else:
                 summary[key] = {
                     'count': len(values),
                     'type': 'non_numeric'
                 }
-        
+
+        if self.time_averages:
+            summary['time_averages'] = dict(self.time_averages)
         return summary
     
     def clear(self):
-        for key in self.data:
-            self.data[key] = []
-
+        self.time_averages = {}
+        self.data = {
+            'waiting_times': np.empty(0),
+            'service_times': np.empty(0),
+            'time_in_system': np.empty(0),
+            'queue_lengths': np.empty(0),
+            'counter_utilization': []
+        }
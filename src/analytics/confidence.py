@@ -0,0 +1,113 @@
+import math
+from statistics import NormalDist
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+def _t_cdf(t: float, df: int) -> float:
+    # Student t CDF for integer df, closed-form series in theta = atan(t / sqrt(df)) (A&S 26.7.3-4)
+    theta = math.atan(t / math.sqrt(df))
+    c2 = math.cos(theta) ** 2
+    if df % 2:
+        term = total = 0.0 if df == 1 else math.cos(theta)
+        for k in range(3, df - 1, 2):
+            term *= c2 * (k - 1) / k
+            total += term
+        central = 2 / math.pi * (theta + math.sin(theta) * total)
+    else:
+        term = total = 1.0
+        for k in range(2, df - 1, 2):
+            term *= c2 * (k - 1) / k
+            total += term
+        central = math.sin(theta) * total
+    # central is P(-t < T < t) with the sign of t
+    return 0.5 + central / 2
+
+
+def _t_pdf(t: float, df: int) -> float:
+    log_scale = math.lgamma((df + 1) / 2) - math.lgamma(df / 2) - 0.5 * math.log(df * math.pi)
+    return math.exp(log_scale - (df + 1) / 2 * math.log1p(t * t / df))
+
+
+def t_quantile(p: float, df: int) -> float:
+    # Exact for 1 and 2 degrees of freedom; above, the Cornish-Fisher expansion (A&S 26.7.5)
+    # runs low for small df, so it only seeds Newton steps on the exact CDF
+    if df == 1:
+        return math.tan(math.pi * (p - 0.5))
+    if df == 2:
+        return (2 * p - 1) / math.sqrt(2 * p * (1 - p))
+
+    x = NormalDist().inv_cdf(p)
+    g1 = (x ** 3 + x) / 4
+    g2 = (5 * x ** 5 + 16 * x ** 3 + 3 * x) / 96
+    g3 = (3 * x ** 7 + 19 * x ** 5 + 17 * x ** 3 - 15 * x) / 384
+    g4 = (79 * x ** 9 + 776 * x ** 7 + 1482 * x ** 5 - 1920 * x ** 3 - 945 * x) / 92160
+    t = x + g1 / df + g2 / df ** 2 + g3 / df ** 3 + g4 / df ** 4
+    for _ in range(4):
+        step = (_t_cdf(t, df) - p) / _t_pdf(t, df)
+        t -= step
+        if abs(step) < 1e-12 * max(1.0, abs(t)):
+            break
+    return t
+
+
+def confidence_interval(values, confidence: float = 0.95) -> Dict:
+    arr = np.asarray(values, dtype=float)
+    n = len(arr)
+    mean = float(np.mean(arr)) if n else 0.0
+
+    if n < 2:
+        return {'n': n, 'mean': mean, 'std': 0.0, 'half_width': float('inf'),
+                'lower': float('-inf'), 'upper': float('inf')}
+
+    std = float(np.std(arr, ddof=1))
+    half_width = t_quantile(0.5 + confidence / 2, n - 1) * std / math.sqrt(n)
+    return {
+        'n': n,
+        'mean': mean,
+        'std': std,
+        'half_width': half_width,
+        'lower': mean - half_width,
+        'upper': mean + half_width
+    }
+
+
+def paired_differences(baseline: List[Dict], alternative: List[Dict], confidence: float = 0.95,
+                       metrics: Optional[List[str]] = None) -> Dict:
+    # Reports are paired by position (same seed): the interval is on the per-seed
+    # differences alternative - baseline. `independent_half_width` is what the same
+    # runs would give if the two scenarios had been sampled independently.
+    if not baseline:
+        return {}
+    if metrics is None:
+        metrics = [key for key, value in baseline[0].items()
+                   if isinstance(value, (int, float)) and key != 'seed']
+
+    n = len(baseline)
+    result = {}
+    for metric in metrics:
+        a = np.array([report[metric] for report in baseline], dtype=float)
+        b = np.array([report[metric] for report in alternative], dtype=float)
+        stats = confidence_interval(b - a, confidence)
+        if n >= 2:
+            spread = math.sqrt((np.var(a, ddof=1) + np.var(b, ddof=1)) / n)
+            stats['independent_half_width'] = t_quantile(0.5 + confidence / 2, 2 * n - 2) * spread
+        else:
+            stats['independent_half_width'] = float('inf')
+        result[metric] = stats
+    return result
+
+
+def aggregate_reports(reports: List[Dict], confidence: float = 0.95,
+                      metrics: Optional[List[str]] = None) -> Dict:
+    if not reports:
+        return {}
+    if metrics is None:
+        metrics = [key for key, value in reports[0].items()
+                   if isinstance(value, (int, float)) and key != 'seed']
+
+    return {
+        metric: confidence_interval([report[metric] for report in reports], confidence)
+        for metric in metrics
+    }
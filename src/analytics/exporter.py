@@ -0,0 +1,243 @@
+import csv
+import gzip
+import io
+import json
+import os
+import warnings
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from simulation.event_log import EVENT_NAMES, iter_event_chunks
+
+# Patient columns exported, named as in Patient.to_dict()
+PATIENT_COLUMNS = {
+    'id': 'id',
+    'arrival_time': 'arrival_time',
+    'service_start_time': 'service_start_time',
+    'service_end_time': 'service_end_time',
+    'waiting_time': 'waiting_time',
+    'service_time': 'service_time',
+    'total_time_in_system': 'total_time_in_system',
+    'counter': 'assigned_counter',
+    'priority': 'priority'
+}
+
+EVENT_NAME_ARRAY = np.array([EVENT_NAMES[event] for event in sorted(EVENT_NAMES)])
+
+WRITE_BUFFER_SIZE = 1 << 20
+GZIP_LEVEL = 6  # zlib's default trade-off; level 9 is several times slower for a few % smaller files
+
+
+def _python_values(column):
+    # Plain Python values for the text writers; NaN becomes None (empty CSV cell, JSON null)
+    column = np.asarray(column)
+    if column.dtype.kind == 'f':
+        missing = np.isnan(column)
+        if missing.any():
+            values = column.astype(object)
+            values[missing] = None
+            return values.tolist()
+    return column.tolist()
+
+
+def _open_text(path, compression):
+    if compression == 'gzip':
+        return io.TextIOWrapper(io.BufferedWriter(gzip.open(path, 'wb', compresslevel=GZIP_LEVEL), WRITE_BUFFER_SIZE),
+                                encoding='utf-8', newline='')
+    return open(path, 'w', encoding='utf-8', newline='', buffering=WRITE_BUFFER_SIZE)
+
+
+class CsvTableWriter:
+    extension = 'csv'
+
+    def __init__(self, path, columns, compression=None):
+        self.path = path
+        self.file = _open_text(path, compression)
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(columns)
+
+    def write(self, chunk: Dict[str, np.ndarray]):
+        self.writer.writerows(zip(*(_python_values(column) for column in chunk.values())))
+
+    def close(self):
+        self.file.close()
+
+
+class JsonTableWriter:
+    """A JSON array of row objects, written chunk by chunk"""
+    extension = 'json'
+
+    def __init__(self, path, columns, compression=None):
+        self.path = path
+        self.columns = list(columns)
+        self.file = _open_text(path, compression)
+        self.file.write('[')
+        self.first = True
+
+    def write(self, chunk: Dict[str, np.ndarray]):
+        rows = [dict(zip(self.columns, row)) for row in zip(*(_python_values(c) for c in chunk.values()))]
+        if rows:
+            self.file.write(('' if self.first else ',') + json.dumps(rows)[1:-1])
+            self.first = False
+
+    def close(self):
+        self.file.write(']\n')
+        self.file.close()
+
+
+class ParquetTableWriter:
+    """One row group per chunk; needs pyarrow"""
+    extension = 'parquet'
+
+    def __init__(self, path, columns, compression=None):
+        import pyarrow.parquet as pq
+        self.path = path
+        self.pq = pq
+        self.compression = compression or 'snappy'
+        self.writer = None
+
+    def write(self, chunk: Dict[str, np.ndarray]):
+        import pyarrow as pa
+        table = pa.table({name: np.asarray(column) for name, column in chunk.items()})
+        if self.writer is None:
+            self.writer = self.pq.ParquetWriter(self.path, table.schema, compression=self.compression)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+WRITERS = {
+    'csv': CsvTableWriter,
+    'json': JsonTableWriter,
+    'parquet': ParquetTableWriter
+}
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def patient_chunks(patients, chunk_size) -> Iterator[Dict[str, np.ndarray]]:
+    for start in range(0, len(patients), chunk_size):
+        stop = min(start + chunk_size, len(patients))
+        yield {name: patients.columns[field][start:stop] for name, field in PATIENT_COLUMNS.items()}
+
+
+def event_chunks(events_log, chunk_size) -> Iterator[Dict[str, np.ndarray]]:
+    # Spilled events are streamed back from the .npy file, never loaded whole
+    sources = []
+    if events_log.spill_path and events_log.spilled_events:
+        sources.append(iter_event_chunks(events_log.spill_path, chunk_size))
+    in_memory = events_log.in_memory()
+    sources.append(in_memory[start:start + chunk_size] for start in range(0, len(in_memory), chunk_size))
+
+    for source in sources:
+        for records in source:
+            yield {
+                'time': records['time'],
+                'event': EVENT_NAME_ARRAY[records['event']],
+                'patient_id': records['patient_id'],
+                'counter_id': records['counter_id'],
+                'queue_length': records['queue_length']
+            }
+
+
+def snapshot_chunks(snapshots, chunk_size) -> Iterator[Dict[str, np.ndarray]]:
+    if not snapshots:
+        return
+    names = list(snapshots[0])
+    for start in range(0, len(snapshots), chunk_size):
+        rows = snapshots[start:start + chunk_size]
+        yield {name: np.array([row[name] for row in rows]) for name in names}
+
+
+def metadata_chunks(events_log) -> Iterator[Dict[str, np.ndarray]]:
+    # A ring-mode event log keeps only its newest EVENT_LOG_CAPACITY events
+    yield {
+        'total_events': np.array([events_log.total_events]),
+        'exported_events': np.array([events_log.total_events - events_log.dropped_events]),
+        'dropped_events': np.array([events_log.dropped_events])
+    }
+
+
+def counter_chunks(counters, utilization) -> Iterator[Dict[str, np.ndarray]]:
+    yield {
+        'id': np.array([c.id for c in counters]),
+        'patients_served': np.array([c.total_patients_served for c in counters]),
+        'busy_time': np.array([c.total_busy_time for c in counters], dtype=float),
+        'utilization': np.asarray(utilization, dtype=float)
+    }
+
+
+class ResultExporter:
+    def __init__(self, output_dir: str, formats: Optional[List[str]] = None,
+                 compression: Optional[str] = None, chunk_size: int = 65536, prefix: str = ""):
+        self.output_dir = output_dir
+        self.formats = list(formats if formats is not None else ["csv", "json"])
+        self.compression = compression
+        self.chunk_size = max(int(chunk_size), 1)
+        self.prefix = prefix
+
+        unknown = set(self.formats) - set(WRITERS)
+        if unknown:
+            raise ValueError(f"Unknown export formats: {sorted(unknown)}")
+        if 'parquet' in self.formats and not parquet_available():
+            warnings.warn("pyarrow is not installed; skipping Parquet export")
+            self.formats.remove('parquet')
+
+    def _path(self, table, fmt):
+        # Parquet compresses internally, so only the text formats get a .gz suffix
+        suffix = '.gz' if self.compression == 'gzip' and fmt != 'parquet' else ''
+        return os.path.join(self.output_dir, f"{self.prefix}{table}.{WRITERS[fmt].extension}{suffix}")
+
+    def write_table(self, table: str, chunks: Iterator[Dict[str, np.ndarray]]) -> List[str]:
+        # A single pass over the chunks feeds every requested format
+        writers = []
+        try:
+            for chunk in chunks:
+                if not writers:
+                    os.makedirs(self.output_dir, exist_ok=True)
+                    writers = [WRITERS[fmt](self._path(table, fmt), list(chunk), self.compression)
+                               for fmt in self.formats]
+                for writer in writers:
+                    writer.write(chunk)
+        finally:
+            for writer in writers:
+                writer.close()
+        return [writer.path for writer in writers]
+
+    def export(self, sim_env, monitor=None, analyzer=None) -> List[str]:
+        if analyzer is not None:
+            utilization = analyzer.counter_utilization()
+        else:
+            utilization = [c.calculate_utilization(sim_env.env.now) for c in sim_env.counter_list]
+
+        paths = self.write_table('patients', patient_chunks(sim_env.patients, self.chunk_size))
+        if monitor is not None:
+            events_log = monitor.events_log
+            if events_log.dropped_events:
+                warnings.warn(f"The event log dropped its {events_log.dropped_events} oldest events; the events "
+                              "export is truncated (raise EVENT_LOG_CAPACITY or set EVENT_LOG_PATH)")
+            paths += self.write_table('events', event_chunks(events_log, self.chunk_size))
+            paths += self.write_table('metadata', metadata_chunks(events_log))
+            paths += self.write_table('snapshots', snapshot_chunks(monitor.queue_snapshots, self.chunk_size))
+        paths += self.write_table('counters', counter_chunks(sim_env.counter_list, utilization))
+        return paths
+
+
+def export_results(sim_env, monitor, analyzer, settings, output_dir: str, prefix: str = "") -> List[str]:
+    exporter = ResultExporter(
+        output_dir,
+        formats=getattr(settings, 'EXPORT_FORMAT', ["csv", "json"]),
+        compression=getattr(settings, 'EXPORT_COMPRESSION', None),
+        chunk_size=getattr(settings, 'EXPORT_CHUNK_SIZE', 65536),
+        prefix=prefix
+    )
+    return exporter.export(sim_env, monitor, analyzer)
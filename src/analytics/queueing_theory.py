@@ -0,0 +1,98 @@
+import math
+from typing import Dict, Optional
+
+# Settings under which the steady-state M/G/c formulas do not describe the run
+NON_STATIONARY_SETTINGS = ('ARRIVAL_RATE_SCHEDULE', 'STAFFING_SCHEDULE', 'COUNTER_CLASSES', 'STATIONS')
+
+
+def erlang_c(servers: int, offered_load: float) -> float:
+    # Probability that an arrival waits in M/M/c with offered load a = lambda / mu,
+    # from the Erlang B recursion B(k) = a B(k-1) / (k + a B(k-1)), which never overflows
+    if offered_load <= 0:
+        return 0.0
+    if offered_load >= servers:
+        return 1.0
+    blocking = 1.0
+    for k in range(1, servers + 1):
+        blocking = offered_load * blocking / (k + offered_load * blocking)
+    rho = offered_load / servers
+    return blocking / (1 - rho + rho * blocking)
+
+
+def squared_cv(distribution: str, mean: float, std: float = 0.0) -> float:
+    # Squared coefficient of variation of the generator's distributions; the normal
+    # service time is truncated at 0.1 minutes, which is ignored here
+    if distribution == "exponential":
+        return 1.0
+    if distribution == "normal":
+        return (std / mean) ** 2 if mean > 0 else 0.0
+    if distribution == "uniform":
+        # mean * U(0.5, 1.5)
+        return 1.0 / 12.0
+    return 0.0
+
+
+def mgc_estimate(arrival_rate: float, service_mean: float, servers: int,
+                 arrival_scv: float = 1.0, service_scv: float = 1.0) -> Dict:
+    # Erlang C for M/M/c; otherwise the Allen-Cunneen approximation scales the M/M/c
+    # queueing delay by (ca^2 + cs^2) / 2
+    offered_load = arrival_rate * service_mean
+    rho = offered_load / servers
+    unstable = rho >= 1
+    wait_probability = erlang_c(servers, offered_load)
+
+    if unstable:
+        waiting_time = math.inf
+    else:
+        waiting_time = wait_probability * service_mean / (servers - offered_load)
+        waiting_time *= (arrival_scv + service_scv) / 2
+
+    exact = arrival_scv == 1.0 and service_scv == 1.0
+    return {
+        "method": "erlang_c" if exact else "allen_cunneen",
+        "arrival_rate": arrival_rate,
+        "utilization": rho,
+        "unstable": unstable,
+        "wait_probability": wait_probability,
+        "expected_waiting_time": waiting_time,
+        "expected_queue_length": arrival_rate * waiting_time,
+        "expected_time_in_system": waiting_time + service_mean,
+        "expected_busy_counters": min(offered_load, servers),
+        "throughput": min(arrival_rate, servers / service_mean)
+    }
+
+
+def analytic_estimate(settings) -> Optional[Dict]:
+    # Steady-state estimate for the run's settings, or None when no closed form applies.
+    # Triage classes share one service distribution and never preempt, so the overall
+    # mean wait is the FIFO one (conservation law)
+    if any(getattr(settings, name, None) for name in NON_STATIONARY_SETTINGS):
+        return None
+    arrival_mean = settings.ARRIVAL_INTERVAL_MEAN
+    service_mean = settings.SERVICE_TIME_MEAN
+    return mgc_estimate(
+        1.0 / arrival_mean, service_mean, settings.NUMBER_OF_COUNTERS,
+        squared_cv(settings.ARRIVAL_DISTRIBUTION, arrival_mean),
+        squared_cv(settings.SERVICE_TIME_DISTRIBUTION, service_mean, settings.SERVICE_TIME_STD)
+    )
+
+
+def analytic_report(estimate: Dict, observation_time: float) -> Dict:
+    # The analyzer's report keys filled in from an estimate, for runs that are not simulated.
+    # The longest wait has no closed form and is left missing
+    arrivals = estimate["arrival_rate"] * observation_time
+    served = estimate["throughput"] * observation_time
+    in_system = arrivals - served if estimate["unstable"] else \
+        estimate["expected_queue_length"] + estimate["expected_busy_counters"]
+    return {
+        "total_arrivals": arrivals,
+        "total_served": served,
+        "total_remaining": in_system,
+        "average_waiting_time": estimate["expected_waiting_time"],
+        "max_waiting_time": math.nan,
+        "throughput": estimate["throughput"],
+        "average_utilization": min(estimate["utilization"], 1.0) * 100.0,
+        "average_queue_length": estimate["expected_queue_length"],
+        "average_busy_counters": estimate["expected_busy_counters"],
+        "average_number_in_system": estimate["expected_queue_length"] + estimate["expected_busy_counters"]
+    }
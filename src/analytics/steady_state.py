@@ -0,0 +1,58 @@
+import numpy as np
+from typing import Optional
+
+from analytics.timeline import resample_timeline
+
+
+def mser_truncation(series, batch_size: int = 5, max_fraction: float = 0.5) -> int:
+    # MSER-k (k = batch_size): choose the truncation point d that minimises the
+    # marginal standard error of the remaining batch means,
+    #   MSER(d) = sum_{i>d} (Y_i - mean_d)^2 / (n - d)^2
+    # Only the first `max_fraction` of the batches are candidates, as usual for MSER
+    values = np.asarray(series, dtype=float)
+    values = values[~np.isnan(values)]
+    n_batches = len(values) // batch_size
+    if n_batches < 4:
+        return 0
+
+    batches = values[:n_batches * batch_size].reshape(n_batches, batch_size).mean(axis=1)
+
+    # Suffix sums give every candidate's statistic in one vectorized pass
+    suffix_sum = np.cumsum(batches[::-1])[::-1]
+    suffix_sq = np.cumsum((batches ** 2)[::-1])[::-1]
+    remaining = np.arange(n_batches, 0, -1)
+    sse = suffix_sq - suffix_sum ** 2 / remaining
+    statistic = sse / remaining ** 2
+
+    candidates = max(int(n_batches * max_fraction), 1)
+    return int(np.argmin(statistic[:candidates])) * batch_size
+
+
+def detect_warmup(patients=None, queue_snapshots=None, batch_size: int = 5,
+                  end_time: Optional[float] = None, queue_interval: float = 1.0) -> float:
+    # Warm-up end time: the later of the MSER cut on waiting times (in arrival
+    # order) and on the queue-length series. Without snapshots, the series is the
+    # exact time-weighted queue length over `queue_interval` bins up to `end_time`
+    warmup = 0.0
+
+    if patients is not None and len(patients):
+        arrivals = patients.column('arrival_time')
+        waits = patients.column('waiting_time')
+        served = ~np.isnan(waits)
+        if np.any(served):
+            cut = mser_truncation(waits[served], batch_size)
+            warmup = max(warmup, float(arrivals[served][cut]))
+
+    if queue_snapshots:
+        times = np.array([snapshot['time'] for snapshot in queue_snapshots])
+        lengths = np.array([snapshot['queue_length'] for snapshot in queue_snapshots], dtype=float)
+    elif patients is not None and len(patients) and end_time is not None:
+        series = resample_timeline(patients, queue_interval, end_time)
+        times, lengths = series['time'], series['queue_length']
+    else:
+        return warmup
+
+    cut = mser_truncation(lengths, batch_size)
+    warmup = max(warmup, float(times[cut]))
+
+    return warmup
@@ -0,0 +1,219 @@
+import math
+
+import numpy as np
+
+from models.patient_table import PatientTable
+
+STREAMED_SERIES = {
+    'waiting_times': 'waiting_time',
+    'service_times': 'service_time',
+    'time_in_system': 'total_time_in_system'
+}
+
+QUANTILES = {'median': 0.5, 'p90': 0.9, 'p95': 0.95, 'p99': 0.99}
+
+
+class RunningStats:
+    """Welford running mean/variance with min and max; mergeable (Chan et al.)"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def _combine(self, count, mean, m2, low, high):
+        if count == 0:
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta ** 2 * self.count * count / total
+        self.count = total
+        self.min = min(self.min, low)
+        self.max = max(self.max, high)
+
+    def add_batch(self, values):
+        values = np.asarray(values, dtype=float)
+        if len(values):
+            mean = float(values.mean())
+            self._combine(len(values), mean, float(((values - mean) ** 2).sum()),
+                          float(values.min()), float(values.max()))
+
+    def merge(self, other):
+        self._combine(other.count, other.mean, other.m2, other.min, other.max)
+        return self
+
+    @property
+    def variance(self):
+        # Population variance, matching np.std in StatisticsCollector
+        return self.m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+
+class TDigest:
+    """Merging t-digest (Dunning) for streaming, mergeable quantile estimates"""
+
+    def __init__(self, compression=100):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _scale(self, q):
+        return self.compression / (2 * math.pi) * math.asin(2 * q - 1)
+
+    def _scale_inverse(self, k):
+        if k >= self.compression / 4:
+            return 1.0
+        return (math.sin(2 * math.pi * k / self.compression) + 1) / 2
+
+    def add_batch(self, values, weights=None):
+        values = np.asarray(values, dtype=float)
+        if not len(values):
+            return
+        if weights is None:
+            weights = np.ones(len(values))
+        self.count += float(np.sum(weights))
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._compress(np.concatenate([self.means, values]), np.concatenate([self.weights, weights]))
+
+    def _compress(self, means, weights):
+        order = np.argsort(means, kind='mergesort')
+        means = means[order].tolist()
+        weights = weights[order].tolist()
+        total = sum(weights)
+
+        merged_means = []
+        merged_weights = []
+        weight_before = 0.0
+        current_mean, current_weight = means[0], weights[0]
+        q_limit = self._scale_inverse(self._scale(0.0) + 1)
+
+        for mean, weight in zip(means[1:], weights[1:]):
+            if (weight_before + current_weight + weight) / total <= q_limit:
+                current_weight += weight
+                current_mean += (mean - current_mean) * weight / current_weight
+            else:
+                merged_means.append(current_mean)
+                merged_weights.append(current_weight)
+                weight_before += current_weight
+                q_limit = self._scale_inverse(self._scale(weight_before / total) + 1)
+                current_mean, current_weight = mean, weight
+
+        merged_means.append(current_mean)
+        merged_weights.append(current_weight)
+        self.means = np.array(merged_means)
+        self.weights = np.array(merged_weights)
+
+    def merge(self, other):
+        if other.count:
+            self.add_batch(other.means, other.weights)
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+        return self
+
+    def quantile(self, q):
+        if not self.count:
+            return float('nan')
+        # Interpolate between centroid centres, anchored at the exact min and max
+        centres = np.cumsum(self.weights) - self.weights / 2
+        x = np.concatenate([[0.0], centres, [self.count]])
+        y = np.concatenate([[self.min], self.means, [self.max]])
+        return float(np.interp(q * self.count, x, y))
+
+
+class StreamingSeries:
+    """Constant-memory summary of one metric: Welford moments plus a t-digest"""
+
+    def __init__(self, compression=100, buffer_size=1024):
+        self.stats = RunningStats()
+        self.digest = TDigest(compression)
+        self.buffer_size = buffer_size
+        self._buffer = []
+
+    def add(self, value):
+        self._buffer.append(value)
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def add_batch(self, values):
+        self.flush()
+        self.stats.add_batch(values)
+        self.digest.add_batch(values)
+
+    def flush(self):
+        if self._buffer:
+            values = np.array(self._buffer)
+            self._buffer = []
+            self.stats.add_batch(values)
+            self.digest.add_batch(values)
+
+    def merge(self, other):
+        self.flush()
+        other.flush()
+        self.stats.merge(other.stats)
+        self.digest.merge(other.digest)
+        return self
+
+    def summary(self):
+        self.flush()
+        if not self.stats.count:
+            return {'count': 0, 'type': 'non_numeric'}
+        summary = {
+            'count': self.stats.count,
+            'mean': self.stats.mean,
+            'std': self.stats.std,
+            'min': self.stats.min,
+            'max': self.stats.max
+        }
+        for name, q in QUANTILES.items():
+            summary[name] = self.digest.quantile(q)
+        return summary
+
+
+class StreamingStatisticsCollector:
+    def __init__(self, warmup_time=0.0, compression=100):
+        self.warmup_time = warmup_time or 0.0
+        self.series = {key: StreamingSeries(compression) for key in STREAMED_SERIES}
+
+    def record(self, arrival_time, waiting_time, service_time, time_in_system):
+        if arrival_time < self.warmup_time:
+            return
+        self.series['waiting_times'].add(waiting_time)
+        self.series['service_times'].add(service_time)
+        self.series['time_in_system'].add(time_in_system)
+
+    def record_patient(self, patient):
+        self.record(patient.arrival_time, patient.waiting_time,
+                    patient.service_time, patient.total_time_in_system)
+
+    def collect_from_patients(self, patients):
+        table = PatientTable.from_patients(patients)
+        observed = table.column('arrival_time') >= self.warmup_time
+        for key, field in STREAMED_SERIES.items():
+            column = table.column(field)[observed]
+            self.series[key].add_batch(column[~np.isnan(column)])
+
+    def merge(self, other):
+        for key, series in self.series.items():
+            series.merge(other.series[key])
+        return self
+
+    def get_data_summary(self) -> dict:
+        return {key: series.summary() for key, series in self.series.items()}
@@ -0,0 +1,77 @@
+import numpy as np
+from typing import Dict, Optional
+
+from models.patient_table import PatientTable
+
+SERIES = ('queue_length', 'busy_counters', 'number_in_system')
+
+
+def queue_timeline(patients, end_time: float) -> Dict[str, np.ndarray]:
+    # Exact step functions of the system state, rebuilt from the patient table: every
+    # arrival, service start and service end is a change point, and each series holds
+    # its value from that time until the next change
+    table = PatientTable.from_patients(patients)
+    arrivals = table.column('arrival_time')
+    starts = table.column('service_start_time')
+    ends = table.column('service_end_time')
+    starts = starts[~np.isnan(starts)]
+    ends = ends[~np.isnan(ends)]
+
+    times = np.concatenate([arrivals, starts, ends])
+    queue_change = np.concatenate([np.ones(len(arrivals)), -np.ones(len(starts)), np.zeros(len(ends))])
+    busy_change = np.concatenate([np.zeros(len(arrivals)), np.ones(len(starts)), -np.ones(len(ends))])
+    order = np.argsort(times, kind='stable')
+    inside = times[order] <= end_time
+
+    queue = np.cumsum(queue_change[order])[inside]
+    busy = np.cumsum(busy_change[order])[inside]
+    return {
+        'time': times[order][inside],
+        'queue_length': queue,
+        'busy_counters': busy,
+        'number_in_system': queue + busy
+    }
+
+
+def _areas(timeline, points):
+    # Integral of each series from time 0 up to every point (step functions, so linear between changes)
+    times = timeline['time']
+    k = np.searchsorted(times, points, side='right') - 1
+    areas = {}
+    for name in SERIES:
+        values = timeline[name]
+        cumulative = np.concatenate([[0.0], np.cumsum(values[:-1] * np.diff(times))])
+        valid = k >= 0
+        area = np.zeros(len(points))
+        area[valid] = cumulative[k[valid]] + values[k[valid]] * (points[valid] - times[k[valid]])
+        areas[name] = area
+    return areas
+
+
+def timeline_averages(timeline, start_time: float, end_time: float) -> Dict[str, float]:
+    # Exact time-weighted means over [start_time, end_time]
+    length = end_time - start_time
+    if length <= 0 or not len(timeline['time']):
+        return {f"average_{name}": 0.0 for name in SERIES}
+    areas = _areas(timeline, np.array([start_time, end_time], dtype=float))
+    return {f"average_{name}": float((areas[name][1] - areas[name][0]) / length) for name in SERIES}
+
+
+def resample_timeline(patients, interval: float, end_time: float, start_time: float = 0.0,
+                      timeline: Optional[Dict] = None) -> Dict[str, np.ndarray]:
+    # Time-weighted mean of each series over consecutive bins of `interval` minutes, at any
+    # resolution and without aliasing; 'time' holds the bin starts
+    if timeline is None:
+        timeline = queue_timeline(patients, end_time)
+    edges = np.arange(start_time, end_time, interval, dtype=float)
+    # The last bin is shortened to end at end_time; a float-rounding sliver is dropped
+    edges = np.append(edges[end_time - edges > interval * 1e-9], end_time)
+    widths = np.diff(edges)
+    result = {'time': edges[:-1]}
+    if not len(timeline['time']):
+        result.update({name: np.zeros(len(widths)) for name in SERIES})
+        return result
+    areas = _areas(timeline, edges)
+    for name in SERIES:
+        result[name] = np.diff(areas[name]) / widths
+    return result
@@ -1,64 +1,100 @@
-import matplotlib.pyplot as plt
-import seaborn as sns
-import numpy as np
 import os
+from concurrent.futures import ProcessPoolExecutor
 from typing import Optional
 
+import numpy as np
+import matplotlib
+import matplotlib.style
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 
-class SimulationVisualizer:
-    def __init__(self, analyzer, output_dir: str = "visualize"):
-        self.analyzer = analyzer
-        self.output_dir = output_dir
-        os.makedirs(output_dir, exist_ok=True)
+# seaborn's whitegrid look, applied per figure instead of through global pyplot state
+PLOT_STYLE = {**matplotlib.style.library['seaborn-v0_8-whitegrid'],
+              'figure.figsize': (10, 6), 'font.size': 10}
 
-        sns.set_style("whitegrid")
-        plt.rcParams['figure.figsize'] = (10, 6)
-        plt.rcParams['font.size'] = 10
+# Histogram bins drawn, and the finer grid the KDE is evaluated on
+HISTOGRAM_BINS = 20
+KDE_GRID_SIZE = 512
 
-    def plot_waiting_time(self, save_path: Optional[str] = None):
-        if len(self.analyzer.waiting_times) == 0:
-            return
 
-        plt.figure(figsize=(10, 5))
-        sns.histplot(self.analyzer.waiting_times, kde=True, color='steelblue', bins=20)
+def binned_kde(values, grid_size=KDE_GRID_SIZE):
+    # Gaussian KDE (Scott's bandwidth, as seaborn) computed by smoothing a fine histogram:
+    # O(n + grid^2) instead of O(n * grid), so large samples cost little more than small ones
+    values = np.asarray(values, dtype=float)
+    if len(values) < 2 or values.std() == 0:
+        return None, None
 
-        avg_wait = np.mean(self.analyzer.waiting_times)
-        plt.axvline(avg_wait, color='red', linestyle='--', label=f'Average: {avg_wait:.2f} min')
+    bandwidth = values.std() * len(values) ** (-1 / 5)
+    low, high = values.min() - 3 * bandwidth, values.max() + 3 * bandwidth
+    counts, edges = np.histogram(values, bins=grid_size, range=(low, high))
+    grid = (edges[:-1] + edges[1:]) / 2
+    step = edges[1] - edges[0]
 
-        plt.title('Patient Waiting Time Distribution', fontweight='bold')
-        plt.xlabel('Waiting time (minutes)')
-        plt.ylabel('Number of patients')
-        plt.legend()
+    offsets = np.arange(-grid_size + 1, grid_size) * step
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2) / (bandwidth * np.sqrt(2 * np.pi))
+    density = np.convolve(counts, kernel, mode='valid') / len(values)
 
-        path = save_path or os.path.join(self.output_dir, 'waiting_time.png')
-        plt.savefig(path, dpi=300, bbox_inches='tight')
-        plt.close()
+    # Like seaborn's histplot, only draw the curve over the observed range
+    inside = (grid >= values.min()) & (grid <= values.max())
+    return grid[inside], density[inside]
+
+
+def _new_figure(figsize):
+    figure = Figure(figsize=figsize)
+    FigureCanvasAgg(figure)
+    return figure
 
-    def plot_counter_performance(self, save_path: Optional[str] = None):
-        report = self.analyzer.get_essential_report()
-        counter_ids = [f"Counter {i + 1}" for i in range(len(self.analyzer.counters))]
-        utilization = [c.calculate_utilization(self.analyzer.total_simulation_time) for c in self.analyzer.counters]
 
-        fig, ax1 = plt.subplots(figsize=(10, 5))
+def _save(figure, path, dpi):
+    figure.savefig(path, dpi=dpi, bbox_inches='tight')
+    return path
 
-        bars = ax1.bar(counter_ids, utilization, color='skyblue', alpha=0.7)
-        ax1.set_ylabel('Performance (%)', fontsize=12)
-        ax1.set_ylim(0, 100)
+
+def render_waiting_time(waiting_times, path, dpi=300):
+    with matplotlib.rc_context(PLOT_STYLE):
+        figure = _new_figure((10, 5))
+        ax = figure.add_subplot()
+
+        counts, edges = np.histogram(waiting_times, bins=HISTOGRAM_BINS)
+        ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge', color='steelblue',
+               alpha=0.5, edgecolor='white')
+
+        # Scale the density to patients per histogram bin, as seaborn does for kde=True
+        grid, density = binned_kde(waiting_times)
+        if grid is not None:
+            ax.plot(grid, density * len(waiting_times) * (edges[1] - edges[0]), color='steelblue')
+
+        avg_wait = np.mean(waiting_times)
+        ax.axvline(avg_wait, color='red', linestyle='--', label=f'Average: {avg_wait:.2f} min')
+
+        ax.set_title('Patient Waiting Time Distribution', fontweight='bold')
+        ax.set_xlabel('Waiting time (minutes)')
+        ax.set_ylabel('Number of patients')
+        ax.legend()
+        return _save(figure, path, dpi)
+
+
+def render_counter_performance(labels, utilization, path, dpi=300):
+    with matplotlib.rc_context(PLOT_STYLE):
+        figure = _new_figure((10, 5))
+        ax = figure.add_subplot()
+
+        bars = ax.bar(labels, utilization, color='skyblue', alpha=0.7)
+        ax.set_ylabel('Performance (%)', fontsize=12)
+        ax.set_ylim(0, 100)
 
         for bar in bars:
             height = bar.get_height()
-            ax1.text(bar.get_x() + bar.get_width() / 2., height, f'{height:.1f}%', ha='center', va='bottom')
-
-        plt.title('Counter Service Performance', fontweight='bold')
+            ax.text(bar.get_x() + bar.get_width() / 2., height, f'{height:.1f}%', ha='center', va='bottom')
 
-        path = save_path or os.path.join(self.output_dir, 'counter_performance.png')
-        plt.savefig(path, dpi=300, bbox_inches='tight')
-        plt.close()
+        ax.set_title('Counter Service Performance', fontweight='bold')
+        return _save(figure, path, dpi)
 
-    def plot_summary_dashboard(self, save_path: Optional[str] = None):
-        report = self.analyzer.get_essential_report()
 
-        fig, ax = plt.subplots(figsize=(8, 4))
+def render_summary_dashboard(report, path, dpi=300):
+    with matplotlib.rc_context(PLOT_STYLE):
+        figure = _new_figure((8, 4))
+        ax = figure.add_subplot()
         ax.axis('off')
 
         stats_text = (
@@ -75,14 +111,99 @@ class SimulationVisualizer:
 
         ax.text(0.1, 0.5, stats_text, fontsize=12, family='monospace',
                 va='center', bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.3))
+        return _save(figure, path, dpi)
+
 
-        path = save_path or os.path.join(self.output_dir, 'summary_report.png')
-        plt.savefig(path, dpi=300, bbox_inches='tight')
-        plt.close()
+class PlotExport:
+    """Handle on a running export; the figures are complete once wait() returns"""
 
-    def generate_all(self):
-        self.plot_waiting_time()
-        self.plot_counter_performance()
-        self.plot_summary_dashboard()
-        print(f"Plots exported to directory: {self.output_dir}")
+    def __init__(self, futures, output_dir, executor=None):
+        self.futures = futures
+        self.output_dir = output_dir
+        self.executor = executor
+        self.paths = None
 
+    def done(self):
+        return all(future.done() for future in self.futures)
+
+    def wait(self):
+        if self.paths is None:
+            self.paths = [future.result() for future in self.futures]
+            if self.executor is not None:
+                self.executor.shutdown()
+            print(f"Plots exported to directory: {self.output_dir}")
+        return self.paths
+
+
+class _Completed:
+    """Future-like wrapper for a figure rendered in this process"""
+
+    def __init__(self, value):
+        self.value = value
+
+    def done(self):
+        return True
+
+    def result(self):
+        return self.value
+
+
+class SimulationVisualizer:
+    def __init__(self, analyzer, output_dir: str = "visualize", dpi: int = 300,
+                 fmt: str = "png", max_workers: Optional[int] = None):
+        self.analyzer = analyzer
+        self.output_dir = output_dir
+        self.dpi = dpi
+        self.fmt = fmt
+        self.max_workers = max_workers
+        self.export = None
+        os.makedirs(output_dir, exist_ok=True)
+
+    def _path(self, name):
+        return os.path.join(self.output_dir, f"{name}.{self.fmt}")
+
+    def plot_jobs(self):
+        # (render function, arguments) pairs; only plain data crosses into worker processes
+        jobs = []
+        if len(self.analyzer.waiting_times):
+            jobs.append((render_waiting_time, (self.analyzer.waiting_times, self._path('waiting_time'), self.dpi)))
+
+        labels = [f"Counter {c.id}" for c in self.analyzer.counters]
+        jobs.append((render_counter_performance,
+                     (labels, self.analyzer.counter_utilization(), self._path('counter_performance'), self.dpi)))
+        jobs.append((render_summary_dashboard,
+                     (self.analyzer.get_essential_report(), self._path('summary_report'), self.dpi)))
+        return jobs
+
+    def plot_waiting_time(self, save_path: Optional[str] = None):
+        if len(self.analyzer.waiting_times) == 0:
+            return
+        return render_waiting_time(self.analyzer.waiting_times, save_path or self._path('waiting_time'), self.dpi)
+
+    def plot_counter_performance(self, save_path: Optional[str] = None):
+        labels = [f"Counter {c.id}" for c in self.analyzer.counters]
+        return render_counter_performance(labels, self.analyzer.counter_utilization(),
+                                          save_path or self._path('counter_performance'), self.dpi)
+
+    def plot_summary_dashboard(self, save_path: Optional[str] = None):
+        return render_summary_dashboard(self.analyzer.get_essential_report(),
+                                        save_path or self._path('summary_report'), self.dpi)
+
+    def generate_all(self, wait: bool = True) -> PlotExport:
+        # One worker process per figure; max_workers=0 renders everything in this process
+        jobs = self.plot_jobs()
+        workers = min(len(jobs), self.max_workers if self.max_workers is not None else len(jobs))
+
+        if workers == 0:
+            self.export = PlotExport([_Completed(render(*args)) for render, args in jobs], self.output_dir)
+        else:
+            executor = ProcessPoolExecutor(max_workers=workers)
+            futures = [executor.submit(render, *args) for render, args in jobs]
+            self.export = PlotExport(futures, self.output_dir, executor)
+
+        if wait:
+            self.export.wait()
+        return self.export
+
+    def wait(self):
+        return self.export.wait() if self.export is not None else []
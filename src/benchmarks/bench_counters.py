@@ -0,0 +1,71 @@
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import SimulationSettings
+from simulation.environment import SimulationEnvironment
+from simulation.runner import simulate
+
+
+def linear_scan(counter_list):
+    # The previous lookup: first counter that is not busy
+    for counter in counter_list:
+        if not counter.is_busy:
+            return counter
+    return counter_list[0]
+
+
+def time_lookups(counters, operations):
+    settings = SimulationSettings()
+    settings.NUMBER_OF_COUNTERS = counters
+    sim_env = SimulationEnvironment(settings)
+
+    # Keep all but the last counter busy: the worst case for the scan
+    held = [sim_env.get_available_counter() for _ in range(counters - 1)]
+    for counter in held:
+        counter.is_busy = True
+
+    start = time.perf_counter()
+    for _ in range(operations):
+        counter = sim_env.get_available_counter()
+        sim_env.release_counter(counter)
+    pool = (time.perf_counter() - start) / operations
+
+    start = time.perf_counter()
+    for _ in range(operations):
+        linear_scan(sim_env.counter_list)
+    scan = (time.perf_counter() - start) / operations
+    return pool, scan
+
+
+def time_simulation(counters, patients=20_000):
+    settings = SimulationSettings()
+    settings.NUMBER_OF_COUNTERS = counters
+    # Scale demand with the hall size so utilization stays around 85%
+    settings.ARRIVAL_INTERVAL_MEAN = settings.SERVICE_TIME_MEAN / (0.85 * counters)
+    settings.SIMULATION_TIME = patients * settings.ARRIVAL_INTERVAL_MEAN
+    settings.ENABLE_REALTIME_MONITORING = False
+    settings.SNAPSHOT_INTERVAL = 0
+
+    start = time.perf_counter()
+    sim_env, _ = simulate(settings)
+    elapsed = time.perf_counter() - start
+    return elapsed / len(sim_env.patients)
+
+
+def main(counter_counts=(3, 10, 50, 200), operations=100_000):
+    print("=" * 60)
+    print("IDLE COUNTER LOOKUP BENCHMARK")
+    print("=" * 60)
+    print(f"{'Counters':>8} {'Pool (ns)':>12} {'Scan (ns)':>12} {'Sim (us/patient)':>18}")
+    for counters in counter_counts:
+        pool, scan = time_lookups(counters, operations)
+        per_patient = time_simulation(counters)
+        print(f"{counters:>8} {pool * 1e9:>12.0f} {scan * 1e9:>12.0f} {per_patient * 1e6:>18.1f}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
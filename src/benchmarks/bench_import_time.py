@@ -0,0 +1,59 @@
+import sys
+import os
+import subprocess
+import time
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Entry points measured, and the heavy libraries a headless run must not load
+IMPORTS = {
+    'headless CLI': 'import run_simulation',
+    'replications': 'import simulation.replication',
+    'sweep': 'import simulation.sweep',
+    'with plotting': 'import run_simulation, analytics.visualizer'
+}
+HEAVY_MODULES = ['matplotlib', 'seaborn', 'pandas']
+
+
+def import_time(statement):
+    # Cumulative microseconds reported by -X importtime for the top-level imports
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                            cwd=SRC_DIR, capture_output=True, text=True, check=True)
+    total = 0
+    for line in result.stderr.splitlines():
+        parts = line.split('|')
+        if len(parts) == 3 and not parts[2].startswith('  ') and parts[1].strip().isdigit():
+            total += int(parts[1])
+    return total / 1e6
+
+
+def startup_time(statement, repeat=5):
+    # Best-of wall time for a fresh interpreter, including interpreter start-up
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', statement], cwd=SRC_DIR, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def loaded_heavy_modules(statement):
+    check = f"{statement}; import sys; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, '-c', check], cwd=SRC_DIR,
+                            capture_output=True, text=True, check=True)
+    return result.stdout.strip() or '-'
+
+
+def main():
+    print("=" * 60)
+    print("IMPORT TIME BENCHMARK")
+    print("=" * 60)
+    print(f"{'Entry point':<16} {'importtime':>11} {'process':>10}  heavy modules loaded")
+    for name, statement in IMPORTS.items():
+        print(f"{name:<16} {import_time(statement):>9.3f} s {startup_time(statement):>8.3f} s  "
+              f"{loaded_heavy_modules(statement)}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import SimulationSettings
+from simulation.runner import simulate
+
+
+def full_scan_snapshot(sim_env):
+    # What periodic_snapshot used to do on every tick
+    return {
+        'queue_length': sim_env.current_queue_length,
+        'total_arrivals': len(sim_env.patients),
+        'total_served': sum(1 for p in sim_env.patients if p.service_end_time is not None)
+    }
+
+
+def time_per_call(func, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - start) / calls
+
+
+def main(horizons=(1_000, 10_000, 50_000), calls=2_000):
+    print("=" * 60)
+    print("SNAPSHOT COST BENCHMARK")
+    print("=" * 60)
+    print(f"{'Patients':>10} {'Incremental (us)':>18} {'Full scan (us)':>16}")
+
+    for horizon in horizons:
+        settings = SimulationSettings()
+        settings.SIMULATION_TIME = horizon
+        settings.NUMBER_OF_COUNTERS = 4
+        settings.ENABLE_REALTIME_MONITORING = False
+        settings.ENABLE_REALTIME_MONITOR = False
+        settings.SNAPSHOT_INTERVAL = 0
+        sim_env, monitor = simulate(settings)
+
+        incremental = time_per_call(monitor.take_snapshot, calls)
+        scan = time_per_call(lambda: full_scan_snapshot(sim_env), max(1, calls // 200))
+        print(f"{len(sim_env.patients):>10} {incremental * 1e6:>18.2f} {scan * 1e6:>16.1f}")
+
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
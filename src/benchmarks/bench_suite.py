@@ -0,0 +1,271 @@
+import sys
+import os
+import json
+import time
+import argparse
+import platform
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from config.settings import SimulationSettings
+from simulation.runner import simulate, build_analyzer
+from analytics.collector import StatisticsCollector
+
+BASELINE_FORMAT = 1
+PHASES = ['simulation', 'analyzer', 'collector', 'visualizer']
+
+# Metrics compared against a baseline: True when higher is better
+METRICS = {
+    'wall_time': False,
+    'simulation': False,
+    'analyzer': False,
+    'collector': False,
+    'visualizer': False,
+    'events_per_second': True,
+    'peak_rss_mb': False
+}
+
+# Differences below these are timer or allocator noise, never regressions
+MIN_TIME_CHANGE = 0.005
+MIN_RSS_CHANGE = 2.0
+
+SCALES = {
+    'full': {'patients': (2_000, 20_000, 100_000), 'counters': (3, 10, 50, 200), 'snapshot': (0, 10, 1, 0.1)},
+    'quick': {'patients': (1_000, 5_000), 'counters': (3, 20), 'snapshot': (0, 1)}
+}
+
+
+def scenario_settings(patients, counters=4, snapshot_interval=0, utilization=0.85):
+    # Demand scales with the counters so the load stays comparable; the horizon sets the patient count
+    settings = SimulationSettings()
+    settings.NUMBER_OF_COUNTERS = counters
+    settings.ARRIVAL_INTERVAL_MEAN = settings.SERVICE_TIME_MEAN / (utilization * counters)
+    settings.SIMULATION_TIME = patients * settings.ARRIVAL_INTERVAL_MEAN
+    settings.SNAPSHOT_INTERVAL = snapshot_interval
+    settings.ENABLE_REALTIME_MONITORING = False
+    settings.ENABLE_REALTIME_MONITOR = False
+    settings.CHECKPOINT_PATH = None
+    settings.EVENT_LOG_PATH = None
+    return settings
+
+
+def scenarios(scale='full'):
+    # (name, scenario_settings arguments) along each scaling axis
+    axes = SCALES[scale]
+    base = axes['patients'][len(axes['patients']) // 2]
+    result = [(f"patients={n}", {'patients': n}) for n in axes['patients']]
+    result += [(f"counters={c}", {'patients': base, 'counters': c}) for c in axes['counters']]
+    result += [(f"snapshot={s}", {'patients': base, 'snapshot_interval': s}) for s in axes['snapshot']]
+    return result
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+
+def run_scenario(params, engine='simpy', plots=True):
+    settings = scenario_settings(**params)
+    settings.SIMULATION_ENGINE = engine
+    phases = {}
+
+    start = time.perf_counter()
+    sim_env, monitor = simulate(settings)
+    phases['simulation'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    analyzer = build_analyzer(sim_env, monitor, settings)
+    analyzer.get_essential_report()
+    analyzer.counter_utilization()
+    phases['analyzer'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    collector = StatisticsCollector()
+    collector.collect_from_patients(sim_env.patients, analyzer.warmup_time, analyzer.class_names)
+    collector.collect_from_counters(sim_env.counter_list, settings.SIMULATION_TIME, analyzer.warmup_time)
+    collector.collect_from_queue_snapshots(monitor.queue_snapshots if monitor is not None else None,
+                                           analyzer.warmup_time)
+    collector.get_data_summary()
+    phases['collector'] = time.perf_counter() - start
+
+    if plots:
+        # Rendered in this process so the phase time and peak RSS include it
+        from analytics.visualizer import SimulationVisualizer
+        with tempfile.TemporaryDirectory() as output_dir:
+            start = time.perf_counter()
+            visualizer = SimulationVisualizer(analyzer, output_dir, dpi=settings.PLOT_DPI,
+                                              fmt=settings.PLOT_FORMAT, max_workers=0)
+            for render, args in visualizer.plot_jobs():
+                render(*args)
+            phases['visualizer'] = time.perf_counter() - start
+
+    events = monitor.events_log.total_events if monitor is not None else None
+    return {
+        'params': params,
+        'patients': len(sim_env.patients),
+        'events': events,
+        'wall_time': sum(phases.values()),
+        'phases': phases,
+        'events_per_second': events / phases['simulation'] if events else None,
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+
+def best_of(runs):
+    # Best value of each metric over the repeats: the least disturbed measurement
+    best = dict(runs[0])
+    best['phases'] = {phase: min(run['phases'][phase] for run in runs) for phase in runs[0]['phases']}
+    best['wall_time'] = min(run['wall_time'] for run in runs)
+    if best['events_per_second'] is not None:
+        best['events_per_second'] = max(run['events_per_second'] for run in runs)
+    if best['peak_rss_mb'] is not None:
+        best['peak_rss_mb'] = min(run['peak_rss_mb'] for run in runs)
+    return best
+
+
+def run_suite(scale='full', repeat=3, engine='simpy', plots=True, progress=print):
+    # Every run gets a fresh spawned interpreter, so peak RSS is per scenario
+    results = {}
+    context = get_context('spawn')
+    for name, params in scenarios(scale):
+        runs = []
+        for _ in range(repeat):
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                runs.append(executor.submit(run_scenario, params, engine, plots).result())
+        results[name] = best_of(runs)
+        if progress:
+            progress(format_result(name, results[name]))
+
+    return {
+        'format': BASELINE_FORMAT,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'machine': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'processor': platform.processor() or platform.machine(),
+            'cpus': os.cpu_count()
+        },
+        'config': {'scale': scale, 'repeat': repeat, 'engine': engine, 'plots': plots},
+        'results': results
+    }
+
+
+def metric_value(result, metric):
+    return result['phases'].get(metric) if metric in PHASES else result.get(metric)
+
+
+def compare_results(baseline, current, tolerance=0.10):
+    # One row per (scenario, metric) measured in both runs; a regression is a change
+    # in the bad direction beyond the relative tolerance and the absolute noise floor
+    rows = []
+    for name, result in current['results'].items():
+        if name not in baseline['results']:
+            continue
+        # Totals only mean the same thing when both runs measured the same phases
+        same_phases = set(result['phases']) == set(baseline['results'][name]['phases'])
+        for metric, higher_is_better in METRICS.items():
+            if metric in ('wall_time', 'peak_rss_mb') and not same_phases:
+                continue
+            before = metric_value(baseline['results'][name], metric)
+            after = metric_value(result, metric)
+            if before is None or after is None or before <= 0:
+                continue
+
+            change = (after - before) / before
+            worse = -change if higher_is_better else change
+            if metric == 'peak_rss_mb':
+                noise = abs(after - before) < MIN_RSS_CHANGE
+            elif metric == 'events_per_second':
+                # A rate over the simulation phase, so it takes that phase's time floor
+                simulation_change = result['phases']['simulation'] - baseline['results'][name]['phases']['simulation']
+                noise = abs(simulation_change) < MIN_TIME_CHANGE
+            else:
+                noise = abs(after - before) < MIN_TIME_CHANGE
+            rows.append({
+                'scenario': name,
+                'metric': metric,
+                'baseline': before,
+                'current': after,
+                'change': change,
+                'regression': worse > tolerance and not noise
+            })
+    return rows
+
+
+def format_result(name, result):
+    phases = ' '.join(f"{phase}={seconds:.3f}s" for phase, seconds in result['phases'].items())
+    rate = f"{result['events_per_second'] / 1000:.1f}k ev/s" if result['events_per_second'] else "- ev/s"
+    rss = f"{result['peak_rss_mb']:.0f} MB" if result['peak_rss_mb'] is not None else "- MB"
+    return f"  {name:<18} {result['patients']:>8} patients  {rate:>12}  {rss:>7}  {phases}"
+
+
+def print_comparison(rows, tolerance):
+    print(f"\n{'Scenario':<18} {'Metric':<18} {'Baseline':>12} {'Current':>12} {'Change':>9}")
+    for row in rows:
+        flag = "  REGRESSION" if row['regression'] else ""
+        print(f"{row['scenario']:<18} {row['metric']:<18} {row['baseline']:>12.4g} "
+              f"{row['current']:>12.4g} {row['change']:>+8.1%}{flag}")
+    regressions = sum(row['regression'] for row in rows)
+    print(f"\n{regressions} regression(s) beyond {tolerance:.0%}")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Simulation performance benchmark suite")
+    parser.add_argument("--quick", action="store_true", help="small scaling curves for a fast check")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per scenario; the best is kept")
+    parser.add_argument("--engine", default="simpy", help="SIMULATION_ENGINE to benchmark")
+    parser.add_argument("--no-plots", action="store_true", help="skip the visualizer phase")
+    parser.add_argument("--save", default=None, help="write the results as a JSON baseline")
+    parser.add_argument("--compare", default=None, help="compare against a saved JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="relative slow-down that counts as a regression")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    print("=" * 60)
+    print("PERFORMANCE BENCHMARK SUITE")
+    print("=" * 60)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get('format') != BASELINE_FORMAT:
+            raise SystemExit(f"Unsupported baseline format: {baseline.get('format')}")
+        if baseline['machine'].get('platform') != platform.platform():
+            print(f"Warning: baseline was recorded on {baseline['machine'].get('platform')}")
+
+    # A comparison reruns the baseline's own configuration unless overridden
+    config = baseline['config'] if baseline else {}
+    scale = 'quick' if args.quick else config.get('scale', 'full')
+    results = run_suite(scale, args.repeat, config.get('engine', args.engine),
+                        plots=not args.no_plots and config.get('plots', True))
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline saved to: {args.save}")
+
+    if baseline is not None:
+        regressions = print_comparison(compare_results(baseline, results, args.tolerance), args.tolerance)
+        print("=" * 60)
+        sys.exit(1 if regressions else 0)
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,50 @@
 class SimulationSettings:
     ARRIVAL_INTERVAL_MEAN = 3.0  # Mean time between customer arrivals in minutes
     ARRIVAL_DISTRIBUTION = "exponential"  # Distribution type for arrivals
+    ARRIVAL_RATE_SCHEDULE = None  # [(start_minute, patients_per_minute), ...] overriding ARRIVAL_INTERVAL_MEAN
 
     SERVICE_TIME_MEAN = 10.0  # Mean service time in minutes
     SERVICE_TIME_STD = 2.0  # Standard deviation for service time (if using normal distribution)
     SERVICE_TIME_DISTRIBUTION = "normal"  # Distribution type for service times
 
     NUMBER_OF_COUNTERS = 3  # Number of service counters
+    PATIENT_CLASSES = None  # [(name, share), ...] triage classes, most urgent first, e.g. [("urgent", 0.2), ("routine", 0.8)]
+    COUNTER_CLASSES = None  # {counter_id: [class names]} for counters restricted to some classes (event engine)
+    STATIONS = None  # {name: {"counters", "service_mean", "service_std", "distribution", "routes": {station: probability}}}, entered at the first; see README
+    STAFFING_SCHEDULE = None  # [(start_minute, open_counters), ...], at most NUMBER_OF_COUNTERS open
+    SCHEDULE_PERIOD = 1440  # Arrival and staffing schedules repeat every period (1440 = day, 10080 = week)
     SIMULATION_TIME = 480
-    WARMUP_TIME = 20
+    WARMUP_TIME = 20  # Minutes discarded from all statistics while the system fills up
+    AUTO_WARMUP = False  # Detect the warm-up period with MSER-5 instead of using WARMUP_TIME
+    SIMULATION_ENGINE = "simpy"  # "simpy", "event" (heapq event loop) or "vectorized" (closed-form FIFO recursion)
 
     RANDOM_SEED = 36 # Seed for random number generation
+    RANDOM_BUFFER_SIZE = 4096  # Variates pre-drawn per block (0 = one numpy call per draw)
+    ANTITHETIC = False  # Mirror every variate (U -> 1 - U); the antithetic partner of the same seed
 
     ENABLE_REALTIME_MONITORING = True  # Enable or disable real-time monitoring
     ENABLE_REALTIME_MONITOR = True  # Alias for ENABLE_REALTIME_MONITORING (for monitor compatibility)
-    SNAPSHOT_INTERVAL = 1.0  # Interval for periodic snapshots in minutes
-    EXPORT_FORMAT = ["csv", "json"]  # Formats for exporting results
\ No newline at end of file
+    MONITOR_SAMPLE_EVERY = 1  # Report every Nth arrival when real-time monitoring is enabled
+    MONITOR_MIN_INTERVAL = 0.0  # Minimum wall-clock seconds between real-time reports (0 = no limit)
+    STREAMING_STATISTICS = True  # Keep constant-memory running statistics as patients finish
+    SNAPSHOT_INTERVAL = 0  # Minutes between periodic snapshots (0 = none; time averages are exact without them)
+    EVENT_LOG_CAPACITY = 65536  # Events held in memory (oldest are dropped unless spilling)
+    EVENT_LOG_PATH = None  # Stream full event chunks to this .npy file instead of dropping them
+    CHECKPOINT_PATH = None  # Save the run state here (runs on the event engine); resume with --resume
+    CHECKPOINT_INTERVAL = 1440  # Simulated minutes between checkpoints (also saved on SIGINT/SIGTERM)
+    EXPORT_FORMAT = ["csv", "json"]  # Formats for exporting results ("csv", "json", "parquet" with pyarrow)
+    EXPORT_DIR = None  # When set, every replication writes its own result files here
+    EXPORT_COMPRESSION = None  # "gzip" to compress CSV/JSON exports
+    EXPORT_CHUNK_SIZE = 65536  # Rows written per chunk
+    PLOT_DPI = 300  # Resolution of exported charts
+    PLOT_FORMAT = "png"  # Chart file format ("png", "svg", "pdf", ...)
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in dir(self) if name.isupper()}
+
+    @classmethod
+    def from_dict(cls, values):
+        settings = cls()
+        for name, value in values.items():
+            setattr(settings, name, value)
+        return settings
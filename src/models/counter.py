@@ -16,7 +16,7 @@ class Counter:
         patient.assigned_counter = self.id
 
     def end_service(self, current_time):
-        if self.service_start_time:
+        if self.service_start_time is not None:
             duration = current_time - self.service_start_time
             self.total_busy_time += duration
             self.total_patients_served += 1
@@ -25,6 +25,15 @@ class Counter:
         self.current_patient = None
         self.service_start_time = None
 
+    def reset_statistics(self, current_time):
+        # End of warm-up: forget totals, but keep the service in progress and only
+        # count its busy time from now on
+        self.total_patients_served = 0
+        self.total_busy_time = 0.0
+        self.total_idle_time = 0.0
+        if self.is_busy:
+            self.service_start_time = current_time
+
     def calculate_utilization(self, total_time):
         if total_time > 0:
             return (self.total_busy_time / total_time) * 100.0
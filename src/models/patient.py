@@ -13,15 +13,17 @@ class Patient:
         self.waiting_time = None
         self.service_time = None
         self.total_time_in_system = None
+        self.service_demand = None  # Service time drawn on arrival
 
         self.assigned_counter = None
+        self.priority = 0  # Triage class index, 0 = most urgent
 
     def calculate_metrics(self):
-        if self.service_start_time and self.queue_join_time:
+        if self.service_start_time is not None and self.queue_join_time is not None:
             self.waiting_time = self.service_start_time - self.queue_join_time
-        if self.service_end_time and self.service_start_time:
+        if self.service_end_time is not None and self.service_start_time is not None:
             self.service_time = self.service_end_time - self.service_start_time
-        if self.service_end_time and self.arrival_time:
+        if self.service_end_time is not None and self.arrival_time is not None:
             self.total_time_in_system = self.service_end_time - self.arrival_time
 
     def to_dict(self):
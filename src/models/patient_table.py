@@ -0,0 +1,186 @@
+import numpy as np
+
+from models.patient import Patient
+
+TIME_FIELDS = (
+    'arrival_time',
+    'queue_join_time',
+    'service_start_time',
+    'service_end_time',
+    'waiting_time',
+    'service_time',
+    'total_time_in_system',
+    'service_demand'
+)
+
+
+def _time_field(name):
+    # Missing values are stored as NaN and surface as None, like on Patient
+    def fget(self):
+        value = self._table.columns[name][self._index]
+        return None if value != value else float(value)
+
+    def fset(self, value):
+        self._table.columns[name][self._index] = np.nan if value is None else value
+        self._table.version += 1
+
+    return property(fget, fset)
+
+
+class PatientRecord:
+    """Row view into a PatientTable exposing the Patient attribute API"""
+    __slots__ = ('_table', '_index')
+
+    def __init__(self, table, index):
+        self._table = table
+        self._index = index
+
+    @property
+    def id(self):
+        return int(self._table.columns['id'][self._index])
+
+    @property
+    def assigned_counter(self):
+        counter_id = self._table.columns['assigned_counter'][self._index]
+        return int(counter_id) if counter_id > 0 else None
+
+    @assigned_counter.setter
+    def assigned_counter(self, counter_id):
+        self._table.columns['assigned_counter'][self._index] = 0 if counter_id is None else counter_id
+        self._table.version += 1
+
+    @property
+    def priority(self):
+        return int(self._table.columns['priority'][self._index])
+
+    @priority.setter
+    def priority(self, patient_class):
+        self._table.columns['priority'][self._index] = patient_class
+        self._table.version += 1
+
+    def calculate_metrics(self):
+        self._table.calculate_metrics(slice(self._index, self._index + 1))
+
+    to_dict = Patient.to_dict
+
+
+for _name in TIME_FIELDS:
+    setattr(PatientRecord, _name, _time_field(_name))
+
+
+class PatientTable:
+    def __init__(self, capacity=1024):
+        self.size = 0
+        self.capacity = max(int(capacity), 1)
+        # Bumped on every change made through the table API, so derived results can be
+        # cached; writes straight into column() views must be followed by calculate_metrics()
+        self.version = 0
+        self.columns = {
+            'id': np.zeros(self.capacity, dtype=np.int64),
+            'assigned_counter': np.zeros(self.capacity, dtype=np.int64),
+            'priority': np.zeros(self.capacity, dtype=np.int64)
+        }
+        for name in TIME_FIELDS:
+            self.columns[name] = np.full(self.capacity, np.nan)
+
+    def _grow(self, min_capacity):
+        capacity = self.capacity
+        while capacity < min_capacity:
+            capacity *= 2
+
+        for name, column in self.columns.items():
+            fill = np.nan if column.dtype.kind == 'f' else 0
+            grown = np.full(capacity, fill, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            self.columns[name] = grown
+        self.capacity = capacity
+
+    def add(self, arrival_time):
+        if self.size == self.capacity:
+            self._grow(self.size + 1)
+
+        index = self.size
+        Patient._id_counter += 1
+        self.columns['id'][index] = Patient._id_counter
+        self.columns['arrival_time'][index] = arrival_time
+        self.columns['queue_join_time'][index] = arrival_time
+        self.size += 1
+        self.version += 1
+        return PatientRecord(self, index)
+
+    def extend(self, other):
+        # Append the rows of another table, keeping their ids
+        n = len(other)
+        if self.size + n > self.capacity:
+            self._grow(self.size + n)
+        for name, column in self.columns.items():
+            column[self.size:self.size + n] = other.columns[name][:n]
+        self.size += n
+        self.version += 1
+
+    def copy(self):
+        table = PatientTable(capacity=self.size)
+        table.extend(self)
+        return table
+
+    def column(self, name):
+        return self.columns[name][:self.size]
+
+    def calculate_metrics(self, rows=slice(None)):
+        # NaN propagates, so metrics stay missing until both endpoints are known
+        start = self.columns['service_start_time'][rows]
+        end = self.columns['service_end_time'][rows]
+        self.columns['waiting_time'][rows] = start - self.columns['queue_join_time'][rows]
+        self.columns['service_time'][rows] = end - start
+        self.columns['total_time_in_system'][rows] = end - self.columns['arrival_time'][rows]
+        self.version += 1
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError("patient index out of range")
+        return PatientRecord(self, index)
+
+    def __iter__(self):
+        for index in range(self.size):
+            yield PatientRecord(self, index)
+
+    @classmethod
+    def from_columns(cls, arrival_time, service_start_time, service_end_time, assigned_counter,
+                     service_demand=None, priority=None):
+        n = len(arrival_time)
+        table = cls(capacity=n)
+        table.size = n
+
+        first_id = Patient._id_counter + 1
+        Patient._id_counter += n
+        table.columns['id'][:n] = np.arange(first_id, first_id + n)
+        table.columns['arrival_time'][:n] = arrival_time
+        table.columns['queue_join_time'][:n] = arrival_time
+        table.columns['service_start_time'][:n] = service_start_time
+        table.columns['service_end_time'][:n] = service_end_time
+        table.columns['assigned_counter'][:n] = assigned_counter
+        if service_demand is not None:
+            table.columns['service_demand'][:n] = service_demand
+        if priority is not None:
+            table.columns['priority'][:n] = priority
+        table.calculate_metrics(slice(0, n))
+        return table
+
+    @classmethod
+    def from_patients(cls, patients):
+        if isinstance(patients, cls):
+            return patients
+
+        n = len(patients)
+        table = cls(capacity=n)
+        table.size = n
+        for name in ('id', 'assigned_counter', 'priority') + TIME_FIELDS:
+            values = [getattr(p, name) for p in patients]
+            fill = np.nan if name in TIME_FIELDS else 0
+            table.columns[name][:n] = [fill if v is None else v for v in values]
+        return table
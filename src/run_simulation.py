@@ -1,28 +1,29 @@
 import sys
 import os
+import argparse
+import json
 from datetime import datetime
 from contextlib import contextmanager
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from config.settings import SimulationSettings
-from simulation.environment import SimulationEnvironment
-from simulation.monitor import SimulationMonitor
-from simulation.process import SimulationProcess
-from analytics.analyzer import SimulationAnalyzer
-from analytics.visualizer import SimulationVisualizer
+from utils.log_writer import BackgroundLogWriter
+from simulation.runner import simulate, resume, build_analyzer
+from analytics.queueing_theory import analytic_estimate
+from simulation.replication import (run_replications, run_until_precision, compare_scenarios,
+                                    print_replication_summary, print_comparison_summary)
 
 
 class TeeOutput:
-    """Class to write output to both console and file"""
+    """Class to write output to both console and file (file I/O runs on a background thread)"""
     def __init__(self, file_path):
-        self.file = open(file_path, 'w', encoding='utf-8')
+        self.file = BackgroundLogWriter(file_path)
         self.stdout = sys.stdout
         
     def write(self, text):
         self.stdout.write(text)
         self.file.write(text)
-        self.file.flush()
         
     def flush(self):
         self.stdout.flush()
@@ -44,7 +45,9 @@ def log_to_file(file_path):
         tee.close()
 
 
-def run_simulation(settings=None):
+def run_simulation(settings=None, plots=True, resume_from=None):
+    if resume_from is not None:
+        return resume_simulation(resume_from, plots)
     if settings is None:
         settings = SimulationSettings()
     
@@ -58,45 +61,158 @@ def run_simulation(settings=None):
     print(f"  - Arrival interval mean: {settings.ARRIVAL_INTERVAL_MEAN} minutes")
     print(f"  - Service time mean: {settings.SERVICE_TIME_MEAN} minutes")
     print(f"  - Random seed: {settings.RANDOM_SEED}")
+    estimate = analytic_estimate(settings)
+    if estimate is not None:
+        note = " (unstable: the queue grows without bound)" if estimate['unstable'] else ""
+        print(f"  - Utilization rho: {estimate['utilization']:.3f}{note}")
     print("=" * 60)
     print("\nStarting simulation...\n")
 
-    sim_env = SimulationEnvironment(settings)
-    monitor = SimulationMonitor(sim_env, settings)
-    process = SimulationProcess(sim_env, settings, monitor)
-
-    sim_env.env.process(process.arrival_process())
-
-    if hasattr(settings, 'SNAPSHOT_INTERVAL') and settings.SNAPSHOT_INTERVAL > 0:
-        sim_env.env.process(monitor.periodic_snapshot())
-
     try:
-        sim_env.env.run(until=settings.SIMULATION_TIME)
+        sim_env, monitor = simulate(settings)
         print(f"\nSimulation completed at time: {sim_env.env.now:.2f} minutes")
     except Exception as e:
         print(f"\nError during simulation: {e}")
         raise
 
-    for patient in sim_env.patients:
-        if patient.service_end_time is None and patient.service_start_time is not None:
-            patient.service_end_time = sim_env.env.now
-            patient.calculate_metrics()
-        elif patient.service_end_time is None:
-            pass
+    return _analyze(sim_env, monitor, settings, plots)
 
-    analyzer = SimulationAnalyzer(
-        patients=sim_env.patients,
-        counters=sim_env.counter_list,
-        total_simulation_time=settings.SIMULATION_TIME
-    )
 
-    visualizer = SimulationVisualizer(analyzer, output_dir="output")
-    
+def run_network_simulation(settings):
+    # Imported here so single-station runs never load the network engine
+    from simulation.network import run_network
+
+    print("=" * 60)
+    print("HOSPITAL PATIENT PATHWAY SIMULATION")
+    print("=" * 60)
+    print(f"Stations: {', '.join(settings.STATIONS)} (patients enter at {next(iter(settings.STATIONS))})")
+    print(f"  - Simulation time: {settings.SIMULATION_TIME} minutes")
+    print(f"  - Warmup time: {settings.WARMUP_TIME} minutes")
+    print(f"  - Random seed: {settings.RANDOM_SEED}")
+    print("=" * 60)
+
+    process = run_network(settings)
+    print(f"\nSimulation completed at time: {process.env.now:.2f} minutes")
+    process.print_summary()
+    return process
+
+
+def resume_simulation(checkpoint_path, plots=True):
+    print("=" * 60)
+    print("HOSPITAL QUEUE SIMULATION")
+    print("=" * 60)
+    print(f"\nResuming from checkpoint: {checkpoint_path}\n")
+
+    sim_env, monitor = resume(checkpoint_path)
+    print(f"\nSimulation completed at time: {sim_env.env.now:.2f} minutes")
+    return _analyze(sim_env, monitor, sim_env.settings, plots)
+
+
+def _analyze(sim_env, monitor, settings, plots):
+    analyzer = build_analyzer(sim_env, monitor, settings)
+    if getattr(settings, 'AUTO_WARMUP', False):
+        print(f"Detected warm-up period: {analyzer.warmup_time:.2f} minutes")
+
+    if not plots:
+        return sim_env, monitor, analyzer, None
+
+    # Imported here so headless runs never load matplotlib
+    from analytics.visualizer import SimulationVisualizer
+
+    # Charts render in worker processes while the caller carries on; visualizer.wait() joins them
+    visualizer = SimulationVisualizer(analyzer, output_dir="output",
+                                      dpi=getattr(settings, 'PLOT_DPI', 300),
+                                      fmt=getattr(settings, 'PLOT_FORMAT', 'png'))
+    print("\nGenerating visualizations in the background...")
+    visualizer.generate_all(wait=False)
+
     return sim_env, monitor, analyzer, visualizer
 
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Hospital queue simulation")
+    parser.add_argument("--replications", type=int, default=1,
+                        help="number of independently seeded replications to run")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes for replications (default: CPU count)")
+    parser.add_argument("--confidence", type=float, default=0.95,
+                        help="confidence level for replication intervals")
+    parser.add_argument("--precision", type=float, default=None,
+                        help="keep adding replications until the relative CI half-width "
+                             "of the target metrics is below this (e.g. 0.05)")
+    parser.add_argument("--metrics", nargs='+', default=["average_waiting_time"],
+                        help="metrics the --precision target applies to")
+    parser.add_argument("--max-replications", type=int, default=200,
+                        help="replication budget for --precision mode")
+    parser.add_argument("--antithetic", action="store_true",
+                        help="run replications as antithetic pairs (intervals over pair means)")
+    parser.add_argument("--compare", nargs='+', metavar="SETTING=VALUE", default=None,
+                        help="compare against these setting changes on common random numbers, "
+                             "e.g. --compare NUMBER_OF_COUNTERS=4")
+    parser.add_argument("--no-plots", action="store_true",
+                        help="skip chart export (and the plotting imports)")
+    parser.add_argument("--no-export", action="store_true",
+                        help="skip writing result files in EXPORT_FORMAT")
+    parser.add_argument("--export-dir", default=None,
+                        help="directory for result files (default: output/); in replication "
+                             "mode, every replication writes its own files here")
+    parser.add_argument("--checkpoint", default=None,
+                        help="save the run state here every CHECKPOINT_INTERVAL minutes "
+                             "and on Ctrl+C")
+    parser.add_argument("--resume", default=None,
+                        help="continue a run from a checkpoint file (its settings are used)")
+    return parser.parse_args(argv)
+
+
+def parse_overrides(assignments):
+    overrides = {}
+    for assignment in assignments:
+        name, _, value = assignment.partition('=')
+        try:
+            overrides[name] = json.loads(value)
+        except json.JSONDecodeError:
+            overrides[name] = value
+    return overrides
+
+
+def run_replication_mode(settings, args):
+    if args.compare:
+        overrides = parse_overrides(args.compare)
+        replications = max(args.replications, 2)
+        print(f"Comparing {replications} replications with and without "
+              f"{', '.join(args.compare)} on common random numbers...")
+        result = compare_scenarios(settings, overrides, replications, args.workers,
+                                   args.confidence, antithetic=args.antithetic)
+        print_comparison_summary(result)
+        return result
+
+    if args.precision is not None:
+        print(f"Running replications until {', '.join(args.metrics)} reach "
+              f"{args.precision:.1%} relative precision (max {args.max_replications})...")
+        result = run_until_precision(
+            settings,
+            targets={metric: args.precision for metric in args.metrics},
+            confidence=args.confidence,
+            min_replications=max(args.replications, 2),
+            max_replications=args.max_replications,
+            max_workers=args.workers
+        )
+    else:
+        print(f"Running {args.replications} replications "
+              f"(seed {settings.RANDOM_SEED}, workers: {args.workers or os.cpu_count()})...")
+        result = run_replications(settings, args.replications, args.workers, args.confidence,
+                                  antithetic=args.antithetic)
+    print_replication_summary(result)
+    return result
+
+
+def main(argv=None):
+    args = parse_args(argv)
     settings = SimulationSettings()
+    if args.export_dir and not args.no_export:
+        settings.EXPORT_DIR = args.export_dir
+    if args.checkpoint:
+        settings.CHECKPOINT_PATH = args.checkpoint
 
     log_dir = "logs"
     os.makedirs(log_dir, exist_ok=True)
@@ -109,25 +225,42 @@ def main():
         print("=" * 60)
         
         try:
-            sim_env, monitor, analyzer, visualizer = run_simulation(settings)
+            if args.replications > 1 or args.precision is not None or args.compare:
+                run_replication_mode(settings, args)
+                print(f"\nLog saved to: {log_file_path}")
+                return
+
+            if settings.STATIONS and not args.resume:
+                run_network_simulation(settings)
+                print(f"\nLog saved to: {log_file_path}")
+                return
+
+            sim_env, monitor, analyzer, visualizer = run_simulation(settings, plots=not args.no_plots,
+                                                                    resume_from=args.resume)
+            settings = sim_env.settings
 
             print("\n")
             analyzer.print_summary()
 
-            print("\nGenerating visualizations...")
-            visualizer.generate_all()
+            if settings.EXPORT_FORMAT and not args.no_export:
+                from analytics.exporter import export_results
+                paths = export_results(sim_env, monitor, analyzer, settings, settings.EXPORT_DIR or "output")
+                print(f"\nResults exported: {', '.join(os.path.basename(path) for path in paths)}")
 
             print("\n" + "=" * 60)
             print("SIMULATION SUMMARY")
             print("=" * 60)
 
             print("\nCounter Details:")
-            for counter in sim_env.counter_list:
-                utilization = counter.calculate_utilization(settings.SIMULATION_TIME)
+            for counter, utilization in zip(sim_env.counter_list, analyzer.counter_utilization()):
                 print(f"  Counter {counter.id}: "
                       f"{counter.total_patients_served} patients served, "
                       f"{utilization:.2f}% utilization")
-            
+
+            if visualizer is not None:
+                print()
+                visualizer.wait()
+
             print("\n" + "=" * 60)
             print("Simulation completed successfully!")
             print("=" * 60)
@@ -135,6 +268,9 @@ def main():
             
         except KeyboardInterrupt:
             print("\n\nSimulation interrupted by user")
+            checkpoint_path = args.resume or settings.CHECKPOINT_PATH
+            if checkpoint_path:
+                print(f"Checkpoint saved to: {checkpoint_path} (continue with --resume {checkpoint_path})")
             print(f"\nPartial log saved to: {log_file_path}")
             sys.exit(1)
         except Exception as e:
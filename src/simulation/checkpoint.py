@@ -0,0 +1,153 @@
+import os
+import pickle
+from collections import deque
+
+import numpy as np
+
+from config.settings import SimulationSettings
+from models.patient import Patient
+from models.patient_table import PatientTable, PatientRecord
+from simulation.environment import SimulationEnvironment
+from simulation.monitor import SimulationMonitor
+from simulation.event_log import EventLog
+from simulation.fast_engine import EngineClock
+from simulation.event_engine import EventDrivenProcess
+
+CHECKPOINT_FORMAT = 3
+
+COUNTER_FIELDS = ('total_patients_served', 'total_busy_time', 'total_idle_time', 'is_busy', 'service_start_time')
+
+ENVIRONMENT_FIELDS = (
+    'current_queue_length', 'total_arrivals', 'total_served', 'in_service',
+    'queue_length_area', 'busy_counters_area', 'last_state_change', 'statistics_start',
+    'queue_length_over_time', '_idle_groups', '_idle_count'
+)
+
+
+def _index(patient):
+    return -1 if patient is None else patient._index
+
+
+def _snapshot_columns(snapshots):
+    # Columnar snapshots pickle far smaller than a list of dicts
+    if not snapshots:
+        return {}
+    return {name: np.array([row[name] for row in snapshots]) for name in snapshots[0]}
+
+
+def _snapshot_rows(columns):
+    names = list(columns)
+    return [dict(zip(names, row)) for row in zip(*(columns[name].tolist() for name in names))]
+
+
+def capture_state(process) -> dict:
+    # Everything needed to continue the run: patients are referred to by table row,
+    # in-service patients by their pending SERVICE_END events (end time = remaining service)
+    sim_env = process.sim_env
+    monitor = process.monitor
+    table = sim_env.patients
+    reporter = monitor.reporter
+
+    return {
+        'format': CHECKPOINT_FORMAT,
+        'settings': process.settings.to_dict(),
+        'now': sim_env.env.now,
+        'patient_id_counter': Patient._id_counter,
+        'patients': {name: column[:table.size].copy() for name, column in table.columns.items()},
+        'environment': {name: getattr(sim_env, name) for name in ENVIRONMENT_FIELDS},
+        'counters': [
+            {**{name: getattr(counter, name) for name in COUNTER_FIELDS},
+             'current_patient': _index(counter.current_patient)}
+            for counter in sim_env.counter_list
+        ],
+        'engine': {
+            'events': list(process.events),
+            'sequence': process.sequence,
+            'waiting': [[patient._index for patient in queue] for queue in process.waiting],
+            'in_service': [_index(patient) for patient in process.in_service],
+            'closed_counters': [counter.id for counter in process.closed_counters],
+            'pending_closures': process.pending_closures,
+            'staffing_step': process.staffing_step,
+            'staffing_target': process.staffing_target,
+            'until': process.until,
+            'next_checkpoint': process.next_checkpoint
+        },
+        'random': process.random_generator.get_state(),
+        'monitor': {
+            'queue_snapshots': _snapshot_columns(monitor.queue_snapshots),
+            'events_log': monitor.events_log.get_state(),
+            'reporter': None if reporter is None else (reporter.arrivals_seen, reporter.reports_written),
+            'statistics': monitor.statistics
+        }
+    }
+
+
+def restore_state(state) -> EventDrivenProcess:
+    if state.get('format') != CHECKPOINT_FORMAT:
+        raise ValueError(f"Unsupported checkpoint format: {state.get('format')}")
+
+    settings = SimulationSettings.from_dict(state['settings'])
+    sim_env = SimulationEnvironment(settings, env=EngineClock(state['now']))
+
+    # Built with spilling off, so the existing event file is reopened rather than truncated
+    monitor = SimulationMonitor(sim_env, SimulationSettings.from_dict({**state['settings'], 'EVENT_LOG_PATH': None}))
+    monitor.settings = settings
+    monitor.events_log = EventLog.from_state(state['monitor']['events_log'])
+    monitor.queue_snapshots = _snapshot_rows(state['monitor']['queue_snapshots'])
+    monitor.statistics = state['monitor']['statistics']
+    if monitor.reporter is not None and state['monitor']['reporter'] is not None:
+        monitor.reporter.arrivals_seen, monitor.reporter.reports_written = state['monitor']['reporter']
+
+    patients = state['patients']
+    size = len(patients['id'])
+    table = PatientTable(capacity=max(size, 1))
+    for name, column in patients.items():
+        table.columns[name][:size] = column
+    table.size = size
+    sim_env.patients = table
+    Patient._id_counter = state['patient_id_counter']
+
+    def record(index):
+        return None if index < 0 else PatientRecord(table, index)
+
+    for name, value in state['environment'].items():
+        setattr(sim_env, name, value)
+    for counter, values in zip(sim_env.counter_list, state['counters']):
+        for name in COUNTER_FIELDS:
+            setattr(counter, name, values[name])
+        counter.current_patient = record(values['current_patient'])
+
+    process = EventDrivenProcess(sim_env, settings, monitor)
+    process.random_generator.set_state(state['random'])
+
+    engine = state['engine']
+    process.events = list(engine['events'])
+    process.sequence = engine['sequence']
+    process.waiting = [deque(record(index) for index in queue) for queue in engine['waiting']]
+    process.in_service = [record(index) for index in engine['in_service']]
+    process.closed_counters = [sim_env.counter_list[counter_id - 1] for counter_id in engine['closed_counters']]
+    process.pending_closures = engine['pending_closures']
+    process.staffing_step = engine['staffing_step']
+    process.staffing_target = engine['staffing_target']
+    process.until = engine['until']
+    process.next_checkpoint = engine['next_checkpoint']
+    return process
+
+
+def save_checkpoint(process, path):
+    # Pickled with live table rows only; written then renamed so a crash mid-write
+    # leaves the previous checkpoint intact
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(capture_state(process), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path) -> EventDrivenProcess:
+    # Checkpoints are pickles: only load files this simulator wrote
+    with open(path, 'rb') as f:
+        process = restore_state(pickle.load(f))
+    # Later checkpoints overwrite the file the run was resumed from
+    process.checkpoint_path = process.settings.CHECKPOINT_PATH = path
+    return process
+
@@ -1,20 +1,226 @@
+import bisect
+import heapq
+
 import simpy
 from models.counter import Counter
+from models.patient_table import PatientTable
+from utils.schedule import staffing_schedule
+from utils.triage import triage_classes
+
+class _BisectQueue(list):
+    """Request queue kept in key order by binary insertion
+
+    simpy's SortedQueue re-sorts the whole queue on every request, which is quadratic
+    once thousands of patients wait. The keys are kept in a parallel list, because
+    insort's key argument needs Python 3.10. bisect_right places equal keys after the
+    existing ones, the same FIFO tie order as the stable sort.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._keys = []
+
+    def append(self, item):
+        index = bisect.bisect_right(self._keys, item.key)
+        self._keys.insert(index, item.key)
+        self.insert(index, item)
+
+    def pop(self, index=-1):
+        del self._keys[index]
+        return super().pop(index)
+
+    def remove(self, item):
+        # Cancelled requests leave from wherever they are
+        self.pop(self.index(item))
+
+
+class IndexedPriorityResource(simpy.PriorityResource):
+    PutQueue = _BisectQueue
+
 
 class SimulationEnvironment:
-    def __init__(self, settings):
+    def __init__(self, settings, env=None):
         self.settings = settings
-        self.env = simpy.Environment()
 
-        self.counters = simpy.Resource(self.env, capacity=settings.NUMBER_OF_COUNTERS)
+        # Engines with their own event loop pass a clock exposing `now` instead of simpy;
+        # network stations pass the simpy environment they share
+        self.staffing = staffing_schedule(settings)
+        self.triage = triage_classes(settings)
+        if env is None or isinstance(env, simpy.Environment):
+            if self.triage is not None and self.triage.restricted:
+                raise ValueError("COUNTER_CLASSES needs the event engine")
+            self.env = env if env is not None else simpy.Environment()
+            # Triage classes and staffing changes (which take counters off duty) need priority requests
+            prioritized = self.staffing is not None or self.triage is not None
+            resource = IndexedPriorityResource if prioritized else simpy.Resource
+            self.counters = resource(self.env, capacity=settings.NUMBER_OF_COUNTERS)
+        else:
+            self.env = env
+            self.counters = None
         self.counter_list = [Counter(i + 1) for i in range(settings.NUMBER_OF_COUNTERS)]
 
-        self.patients = []
+        # Min-heaps of idle counter ids, one per group of counters serving the same patient
+        # classes: the lowest-numbered idle counter allowed for a class is served first.
+        # Without COUNTER_CLASSES there is a single group. Every granted resource request
+        # takes one id and every release returns it, so the heaps never run dry while the
+        # resource has capacity.
+        self._counters_by_id = {counter.id: counter for counter in self.counter_list}
+        allowed = {counter.id: self.triage.counter_classes[counter.id] if self.triage else (0,)
+                   for counter in self.counter_list}
+        groups = sorted(set(allowed.values()))
+        self._counter_group = {counter_id: groups.index(classes) for counter_id, classes in allowed.items()}
+        self._class_groups = [[g for g, classes in enumerate(groups) if patient_class in classes]
+                              for patient_class in range(len(self.triage.names) if self.triage else 1)]
+        self._idle_groups = [sorted(c for c, g in self._counter_group.items() if g == group)
+                             for group in range(len(groups))]
+        self._idle_count = len(self.counter_list)
+
+        # Off-duty counters are held by high-priority blocker requests: a busy counter
+        # finishes its patient first, and is never handed to a waiting patient
+        self._closures = []
+        self._closed_counters = {}
+
+        self.patients = PatientTable()
         self.queue_length_over_time = []
         self.current_queue_length = 0
 
-    def get_available_counter(self):
+        # Running counters kept up to date by SimulationProcess so that state
+        # queries never have to scan the patient table
+        self.total_arrivals = 0
+        self.total_served = 0
+        self.in_service = 0
+
+        # Time integrals of queue length and busy counters since statistics_start
+        # (time 0, or the end of the warm-up period)
+        self.queue_length_area = 0.0
+        self.busy_counters_area = 0.0
+        self.last_state_change = self.env.now
+        self.statistics_start = self.env.now
+
+    def _idle_group(self, patient_class):
+        # Group holding the lowest-numbered idle counter allowed for the class, or None
+        groups = self._class_groups[patient_class]
+        if len(groups) == 1:
+            return groups[0] if self._idle_groups[groups[0]] else None
+        best = None
+        for group in groups:
+            heap = self._idle_groups[group]
+            if heap and (best is None or heap[0] < self._idle_groups[best][0]):
+                best = group
+        return best
+
+    def get_available_counter(self, patient_class=0):
+        group = self._idle_group(patient_class)
+        if group is None:
+            raise RuntimeError("No idle counter although the counter resource granted a request")
+        self._idle_count -= 1
+        return self._counters_by_id[heapq.heappop(self._idle_groups[group])]
+
+    def has_idle_counter(self, patient_class=0):
+        return self._idle_group(patient_class) is not None
+
+    def release_counter(self, counter):
+        heapq.heappush(self._idle_groups[self._counter_group[counter.id]], counter.id)
+        self._idle_count += 1
+
+    @property
+    def idle_counters(self):
+        return self._idle_count
+
+    def close_idle_counter(self):
+        # Staffing changes are rare, so a linear search for the highest-numbered idle counter is fine
+        counter_id = max(max(heap) for heap in self._idle_groups if heap)
+        heap = self._idle_groups[self._counter_group[counter_id]]
+        heap.remove(counter_id)
+        heapq.heapify(heap)
+        self._idle_count -= 1
+        return self._counters_by_id[counter_id]
+
+    def _close_counter(self, request):
+        # Blocker granted; skip it if the counter was reopened before the grant was processed
+        if request in self._closures:
+            self._closed_counters[request] = self.close_idle_counter()
+
+    def set_open_counters(self, open_counters):
+        closures = len(self.counter_list) - open_counters
+
+        # Reopen the most recent closures first, cancelling blockers still waiting for a counter
+        while len(self._closures) > closures:
+            request = self._closures.pop()
+            counter = self._closed_counters.pop(request, None)
+            if counter is not None:
+                self.release_counter(counter)
+            if request.triggered:
+                self.counters.release(request)
+            else:
+                request.cancel()
+
+        while len(self._closures) < closures:
+            request = self.counters.request(priority=-1)
+            request.callbacks.append(self._close_counter)
+            self._closures.append(request)
+
+    def staffing_process(self):
+        for time, open_counters in self.staffing.changes():
+            if time > self.env.now:
+                yield self.env.timeout(time - self.env.now)
+            self.set_open_counters(open_counters)
+
+    def _accumulate(self):
+        now = self.env.now
+        elapsed = now - self.last_state_change
+        if elapsed > 0:
+            self.queue_length_area += self.current_queue_length * elapsed
+            self.busy_counters_area += self.in_service * elapsed
+            self.last_state_change = now
+
+    def patient_arrived(self):
+        self._accumulate()
+        self.total_arrivals += 1
+        self.current_queue_length += 1
+
+    def service_started(self):
+        self._accumulate()
+        self.current_queue_length -= 1
+        self.in_service += 1
+
+    def service_ended(self):
+        self._accumulate()
+        self.in_service -= 1
+        self.total_served += 1
+
+    def reset_statistics(self):
+        self._accumulate()
+        self.queue_length_area = 0.0
+        self.busy_counters_area = 0.0
+        self.statistics_start = self.env.now
         for counter in self.counter_list:
-            if not counter.is_busy:
-                return counter
-        return self.counter_list[0] if self.counter_list else None
+            counter.reset_statistics(self.env.now)
+
+    def warmup_process(self, warmup_time):
+        yield self.env.timeout(warmup_time)
+        self.reset_statistics()
+
+    def average_queue_length(self):
+        elapsed = self.env.now - self.last_state_change
+        area = self.queue_length_area + self.current_queue_length * elapsed
+        observed = self.env.now - self.statistics_start
+        return area / observed if observed > 0 else 0.0
+
+    def average_busy_counters(self):
+        elapsed = self.env.now - self.last_state_change
+        area = self.busy_counters_area + self.in_service * elapsed
+        observed = self.env.now - self.statistics_start
+        return area / observed if observed > 0 else 0.0
+
+    def average_number_in_system(self):
+        # Everyone present is either queueing or at a counter, so the areas add up exactly
+        return self.average_queue_length() + self.average_busy_counters()
+
+    def time_averages(self):
+        # Exact time-weighted means since statistics_start, integrated at every state change
+        return {
+            'average_queue_length': self.average_queue_length(),
+            'average_busy_counters': self.average_busy_counters(),
+            'average_number_in_system': self.average_number_in_system()
+        }
@@ -0,0 +1,224 @@
+import heapq
+import math
+import signal
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+from utils.generator import RandomGenerator
+
+# Event kinds, in the order simpy would process simultaneous events created at the same time
+ARRIVAL = 0
+SERVICE_END = 1
+WARMUP_END = 2
+SNAPSHOT = 3
+STAFFING = 4
+
+
+class EventDrivenProcess:
+    """Arrival/service logic of SimulationProcess on a heapq future-event list, without simpy"""
+
+    def __init__(self, sim_env, settings, monitor, random_generator=None):
+        self.sim_env = sim_env
+        self.env = sim_env.env
+        self.settings = settings
+        self.monitor = monitor
+        self.statistics = monitor.statistics
+        self.random_generator = random_generator or RandomGenerator(settings)
+
+        # Future-event list of (time, sequence, kind, counter_id); the sequence number
+        # breaks ties in scheduling order, as simpy does
+        self.events = []
+        self.sequence = 0
+
+        # One FIFO queue per triage class (a single queue without classes), and for each
+        # counter the classes it serves in priority order: picking the next patient looks
+        # at a few queue heads, however many patients are waiting
+        triage = sim_env.triage
+        self.waiting = [deque() for _ in (triage.names if triage is not None else [None])]
+        self.serves = [()] + [triage.counter_classes[counter.id] if triage is not None else (0,)
+                              for counter in sim_env.counter_list]
+
+        # Preallocated per-counter slots hold the patient being served
+        self.in_service = [None] * (len(sim_env.counter_list) + 1)
+
+        # Off-duty counters, and closures waiting for a busy counter to finish its patient
+        self.closed_counters = []
+        self.pending_closures = 0
+        self.staffing_step = 0
+        self.staffing_target = None
+
+        self.until = None
+        self.snapshot_interval = getattr(settings, 'SNAPSHOT_INTERVAL', 0) or 0
+
+        # Checkpoints are taken between events, every CHECKPOINT_INTERVAL simulated minutes,
+        # and when SIGINT/SIGTERM asks the run to stop
+        self.checkpoint_path = getattr(settings, 'CHECKPOINT_PATH', None)
+        interval = getattr(settings, 'CHECKPOINT_INTERVAL', 0) or 0
+        self.checkpoint_interval = interval if self.checkpoint_path else 0
+        self.next_checkpoint = interval if self.checkpoint_interval > 0 else math.inf
+        self.stop_requested = False
+
+    def schedule(self, time, kind, counter_id=0):
+        heapq.heappush(self.events, (time, self.sequence, kind, counter_id))
+        self.sequence += 1
+
+    def arrival(self):
+        now = self.env.now
+        patient = self.sim_env.patients.add(now)
+        patient.service_demand = self.random_generator.get_service_time()
+        patient_class = self.random_generator.get_patient_class()
+        if patient_class:
+            patient.priority = patient_class
+        self.sim_env.patient_arrived()
+        self.monitor.record_arrival(patient)
+
+        self.schedule(now + self.random_generator.get_arrival_time(now), ARRIVAL)
+
+        if self.sim_env.has_idle_counter(patient_class):
+            self.start_service(patient, patient_class)
+        else:
+            self.waiting[patient_class].append(patient)
+
+    def start_service(self, patient, patient_class=0):
+        now = self.env.now
+        self.sim_env.service_started()
+
+        counter = self.sim_env.get_available_counter(patient_class)
+        counter.start_service(patient, now)
+        patient.service_start_time = now
+        self.monitor.record_service_start(patient, counter)
+
+        self.in_service[counter.id] = patient
+        self.schedule(now + patient.service_demand, SERVICE_END, counter.id)
+
+    def service_end(self, counter_id):
+        now = self.env.now
+        patient = self.in_service[counter_id]
+        self.in_service[counter_id] = None
+        counter = self.sim_env.counter_list[counter_id - 1]
+
+        patient.service_end_time = now
+        patient.calculate_metrics()
+        if self.statistics is not None:
+            self.statistics.record_patient(patient)
+
+        counter.end_service(now)
+        self.sim_env.release_counter(counter)
+        self.sim_env.service_ended()
+        self.monitor.record_service_end(patient, counter)
+
+        # A pending closure takes the freed counter before any waiting patient
+        if self.pending_closures:
+            self.pending_closures -= 1
+            self.closed_counters.append(self.sim_env.close_idle_counter())
+            return
+        for patient_class in self.serves[counter_id]:
+            queue = self.waiting[patient_class]
+            if queue:
+                self.start_service(queue.popleft(), patient_class)
+                break
+
+    def start_waiting(self):
+        # Hand idle counters to waiting patients, most urgent class first
+        for patient_class, queue in enumerate(self.waiting):
+            while queue and self.sim_env.has_idle_counter(patient_class):
+                self.start_service(queue.popleft(), patient_class)
+
+    def set_open_counters(self, open_counters):
+        # Same rules as SimulationEnvironment.set_open_counters, without blocker requests
+        closures = len(self.sim_env.counter_list) - open_counters
+        while len(self.closed_counters) + self.pending_closures > closures:
+            if self.pending_closures:
+                self.pending_closures -= 1
+            else:
+                self.sim_env.release_counter(self.closed_counters.pop())
+        while len(self.closed_counters) + self.pending_closures < closures:
+            if self.sim_env.idle_counters:
+                self.closed_counters.append(self.sim_env.close_idle_counter())
+            else:
+                self.pending_closures += 1
+
+        self.start_waiting()
+
+    def schedule_staffing(self):
+        # The step index (not a generator) tracks the schedule, so it survives a checkpoint
+        time, self.staffing_target = self.sim_env.staffing.change(self.staffing_step)
+        self.staffing_step += 1
+        self.schedule(time, STAFFING)
+
+    def start(self, until):
+        self.until = until
+
+        # Staffing first, so the opening hours apply before the first patient, as in the simpy engine
+        if self.sim_env.staffing is not None:
+            self.schedule_staffing()
+        self.schedule(self.random_generator.get_first_arrival_time(), ARRIVAL)
+
+        warmup_time = getattr(self.settings, 'WARMUP_TIME', 0) or 0
+        if 0 < warmup_time < until:
+            self.schedule(warmup_time, WARMUP_END)
+
+        if self.snapshot_interval > 0:
+            self.schedule(0.0, SNAPSHOT)
+
+    def run(self, until):
+        self.start(until)
+        self.advance()
+
+    def save_checkpoint(self):
+        from simulation.checkpoint import save_checkpoint
+        save_checkpoint(self, self.checkpoint_path)
+
+    @contextmanager
+    def _stop_signals(self):
+        # Turn SIGINT/SIGTERM into a request to stop at the next event boundary, where the
+        # state is consistent enough to checkpoint
+        if not self.checkpoint_path or threading.current_thread() is not threading.main_thread():
+            yield
+            return
+
+        def request_stop(signum, frame):
+            self.stop_requested = True
+
+        previous = {signum: signal.signal(signum, request_stop) for signum in (signal.SIGINT, signal.SIGTERM)}
+        try:
+            yield
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+
+    def advance(self):
+        # Process events up to the horizon; also the entry point when resuming from a checkpoint
+        events = self.events
+        heappop = heapq.heappop
+        until = self.until
+        snapshot_interval = self.snapshot_interval
+
+        with self._stop_signals():
+            while events and events[0][0] < until:
+                if self.stop_requested:
+                    self.save_checkpoint()
+                    raise KeyboardInterrupt(f"Checkpoint saved to {self.checkpoint_path}")
+                if events[0][0] >= self.next_checkpoint:
+                    while self.next_checkpoint <= events[0][0]:
+                        self.next_checkpoint += self.checkpoint_interval
+                    self.save_checkpoint()
+
+                time, _, kind, counter_id = heappop(events)
+                self.env.now = time
+
+                if kind == SERVICE_END:
+                    self.service_end(counter_id)
+                elif kind == ARRIVAL:
+                    self.arrival()
+                elif kind == SNAPSHOT:
+                    self.monitor.take_snapshot()
+                    self.schedule(time + snapshot_interval, SNAPSHOT)
+                elif kind == STAFFING:
+                    self.set_open_counters(self.staffing_target)
+                    self.schedule_staffing()
+                else:
+                    self.sim_env.reset_statistics()
+
+        self.env.now = until
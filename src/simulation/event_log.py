@@ -0,0 +1,162 @@
+import enum
+import struct
+
+import numpy as np
+
+
+class EventType(enum.IntEnum):
+    ARRIVAL = 0
+    SERVICE_START = 1
+    SERVICE_END = 2
+
+
+EVENT_NAMES = {event: event.name.lower() for event in EventType}
+
+EVENT_DTYPE = np.dtype([
+    ('time', '<f8'),
+    ('event', 'u1'),
+    ('patient_id', '<i8'),
+    ('counter_id', '<i4'),
+    ('queue_length', '<i4')
+])
+
+# Space reserved for the .npy header so the final record count can be written on close
+NPY_HEADER_SIZE = 256
+
+
+def _npy_header(count):
+    header = "{'descr': %r, 'fortran_order': False, 'shape': (%d,), }" % (
+        np.lib.format.dtype_to_descr(EVENT_DTYPE), count)
+    header_len = NPY_HEADER_SIZE - 10
+    if len(header) + 1 > header_len:
+        raise ValueError("event log header does not fit in the reserved space")
+    header = header.ljust(header_len - 1) + '\n'
+    return b'\x93NUMPY\x01\x00' + struct.pack('<H', header_len) + header.encode('latin1')
+
+
+class EventLog:
+    """Bounded event buffer: a ring of the most recent events, or chunks spilled to a .npy file"""
+
+    def __init__(self, capacity=65536, spill_path=None):
+        self.capacity = max(int(capacity), 1)
+        self.buffer = np.zeros(self.capacity, dtype=EVENT_DTYPE)
+        self.size = 0
+        self.start = 0
+
+        self.total_events = 0
+        self.dropped_events = 0
+        self.spilled_events = 0
+
+        self.spill_path = spill_path
+        self._file = None
+        if spill_path:
+            self._file = open(spill_path, 'wb')
+            self._file.write(_npy_header(0))
+
+    def append(self, time, event, patient_id, counter_id=0, queue_length=0):
+        if self.size < self.capacity:
+            index = (self.start + self.size) % self.capacity
+            self.size += 1
+        elif self._file is not None:
+            self._spill()
+            index = 0
+            self.size = 1
+        else:
+            # Ring mode: overwrite the oldest record
+            index = self.start
+            self.start = (self.start + 1) % self.capacity
+            self.dropped_events += 1
+
+        self.buffer[index] = (time, event, patient_id, counter_id, queue_length)
+        self.total_events += 1
+
+    def _spill(self):
+        self._file.write(self.buffer[:self.size].tobytes())
+        self.spilled_events += self.size
+        self.size = 0
+
+    def close(self):
+        if self._file is None:
+            return
+        if self.size:
+            self._spill()
+        self._file.seek(0)
+        self._file.write(_npy_header(self.spilled_events))
+        self._file.close()
+        self._file = None
+
+    def get_state(self):
+        if self._file is not None:
+            self._file.flush()
+        return {
+            'capacity': self.capacity,
+            'records': self.in_memory(),
+            'total_events': self.total_events,
+            'dropped_events': self.dropped_events,
+            'spilled_events': self.spilled_events,
+            'spill_path': self.spill_path
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        log = cls(capacity=state['capacity'])
+        records = state['records']
+        log.buffer[:len(records)] = records
+        log.size = len(records)
+        log.total_events = state['total_events']
+        log.dropped_events = state['dropped_events']
+        log.spilled_events = state['spilled_events']
+
+        # Reopen the spill file without truncating it, dropping anything written after the checkpoint
+        log.spill_path = state['spill_path']
+        if log.spill_path:
+            log._file = open(log.spill_path, 'r+b')
+            log._file.truncate(NPY_HEADER_SIZE + log.spilled_events * EVENT_DTYPE.itemsize)
+            log._file.seek(0, 2)
+        return log
+
+    def in_memory(self):
+        # Buffered records in chronological order
+        if self.start == 0:
+            return self.buffer[:self.size].copy()
+        return np.concatenate([self.buffer[self.start:], self.buffer[:self.start]])
+
+    def to_array(self):
+        if self.spill_path and self.spilled_events:
+            if self._file is not None:
+                self._file.flush()
+            spilled = np.fromfile(self.spill_path, dtype=EVENT_DTYPE,
+                                  count=self.spilled_events, offset=NPY_HEADER_SIZE)
+            return np.concatenate([spilled, self.in_memory()])
+        return self.in_memory()
+
+    def __len__(self):
+        return self.spilled_events + self.size
+
+    def __iter__(self):
+        return iter_event_dicts(self.to_array())
+
+
+def iter_event_dicts(records):
+    # Dict view of records, matching the format of the original in-memory log
+    for record in records:
+        event = EventType(int(record['event']))
+        entry = {
+            'time': float(record['time']),
+            'event': EVENT_NAMES[event],
+            'patient_id': int(record['patient_id'])
+        }
+        if event != EventType.ARRIVAL:
+            entry['counter_id'] = int(record['counter_id'])
+        entry['queue_length'] = int(record['queue_length'])
+        yield entry
+
+
+def read_event_log(path, mmap=True):
+    return np.load(path, mmap_mode='r' if mmap else None)
+
+
+def iter_event_chunks(path, chunk_size=65536):
+    records = read_event_log(path, mmap=True)
+    for offset in range(0, len(records), chunk_size):
+        yield np.asarray(records[offset:offset + chunk_size])
@@ -0,0 +1,130 @@
+import heapq
+
+import numpy as np
+
+from models.counter import Counter
+from models.patient_table import PatientTable
+from utils.generator import RandomGenerator
+
+
+class EngineClock:
+    """Stand-in for simpy.Environment.now for engines that keep their own clock"""
+    __slots__ = ('now',)
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+
+def draw_arrivals(generator, horizon, mean):
+    if generator.arrival_schedule is not None:
+        return generator.draw_arrival_epochs(horizon)
+
+    # Arrival epochs 0, a1, a1 + a2, ... strictly before the horizon (simpy stops before `until`)
+    block = int(horizon / mean * 1.1) + 64
+    gaps = generator.draw_arrival_times(block)
+    while gaps.sum() < horizon:
+        gaps = np.concatenate([gaps, generator.draw_arrival_times(block)])
+
+    arrivals = np.concatenate([[0.0], np.cumsum(gaps)])
+    return arrivals[arrivals < horizon]
+
+
+def single_server_starts(arrivals, service):
+    # Lindley recursion in closed form: D_n = S_1..n + max_{k<=n}(A_k - S_1..k-1)
+    cum_service = np.cumsum(service)
+    offsets = arrivals - (cum_service - service)
+    departures = cum_service + np.maximum.accumulate(offsets)
+    return departures - service, np.ones(len(arrivals), dtype=np.int64)
+
+
+def multi_server_starts(arrivals, service, num_counters):
+    # Kiefer-Wolfowitz recursion: FIFO order, lowest-numbered idle counter first
+    n = len(arrivals)
+    starts = np.empty(n)
+    counters = np.empty(n, dtype=np.int64)
+
+    idle = list(range(1, num_counters + 1))
+    busy = []  # (free_time, counter_id)
+    heappush, heappop = heapq.heappush, heapq.heappop
+
+    for i, (arrival, duration) in enumerate(zip(arrivals.tolist(), service.tolist())):
+        while busy and busy[0][0] <= arrival:
+            heappush(idle, heappop(busy)[1])
+
+        if idle:
+            start = arrival
+            counter_id = heappop(idle)
+        else:
+            start, counter_id = heappop(busy)
+
+        heappush(busy, (start + duration, counter_id))
+        starts[i] = start
+        counters[i] = counter_id
+
+    return starts, counters
+
+
+def set_counter_totals(counter_list, patients, warmup_time, horizon):
+    # Patients served and busy time of each counter since the warm-up, from the patient table:
+    # services completed before the horizon, with busy time counted from the warm-up on
+    starts = patients.column('service_start_time')
+    ends = patients.column('service_end_time')
+    counters = patients.column('assigned_counter')
+    counted = (ends < horizon) & (ends >= warmup_time)
+    busy_time = ends[counted] - np.maximum(starts[counted], warmup_time)
+
+    busy = np.bincount(counters[counted], weights=busy_time, minlength=len(counter_list) + 1)
+    served = np.bincount(counters[counted], minlength=len(counter_list) + 1)
+    for counter in counter_list:
+        counter.total_busy_time = float(busy[counter.id])
+        counter.total_patients_served = int(served[counter.id])
+
+
+class VectorizedSimulation:
+    def __init__(self, settings):
+        if getattr(settings, 'STAFFING_SCHEDULE', None):
+            raise ValueError("STAFFING_SCHEDULE needs the simpy or event engine")
+        if getattr(settings, 'PATIENT_CLASSES', None):
+            raise ValueError("PATIENT_CLASSES needs the simpy or event engine")
+        self.settings = settings
+        self.env = EngineClock()
+        self.random_generator = RandomGenerator(settings)
+
+        self.counter_list = [Counter(i + 1) for i in range(settings.NUMBER_OF_COUNTERS)]
+        self.patients = PatientTable()
+
+    def run(self):
+        horizon = self.settings.SIMULATION_TIME
+        arrivals = draw_arrivals(self.random_generator, horizon, self.settings.ARRIVAL_INTERVAL_MEAN)
+        service = self.random_generator.draw_service_times(len(arrivals))
+
+        if self.settings.NUMBER_OF_COUNTERS == 1:
+            starts, counters = single_server_starts(arrivals, service)
+        else:
+            starts, counters = multi_server_starts(arrivals, service, self.settings.NUMBER_OF_COUNTERS)
+        ends = starts + service
+
+        # Same end-of-run semantics as the simpy engine: only services begun before the
+        # horizon count, and those still running are closed out at the horizon
+        started = starts < horizon
+
+        self.patients = PatientTable.from_columns(
+            arrival_time=arrivals,
+            service_start_time=np.where(started, starts, np.nan),
+            service_end_time=np.where(started, np.minimum(ends, horizon), np.nan),
+            assigned_counter=np.where(started, counters, 0),
+            service_demand=service
+        )
+
+        # Counter totals restart at the end of warm-up, as in the simpy engine
+        warmup_time = getattr(self.settings, 'WARMUP_TIME', 0) or 0
+        if not 0 < warmup_time < horizon:
+            warmup_time = 0.0
+        set_counter_totals(self.counter_list, self.patients, warmup_time, horizon)
+
+        self.env.now = float(horizon)
+        return self
+
+
+def run_vectorized(settings):
+    return VectorizedSimulation(settings).run()
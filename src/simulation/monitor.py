@@ -1,3 +1,8 @@
+from simulation.event_log import EventLog, EventType
+from simulation.reporter import ProgressReporter, realtime_monitoring_enabled
+from analytics.streaming import StreamingStatisticsCollector
+
+
 class SimulationMonitor:
     def __init__(self, sim_env, settings):
         self.sim_env = sim_env
@@ -5,47 +10,48 @@ class SimulationMonitor:
         self.settings = settings
 
         self.queue_snapshots = []
-        self.events_log = []
+        self.events_log = EventLog(
+            capacity=getattr(settings, 'EVENT_LOG_CAPACITY', 65536),
+            spill_path=getattr(settings, 'EVENT_LOG_PATH', None)
+        )
+
+        # Monitoring flags are resolved once here rather than on every arrival
+        self.reporter = ProgressReporter(settings) if realtime_monitoring_enabled(settings) else None
+
+        # Constant-memory statistics fed by SimulationProcess as each patient finishes. A detected
+        # warm-up is only known after the run, so AUTO_WARMUP runs build them from the table instead
+        self.statistics = None
+        if getattr(settings, 'STREAMING_STATISTICS', True) and not getattr(settings, 'AUTO_WARMUP', False):
+            self.statistics = StreamingStatisticsCollector(warmup_time=getattr(settings, 'WARMUP_TIME', 0))
 
     def record_arrival(self, patient):
-        self.events_log.append({
-            'time': self.env.now,
-            'event': 'arrival',
-            'patient_id': patient.id,
-            'queue_length': self.sim_env.current_queue_length
-        })
+        self.events_log.append(self.env.now, EventType.ARRIVAL, patient.id,
+                               0, self.sim_env.current_queue_length)
 
-        # Check both attribute names for compatibility
-        enable_monitor = getattr(self.settings, 'ENABLE_REALTIME_MONITOR', None) or \
-                        getattr(self.settings, 'ENABLE_REALTIME_MONITORING', False)
-        if enable_monitor:
-            print(f"{self.env.now:.2f}: Patient {patient.id} arrived. Queue length: {self.sim_env.current_queue_length}")
+        if self.reporter is not None:
+            self.reporter.arrival(self.env.now, patient.id, self.sim_env.current_queue_length)
 
     def record_service_start(self, patient, counter):
-        self.events_log.append({
-            'time': self.env.now,
-            'event': 'service_start',
-            'patient_id': patient.id,
-            'counter_id': counter.id,
-            'queue_length': self.sim_env.current_queue_length
-        })
+        self.events_log.append(self.env.now, EventType.SERVICE_START, patient.id,
+                               counter.id, self.sim_env.current_queue_length)
 
     def record_service_end(self, patient, counter):
-        self.events_log.append({
+        self.events_log.append(self.env.now, EventType.SERVICE_END, patient.id,
+                               counter.id, self.sim_env.current_queue_length)
+
+    def take_snapshot(self):
+        self.queue_snapshots.append({
             'time': self.env.now,
-            'event': 'service_end',
-            'patient_id': patient.id,
-            'counter_id': counter.id,
-            'queue_length': self.sim_env.current_queue_length
+            'queue_length': self.sim_env.current_queue_length,
+            'busy_counters': self.sim_env.in_service,
+            'total_arrivals': self.sim_env.total_arrivals,
+            'total_served': self.sim_env.total_served
         })
 
     def periodic_snapshot(self):
         while True:
-            self.queue_snapshots.append({
-                'time': self.env.now,
-                'queue_length': self.sim_env.current_queue_length,
-                'total_arrivals': len(self.sim_env.patients),
-                'total_served': sum(1 for p in self.sim_env.patients if p.service_end_time is not None)
-            })
-
-            yield self.env.timeout(self.settings.SNAPSHOT_INTERVAL)
\ No newline at end of file
+            self.take_snapshot()
+            yield self.env.timeout(self.settings.SNAPSHOT_INTERVAL)
+
+    def close(self):
+        self.events_log.close()
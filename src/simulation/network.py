@@ -0,0 +1,186 @@
+import numpy as np
+import simpy
+
+from models.patient_table import PatientTable
+from simulation.environment import SimulationEnvironment
+from utils.generator import RandomGenerator
+from utils.stations import station_network
+
+
+class NetworkProcess:
+    """Patient pathways through several stations (e.g. registration, triage, doctor, pharmacy)
+
+    Every station is a SimulationEnvironment on one shared simpy clock, with its own counters,
+    queue and time-weighted statistics. Patients arrive at the first station; after each
+    service the station's routing table picks the next one. Service times and routing draws
+    come from per-station random streams, so each station keeps common random numbers.
+    """
+
+    def __init__(self, settings):
+        if getattr(settings, 'PATIENT_CLASSES', None) or getattr(settings, 'STAFFING_SCHEDULE', None):
+            raise ValueError("STATIONS does not support PATIENT_CLASSES or STAFFING_SCHEDULE")
+        self.settings = settings
+        self.network = station_network(settings)
+        if self.network is None:
+            raise ValueError("The network engine needs STATIONS")
+
+        self.env = simpy.Environment()
+        self.stations = []
+        self.generators = []
+        for station in range(len(self.network)):
+            station_settings = self.network.station_settings(settings, station)
+            self.stations.append(SimulationEnvironment(station_settings, env=self.env))
+            self.generators.append(RandomGenerator(station_settings, seed=self.network.station_seed(settings, station)))
+        self.random_generator = RandomGenerator(settings)
+
+        # End-to-end pathway of each patient: arrival at the first station to departure from the last
+        self.patients = PatientTable()
+
+        # Per-station visit counts and waits since the end of the warm-up, indexed by station
+        n = len(self.stations)
+        self.visits = [0] * n
+        self.started = [0] * n
+        self.served = [0] * n
+        self.wait_sum = [0.0] * n
+        self.wait_max = [0.0] * n
+        self.statistics_start = 0.0
+
+    def arrival_process(self):
+        first_arrival = self.random_generator.get_first_arrival_time()
+        if first_arrival > 0:
+            yield self.env.timeout(first_arrival)
+
+        while True:
+            patient = self.patients.add(self.env.now)
+            self.env.process(self.pathway_process(patient))
+            yield self.env.timeout(self.random_generator.get_arrival_time(self.env.now))
+
+    def pathway_process(self, patient):
+        waited = served = 0.0
+        first_start = None
+        station = 0
+        while station is not None:
+            sim_env = self.stations[station]
+            generator = self.generators[station]
+            queued = self.env.now
+            service_time = generator.get_service_time()
+            sim_env.patient_arrived()
+            self.visits[station] += 1
+
+            with sim_env.counters.request() as request:
+                yield request
+                sim_env.service_started()
+                wait = self.env.now - queued
+                self.started[station] += 1
+                self.wait_sum[station] += wait
+                if wait > self.wait_max[station]:
+                    self.wait_max[station] = wait
+                if first_start is None:
+                    first_start = self.env.now
+
+                # assigned_counter ends up as the counter of the last station visited
+                counter = sim_env.get_available_counter()
+                counter.start_service(patient, self.env.now)
+                yield self.env.timeout(service_time)
+                counter.end_service(self.env.now)
+                sim_env.release_counter(counter)
+                sim_env.service_ended()
+                self.served[station] += 1
+
+            waited += wait
+            served += service_time
+            station = self.network.route(station, generator.get_routing_uniform())
+
+        patient.service_start_time = first_start
+        patient.service_end_time = self.env.now
+        patient.waiting_time = waited
+        patient.service_time = served
+        patient.service_demand = served
+        patient.total_time_in_system = self.env.now - patient.arrival_time
+
+    def reset_statistics(self):
+        for sim_env in self.stations:
+            sim_env.reset_statistics()
+        n = len(self.stations)
+        self.visits = [0] * n
+        self.started = [0] * n
+        self.served = [0] * n
+        self.wait_sum = [0.0] * n
+        self.wait_max = [0.0] * n
+        self.statistics_start = self.env.now
+
+    def warmup_process(self, warmup_time):
+        yield self.env.timeout(warmup_time)
+        self.reset_statistics()
+
+    def run(self, until=None):
+        until = self.settings.SIMULATION_TIME if until is None else until
+        self.env.process(self.arrival_process())
+        warmup_time = getattr(self.settings, 'WARMUP_TIME', 0) or 0
+        if 0 < warmup_time < until:
+            self.env.process(self.warmup_process(warmup_time))
+        self.env.run(until=until)
+        return self
+
+    def station_report(self):
+        # Per-station statistics since the warm-up, in station order
+        observed = self.env.now - self.statistics_start
+        report = {}
+        for station, (name, sim_env) in enumerate(zip(self.network.names, self.stations)):
+            started = self.started[station]
+            counters = len(sim_env.counter_list)
+            report[name] = {
+                "counters": counters,
+                "total_arrivals": self.visits[station],
+                "total_served": self.served[station],
+                "average_waiting_time": self.wait_sum[station] / started if started else 0.0,
+                "max_waiting_time": self.wait_max[station],
+                "average_queue_length": sim_env.average_queue_length(),
+                "average_number_in_system": sim_env.average_number_in_system(),
+                "throughput": self.served[station] / observed if observed > 0 else 0.0,
+                "average_utilization": sim_env.average_busy_counters() / counters * 100.0
+            }
+        return report
+
+    def get_report(self):
+        # End-to-end figures for patients arriving after the warm-up, plus each station's statistics;
+        # the same cut applies to every total, so arrivals = completed + still in system
+        arrivals = self.patients.column('arrival_time')
+        counted = arrivals >= self.statistics_start
+        finished = ~np.isnan(self.patients.column('service_end_time'))
+        departed = counted & finished
+        waits = self.patients.column('waiting_time')[departed]
+        times = self.patients.column('total_time_in_system')[departed]
+        observed = self.env.now - self.statistics_start
+        return {
+            "total_arrivals": int(counted.sum()),
+            "total_served": int(departed.sum()),
+            "total_remaining": int((counted & ~finished).sum()),
+            "average_waiting_time": float(waits.mean()) if len(waits) else 0.0,
+            "max_waiting_time": float(waits.max()) if len(waits) else 0.0,
+            "average_time_in_system": float(times.mean()) if len(times) else 0.0,
+            "throughput": float(departed.sum() / observed) if observed > 0 else 0.0,
+            "stations": self.station_report()
+        }
+
+    def print_summary(self):
+        report = self.get_report()
+        print("\n" + "=" * 40)
+        print("PATIENT PATHWAY REPORT")
+        print("=" * 40)
+        print(f"1. Total arrivals:                {report['total_arrivals']} patients")
+        print(f"2. Patients completed pathway:     {report['total_served']} patients")
+        print(f"3. Patients still in system:       {report['total_remaining']} patients")
+        print(f"4. Average total waiting time:     {report['average_waiting_time']:.2f} minutes")
+        print(f"5. Maximum total waiting time:     {report['max_waiting_time']:.2f} minutes")
+        print(f"6. Average time in system:         {report['average_time_in_system']:.2f} minutes")
+        print(f"7. Throughput:                     {report['throughput']:.2f} patients/min")
+        for name, stats in report['stations'].items():
+            print(f"   - {name:<12} {stats['counters']:>3} counters, {stats['total_served']:>6} served, "
+                  f"wait {stats['average_waiting_time']:.2f} avg / {stats['max_waiting_time']:.2f} max, "
+                  f"queue {stats['average_queue_length']:.2f}, {stats['average_utilization']:.1f}% busy")
+        print("=" * 40)
+
+
+def run_network(settings):
+    return NetworkProcess(settings).run()
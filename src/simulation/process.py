@@ -1,4 +1,3 @@
-from models.patient import Patient
 from utils.generator import RandomGenerator
 
 class SimulationProcess:
@@ -7,50 +6,57 @@ class SimulationProcess:
         self.env = sim_env.env
         self.settings = settings
         self.monitor = monitor
+        self.statistics = monitor.statistics
         self.random_generator = RandomGenerator(settings)
+        self.prioritized = sim_env.triage is not None
 
     def arrival_process(self):
-        while True:
-            patient = Patient()
-            patient.arrival_time = self.env.now
-            patient.queue_join_time = self.env.now
+        first_arrival = self.random_generator.get_first_arrival_time()
+        if first_arrival > 0:
+            yield self.env.timeout(first_arrival)
 
-            self.sim_env.patients.append(patient)
-            self.sim_env.current_queue_length += 1
+        while True:
+            patient = self.sim_env.patients.add(self.env.now)
+            patient.service_demand = self.random_generator.get_service_time()
+            patient_class = self.random_generator.get_patient_class()
+            if patient_class:
+                patient.priority = patient_class
+            self.sim_env.patient_arrived()
 
             self.monitor.record_arrival(patient)
-            self.env.process(self.service_process(patient))
-            inter_arrival_time = self.random_generator.get_arrival_time()
+            self.env.process(self.service_process(patient, patient_class))
+            inter_arrival_time = self.random_generator.get_arrival_time(self.env.now)
             yield self.env.timeout(inter_arrival_time)
 
-    def service_process(self, patient):
-        # Wait for an available counter-resource
-        with self.sim_env.counters.request() as request:
+    def service_process(self, patient, patient_class=0):
+        # Wait for an available counter-resource; triage classes queue by priority, then FIFO
+        counters = self.sim_env.counters
+        request = counters.request(priority=patient_class) if self.prioritized else counters.request()
+        with request:
             yield request
 
             # Patient has left the queue and is now being served
-            self.sim_env.current_queue_length -= 1
+            self.sim_env.service_started()
+            
+            # Take the lowest-numbered idle counter and start service
+            counter = self.sim_env.get_available_counter(patient_class)
+
+            # Use Counter's start_service method to properly track metrics
+            counter.start_service(patient, self.env.now)
+            patient.service_start_time = self.env.now
+            self.monitor.record_service_start(patient, counter)
+
+            # Serve for the time drawn when the patient arrived
+            yield self.env.timeout(patient.service_demand)
+
+            # Service completed - update patient metrics
+            patient.service_end_time = self.env.now
+            patient.calculate_metrics()
+            if self.statistics is not None:
+                self.statistics.record_patient(patient)
             
-            # Get an available counter and start service
-            counter = self.sim_env.get_available_counter()
-            if counter:
-                # Use Counter's start_service method to properly track metrics
-                counter.start_service(patient, self.env.now)
-                patient.service_start_time = self.env.now
-                self.monitor.record_service_start(patient, counter)
-
-                # Generate service time and wait
-                service_time = self.random_generator.get_service_time()
-                yield self.env.timeout(service_time)
-
-                # Service completed - update patient metrics
-                patient.service_end_time = self.env.now
-                patient.calculate_metrics()
-                
-                # Use Counter's end_service method to properly track metrics
-                counter.end_service(self.env.now)
-                self.monitor.record_service_end(patient, counter)
-            else:
-                patient.service_start_time = self.env.now
-                patient.service_end_time = self.env.now
-                patient.calculate_metrics()
\ No newline at end of file
+            # Use Counter's end_service method to properly track metrics
+            counter.end_service(self.env.now)
+            self.sim_env.release_counter(counter)
+            self.sim_env.service_ended()
+            self.monitor.record_service_end(patient, counter)
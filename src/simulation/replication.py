@@ -0,0 +1,265 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from config.settings import SimulationSettings
+from simulation.runner import simulate, build_analyzer
+from analytics.confidence import aggregate_reports, paired_differences
+from analytics.streaming import StreamingStatisticsCollector
+
+
+def replication_seeds(base_seed, replications: int) -> List[int]:
+    # Spawned child sequences give statistically independent streams per replication
+    children = np.random.SeedSequence(base_seed).spawn(replications)
+    return [int(child.generate_state(1)[0]) for child in children]
+
+
+def run_replication(settings_dict: Dict, seed: int, with_statistics: bool = False) -> Dict:
+    # Runs inside a worker process: only plain dicts cross the process boundary
+    settings = SimulationSettings.from_dict(settings_dict)
+    settings.RANDOM_SEED = seed
+    settings.ENABLE_REALTIME_MONITORING = False
+    settings.ENABLE_REALTIME_MONITOR = False
+    settings.EVENT_LOG_PATH = None  # replications would all write to the same file
+    settings.CHECKPOINT_PATH = None
+
+    sim_env, monitor = simulate(settings)
+    analyzer = build_analyzer(sim_env, monitor, settings)
+
+    report = analyzer.get_essential_report()
+    report['seed'] = seed
+
+    # Each worker writes its own files, so replications export in parallel
+    export_dir = getattr(settings, 'EXPORT_DIR', None)
+    if export_dir and getattr(settings, 'EXPORT_FORMAT', None):
+        from analytics.exporter import export_results
+        export_results(sim_env, monitor, analyzer, settings, export_dir, prefix=f"seed_{seed}_")
+
+    if with_statistics:
+        # Sketches are small and merge exactly across replications
+        statistics = monitor.statistics if monitor is not None else None
+        # The sketches must cover the same patients as the report
+        if statistics is None or statistics.warmup_time != analyzer.warmup_time:
+            statistics = StreamingStatisticsCollector(warmup_time=analyzer.warmup_time)
+            statistics.collect_from_patients(sim_env.patients)
+        report['statistics'] = statistics
+    return report
+
+
+def run_reports(settings_dict, seeds: List[int], max_workers: Optional[int] = None,
+                pool: Optional[ProcessPoolExecutor] = None, with_statistics: bool = False) -> List[Dict]:
+    # settings_dict is shared by every seed, or a list with one settings dict per seed
+    settings_dicts = settings_dict if isinstance(settings_dict, list) else [settings_dict] * len(seeds)
+    flags = [with_statistics] * len(seeds)
+    if pool is not None:
+        return list(pool.map(run_replication, settings_dicts, seeds, flags))
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = min(max_workers, len(seeds))
+
+    if max_workers <= 1:
+        return [run_replication(s, seed, with_statistics) for s, seed in zip(settings_dicts, seeds)]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(run_replication, settings_dicts, seeds, flags))
+
+
+def antithetic_jobs(settings_dict: Dict, seeds: List[int]):
+    # Every seed runs as drawn and mirrored; the two runs of a pair are adjacent
+    settings_dicts, job_seeds = [], []
+    for seed in seeds:
+        settings_dicts += [{**settings_dict, 'ANTITHETIC': False}, {**settings_dict, 'ANTITHETIC': True}]
+        job_seeds += [seed, seed]
+    return settings_dicts, job_seeds
+
+
+def pair_means(reports: List[Dict]) -> List[Dict]:
+    # Averages each antithetic pair into one observation; pairs are independent of each other
+    means = []
+    for plain, mirrored in zip(reports[::2], reports[1::2]):
+        mean = {key: (value + mirrored[key]) / 2 for key, value in plain.items()
+                if isinstance(value, (int, float)) and key != 'seed'}
+        mean['seed'] = plain['seed']
+        means.append(mean)
+    return means
+
+
+def merge_statistics(reports: List[Dict]) -> Optional[StreamingStatisticsCollector]:
+    merged = None
+    for report in reports:
+        statistics = report.pop('statistics', None)
+        if statistics is not None:
+            merged = statistics if merged is None else merged.merge(statistics)
+    return merged
+
+
+def run_replications(settings=None, replications: int = 10, max_workers: Optional[int] = None,
+                     confidence: float = 0.95, with_statistics: bool = False,
+                     antithetic: bool = False) -> Dict:
+    # With antithetic=True the replications run as mirrored pairs (rounded up to an
+    # even count), and the intervals are over the pair means
+    if settings is None:
+        settings = SimulationSettings()
+
+    if antithetic:
+        seeds = replication_seeds(settings.RANDOM_SEED, (replications + 1) // 2)
+        settings_dicts, seeds = antithetic_jobs(settings.to_dict(), seeds)
+        reports = run_reports(settings_dicts, seeds, max_workers, with_statistics=with_statistics)
+        observations = pair_means(reports)
+    else:
+        seeds = replication_seeds(settings.RANDOM_SEED, replications)
+        reports = run_reports(settings.to_dict(), seeds, max_workers, with_statistics=with_statistics)
+        observations = reports
+
+    result = {
+        'replications': len(reports),
+        'confidence': confidence,
+        'antithetic': antithetic,
+        'reports': reports,
+        'summary': aggregate_reports(observations, confidence)
+    }
+    if with_statistics:
+        result['statistics'] = merge_statistics(reports)
+    return result
+
+
+def compare_scenarios(settings=None, overrides: Optional[Dict] = None, replications: int = 10,
+                      max_workers: Optional[int] = None, confidence: float = 0.95,
+                      antithetic: bool = False) -> Dict:
+    # Baseline settings against the same settings with `overrides` applied, under common
+    # random numbers: both scenarios run on the same seeds, so each patient has the same
+    # arrival time and service demand in both, and the per-seed differences are compared
+    if settings is None:
+        settings = SimulationSettings()
+    baseline_dict = settings.to_dict()
+    alternative_dict = {**baseline_dict, **(overrides or {})}
+
+    if antithetic:
+        seeds = replication_seeds(settings.RANDOM_SEED, (replications + 1) // 2)
+        baseline_dicts, job_seeds = antithetic_jobs(baseline_dict, seeds)
+        alternative_dicts, _ = antithetic_jobs(alternative_dict, seeds)
+    else:
+        job_seeds = replication_seeds(settings.RANDOM_SEED, replications)
+        baseline_dicts = [baseline_dict] * len(job_seeds)
+        alternative_dicts = [alternative_dict] * len(job_seeds)
+
+    # One batch, so both scenarios share the worker pool
+    reports = run_reports(baseline_dicts + alternative_dicts, job_seeds + job_seeds, max_workers)
+    baseline, alternative = reports[:len(job_seeds)], reports[len(job_seeds):]
+    if antithetic:
+        baseline, alternative = pair_means(baseline), pair_means(alternative)
+
+    return {
+        'replications': len(job_seeds),
+        'confidence': confidence,
+        'antithetic': antithetic,
+        'overrides': dict(overrides or {}),
+        'reports': {'baseline': reports[:len(job_seeds)], 'alternative': reports[len(job_seeds):]},
+        'summary': {
+            'baseline': aggregate_reports(baseline, confidence),
+            'alternative': aggregate_reports(alternative, confidence)
+        },
+        'difference': paired_differences(baseline, alternative, confidence)
+    }
+
+
+def relative_precision(summary: Dict, metrics: List[str]) -> Dict:
+    precision = {}
+    for metric in metrics:
+        stats = summary[metric]
+        if stats['half_width'] == 0:
+            precision[metric] = 0.0
+        elif stats['mean'] == 0:
+            precision[metric] = float('inf')
+        else:
+            precision[metric] = stats['half_width'] / abs(stats['mean'])
+    return precision
+
+
+def run_until_precision(settings=None, targets: Optional[Dict[str, float]] = None,
+                        confidence: float = 0.95, min_replications: int = 5,
+                        max_replications: int = 200, batch_size: Optional[int] = None,
+                        max_workers: Optional[int] = None) -> Dict:
+    # Launch replications in parallel batches until every target relative
+    # half-width is met or the replication budget runs out
+    if settings is None:
+        settings = SimulationSettings()
+    if targets is None:
+        targets = {'average_waiting_time': 0.05}
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if batch_size is None:
+        batch_size = max(max_workers, 2)
+    min_replications = max(min_replications, 2)
+
+    # Seeds are fixed up front, so the result does not depend on the batch size
+    seeds = replication_seeds(settings.RANDOM_SEED, max_replications)
+    settings_dict = settings.to_dict()
+    reports = []
+    converged = False
+    precision = {}
+
+    pool = ProcessPoolExecutor(max_workers=max_workers) if max_workers > 1 else None
+    try:
+        while len(reports) < max_replications:
+            wanted = max(batch_size, min_replications - len(reports))
+            batch = seeds[len(reports):len(reports) + wanted]
+            reports.extend(run_reports(settings_dict, batch, max_workers, pool))
+
+            if len(reports) < min_replications:
+                continue
+            precision = relative_precision(aggregate_reports(reports, confidence, list(targets)), list(targets))
+            if all(precision[metric] <= target for metric, target in targets.items()):
+                converged = True
+                break
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    return {
+        'replications': len(reports),
+        'confidence': confidence,
+        'reports': reports,
+        'summary': aggregate_reports(reports, confidence),
+        'targets': targets,
+        'precision': precision,
+        'converged': converged
+    }
+
+
+def print_replication_summary(result: Dict):
+    level = int(round(result['confidence'] * 100))
+    print("\n" + "=" * 60)
+    print(f"REPLICATION SUMMARY ({result['replications']} replications, {level}% CI)")
+    print("=" * 60)
+    for metric, stats in result['summary'].items():
+        print(f"  {metric:<24} {stats['mean']:>10.3f} ± {stats['half_width']:<8.3f} "
+              f"[{stats['lower']:.3f}, {stats['upper']:.3f}]")
+    if result.get('antithetic'):
+        print(f"\nIntervals over {result['replications'] // 2} antithetic pair means")
+    if 'targets' in result:
+        status = "reached" if result['converged'] else "NOT reached (budget exhausted)"
+        print(f"\nPrecision targets {status} after {result['replications']} replications:")
+        for metric, target in result['targets'].items():
+            print(f"  {metric:<24} {result['precision'].get(metric, float('inf')):.2%} (target {target:.2%})")
+    print("=" * 60)
+
+
+def print_comparison_summary(result: Dict):
+    level = int(round(result['confidence'] * 100))
+    changes = ', '.join(f"{name}={value}" for name, value in result['overrides'].items())
+    print("\n" + "=" * 60)
+    print(f"SCENARIO COMPARISON ({result['replications']} common-seed replications, {level}% CI)")
+    print(f"Alternative: {changes}")
+    print("=" * 60)
+    print(f"  {'Metric':<24} {'Baseline':>10} {'Alternative':>12} {'Difference':>20} {'Unpaired':>9}")
+    for metric, diff in result['difference'].items():
+        a = result['summary']['baseline'][metric]['mean']
+        b = result['summary']['alternative'][metric]['mean']
+        print(f"  {metric:<24} {a:>10.3f} {b:>12.3f} {diff['mean']:>+10.3f} ± {diff['half_width']:<7.3f} "
+              f"± {diff['independent_half_width']:<7.3f}")
+    print("\nPaired intervals need (unpaired / paired half-width)^2 times fewer replications.")
+    print("=" * 60)
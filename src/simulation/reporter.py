@@ -0,0 +1,32 @@
+import sys
+import time
+
+
+def realtime_monitoring_enabled(settings):
+    # ENABLE_REALTIME_MONITOR is an alias, so turning either flag off disables reporting
+    return bool(getattr(settings, 'ENABLE_REALTIME_MONITORING', False) and
+                getattr(settings, 'ENABLE_REALTIME_MONITOR', True))
+
+
+class ProgressReporter:
+    """Console progress lines for arrivals, sampled and rate-limited"""
+
+    def __init__(self, settings):
+        self.sample_every = max(1, int(getattr(settings, 'MONITOR_SAMPLE_EVERY', 1)))
+        self.min_interval = getattr(settings, 'MONITOR_MIN_INTERVAL', 0.0)
+        self.arrivals_seen = 0
+        self.reports_written = 0
+        self._last_report = float('-inf')
+
+    def arrival(self, now, patient_id, queue_length):
+        self.arrivals_seen += 1
+        if self.arrivals_seen % self.sample_every:
+            return
+        if self.min_interval > 0:
+            wall = time.monotonic()
+            if wall - self._last_report < self.min_interval:
+                return
+            self._last_report = wall
+
+        self.reports_written += 1
+        sys.stdout.write(f"{now:.2f}: Patient {patient_id} arrived. Queue length: {queue_length}\n")
@@ -0,0 +1,115 @@
+import warnings
+
+import numpy as np
+
+from simulation.environment import SimulationEnvironment
+from simulation.monitor import SimulationMonitor
+from simulation.process import SimulationProcess
+from simulation.fast_engine import EngineClock, run_vectorized, set_counter_totals
+from simulation.event_engine import EventDrivenProcess
+from simulation.checkpoint import load_checkpoint
+from analytics.analyzer import SimulationAnalyzer
+from analytics.steady_state import detect_warmup
+from analytics.queueing_theory import analytic_estimate
+from utils.triage import class_names
+
+
+def finalize_patients(sim_env, statistics=None):
+    # Patients still at a counter when the run stops are closed out at the end time; the
+    # streaming statistics get them too, so they describe the same patients as the analyzer
+    table = sim_env.patients
+    in_service = np.isnan(table.column('service_end_time')) & ~np.isnan(table.column('service_start_time'))
+    table.column('service_end_time')[in_service] = sim_env.env.now
+    rows = np.flatnonzero(in_service)
+    table.calculate_metrics(rows)
+    if statistics is not None:
+        for row in rows:
+            statistics.record_patient(table[row])
+
+
+def _finish(process):
+    process.advance()
+    finalize_patients(process.sim_env, process.monitor.statistics)
+    process.monitor.close()
+    return process.sim_env, process.monitor
+
+
+def resume(checkpoint_path):
+    # Continues exactly where the checkpoint left off; settings come from the checkpoint
+    return _finish(load_checkpoint(checkpoint_path))
+
+
+def simulate(settings):
+    engine = getattr(settings, 'SIMULATION_ENGINE', 'simpy')
+    checkpointing = bool(getattr(settings, 'CHECKPOINT_PATH', None))
+    if getattr(settings, 'STATIONS', None):
+        raise ValueError("STATIONS runs use simulation.network.run_network")
+    if engine == 'vectorized':
+        if checkpointing:
+            raise ValueError("CHECKPOINT_PATH needs the simpy or event engine")
+        return run_vectorized(settings), None
+
+    # simpy processes cannot be saved, and one simpy resource cannot restrict counters to
+    # some patient classes, so those runs use the event engine, which produces the same history
+    restricted = bool(getattr(settings, 'COUNTER_CLASSES', None))
+    if restricted and engine == 'simpy':
+        warnings.warn("COUNTER_CLASSES needs the event engine; running SIMULATION_ENGINE='event' instead of "
+                      "'simpy' (same history)", stacklevel=2)
+    if engine == 'event' or checkpointing or restricted:
+        sim_env = SimulationEnvironment(settings, env=EngineClock())
+        monitor = SimulationMonitor(sim_env, settings)
+        process = EventDrivenProcess(sim_env, settings, monitor)
+        process.start(until=settings.SIMULATION_TIME)
+        return _finish(process)
+
+    sim_env = SimulationEnvironment(settings)
+    monitor = SimulationMonitor(sim_env, settings)
+    process = SimulationProcess(sim_env, settings, monitor)
+
+    if sim_env.staffing is not None:
+        sim_env.env.process(sim_env.staffing_process())
+    sim_env.env.process(process.arrival_process())
+
+    warmup_time = getattr(settings, 'WARMUP_TIME', 0) or 0
+    if 0 < warmup_time < settings.SIMULATION_TIME:
+        sim_env.env.process(sim_env.warmup_process(warmup_time))
+
+    if hasattr(settings, 'SNAPSHOT_INTERVAL') and settings.SNAPSHOT_INTERVAL > 0:
+        sim_env.env.process(monitor.periodic_snapshot())
+
+    sim_env.env.run(until=settings.SIMULATION_TIME)
+    finalize_patients(sim_env, monitor.statistics)
+    monitor.close()
+
+    return sim_env, monitor
+
+
+def resolve_warmup(sim_env, monitor, settings):
+    if getattr(settings, 'AUTO_WARMUP', False):
+        snapshots = monitor.queue_snapshots if monitor is not None else None
+        return detect_warmup(sim_env.patients, snapshots, end_time=settings.SIMULATION_TIME)
+    return getattr(settings, 'WARMUP_TIME', 0) or 0.0
+
+
+def build_analyzer(sim_env, monitor, settings):
+    # The environment integrates its time averages from WARMUP_TIME on; for a detected
+    # warm-up (or the vectorized engine) the analyzer rebuilds them from the patient table
+    time_averages = None
+    if isinstance(sim_env, SimulationEnvironment) and not getattr(settings, 'AUTO_WARMUP', False):
+        time_averages = sim_env.time_averages()
+
+    # The engines restart the counter totals at WARMUP_TIME; a detected warm-up recuts them
+    # from the patient table, so counter figures cover the same window as the analyzer's
+    warmup_time = resolve_warmup(sim_env, monitor, settings)
+    if getattr(settings, 'AUTO_WARMUP', False):
+        set_counter_totals(sim_env.counter_list, sim_env.patients, warmup_time, settings.SIMULATION_TIME)
+
+    return SimulationAnalyzer(
+        patients=sim_env.patients,
+        counters=sim_env.counter_list,
+        total_simulation_time=settings.SIMULATION_TIME,
+        warmup_time=warmup_time,
+        class_names=class_names(settings),
+        analytic=analytic_estimate(settings),
+        time_averages=time_averages
+    )
@@ -0,0 +1,244 @@
+import argparse
+import hashlib
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+from config.settings import SimulationSettings
+from simulation.replication import replication_seeds, run_replication
+from analytics.confidence import confidence_interval
+from analytics.queueing_theory import analytic_estimate, analytic_report
+
+# Settings that change how a run is reported, not what it computes
+NON_RESULT_SETTINGS = {
+    'RANDOM_SEED',
+    'ENABLE_REALTIME_MONITORING',
+    'ENABLE_REALTIME_MONITOR',
+    'MONITOR_SAMPLE_EVERY',
+    'MONITOR_MIN_INTERVAL',
+    'EVENT_LOG_CAPACITY',
+    'EVENT_LOG_PATH',
+    'CHECKPOINT_PATH',
+    'CHECKPOINT_INTERVAL',
+    'EXPORT_FORMAT',
+    'EXPORT_DIR',
+    'EXPORT_COMPRESSION',
+    'EXPORT_CHUNK_SIZE',
+    'PLOT_DPI',
+    'PLOT_FORMAT'
+}
+
+REPORT_METRICS = [
+    'total_arrivals',
+    'total_served',
+    'total_remaining',
+    'average_waiting_time',
+    'max_waiting_time',
+    'throughput',
+    'average_utilization',
+    'average_queue_length',
+    'average_busy_counters',
+    'average_number_in_system'
+]
+
+# Part of every cache key: bump when run reports gain or change metrics
+CACHE_FORMAT = 2
+
+
+def expand_grid(grid: Dict[str, List]) -> List[Dict]:
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def job_key(settings_dict: Dict, seed: int) -> str:
+    relevant = {name: value for name, value in settings_dict.items() if name not in NON_RESULT_SETTINGS}
+    payload = json.dumps({'settings': relevant, 'seed': seed, 'format': CACHE_FORMAT}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key) -> Optional[Dict]:
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def put(self, key, report: Dict):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so an interrupted sweep never leaves a half-written entry
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f)
+        os.replace(tmp_path, path)
+
+
+def analytic_answer(settings_dict: Dict, idle_wait_probability: float) -> Optional[Dict]:
+    # Closed-form report for scenarios not worth simulating: unstable ones (rho >= 1), whose
+    # queue grows without bound, and nearly idle ones where almost nobody waits
+    settings = SimulationSettings.from_dict(settings_dict)
+    estimate = analytic_estimate(settings)
+    if estimate is None or not (estimate['unstable'] or estimate['wait_probability'] < idle_wait_probability):
+        return None
+    warmup_time = getattr(settings, 'WARMUP_TIME', 0) or 0
+    return analytic_report(estimate, max(settings.SIMULATION_TIME - warmup_time, 0.0))
+
+
+def run_sweep(scenarios: List[Dict], base_settings=None, replications: int = 5,
+              max_workers: Optional[int] = None, cache_dir: Optional[str] = ".sweep_cache",
+              prune: bool = False, idle_wait_probability: float = 0.001) -> List[Dict]:
+    if base_settings is None:
+        base_settings = SimulationSettings()
+    base = base_settings.to_dict()
+    cache = ResultCache(cache_dir) if cache_dir else None
+
+    # Every scenario sees the same seeds, so scenario differences are not seed noise
+    seeds = replication_seeds(base_settings.RANDOM_SEED, replications)
+
+    rows = []
+    pending = []
+    for scenario_id, overrides in enumerate(scenarios):
+        settings_dict = {**base, **overrides}
+        # With prune, scenarios the closed form already answers are not simulated at all
+        answer = analytic_answer(settings_dict, idle_wait_probability) if prune else None
+        for replication, seed in enumerate(seeds):
+            row = {'scenario': scenario_id, **overrides, 'replication': replication, 'seed': seed}
+            if answer is not None:
+                row.update(answer, cached=False, analytic=True)
+                rows.append(row)
+                continue
+            key = job_key(settings_dict, seed)
+            report = cache.get(key) if cache else None
+            if report is not None:
+                row.update(report, cached=True, analytic=False)
+            else:
+                pending.append((row, key, settings_dict, seed))
+            rows.append(row)
+
+    workers = min(max_workers or os.cpu_count() or 1, len(pending))
+    if workers == 1:
+        for row, key, settings_dict, seed in pending:
+            report = run_replication(settings_dict, seed)
+            if cache:
+                cache.put(key, report)
+            row.update(report, cached=False, analytic=False)
+    elif pending:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(run_replication, settings_dict, seed): (row, key)
+                       for row, key, settings_dict, seed in pending}
+            for future in as_completed(futures):
+                row, key = futures[future]
+                report = future.result()
+                if cache:
+                    cache.put(key, report)
+                row.update(report, cached=False, analytic=False)
+
+    return rows
+
+
+def summarize_sweep(rows: List[Dict], metrics: Optional[List[str]] = None,
+                    confidence: float = 0.95) -> List[Dict]:
+    metrics = metrics or REPORT_METRICS
+    per_row = {'replication', 'seed', 'cached', 'analytic'} | set(REPORT_METRICS)
+
+    groups = {}
+    for row in rows:
+        groups.setdefault(row['scenario'], []).append(row)
+
+    summary = []
+    for scenario_id, group in sorted(groups.items()):
+        entry = {key: value for key, value in group[0].items() if key not in per_row}
+        entry['replications'] = len(group)
+        entry['analytic'] = all(row.get('analytic', False) for row in group)
+        for metric in metrics:
+            values = [row[metric] for row in group]
+            if entry['analytic']:
+                # Closed-form rows are identical and carry no sampling error (waits may be infinite)
+                stats = {'mean': values[0], 'half_width': 0.0, 'upper': values[0]}
+            else:
+                stats = confidence_interval(values, confidence)
+            entry[f"{metric}_mean"] = stats['mean']
+            entry[f"{metric}_half_width"] = stats['half_width']
+            entry[f"{metric}_upper"] = stats['upper']
+        summary.append(entry)
+    return summary
+
+
+def minimum_counters(summary: List[Dict], target_wait: float,
+                     metric: str = 'average_waiting_time', conservative: bool = True) -> List[Dict]:
+    # For every combination of the other swept parameters, the fewest counters meeting the target
+    column = f"{metric}_upper" if conservative else f"{metric}_mean"
+    fixed = {'scenario', 'replications', 'analytic', 'NUMBER_OF_COUNTERS'}
+
+    best = {}
+    for entry in summary:
+        if 'NUMBER_OF_COUNTERS' not in entry or entry[column] > target_wait:
+            continue
+        others = tuple(sorted((key, value) for key, value in entry.items()
+                              if key not in fixed and not key.startswith(tuple(REPORT_METRICS))))
+        if others not in best or entry['NUMBER_OF_COUNTERS'] < best[others]['NUMBER_OF_COUNTERS']:
+            best[others] = {**dict(others), 'NUMBER_OF_COUNTERS': entry['NUMBER_OF_COUNTERS'],
+                            column: entry[column]}
+    return list(best.values())
+
+
+def to_dataframe(rows: List[Dict]):
+    import pandas as pd
+    return pd.DataFrame(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep staffing and demand parameters")
+    parser.add_argument("--counters", type=int, nargs='+', default=[SimulationSettings.NUMBER_OF_COUNTERS])
+    parser.add_argument("--arrival-mean", type=float, nargs='+', default=[SimulationSettings.ARRIVAL_INTERVAL_MEAN])
+    parser.add_argument("--service-mean", type=float, nargs='+', default=[SimulationSettings.SERVICE_TIME_MEAN])
+    parser.add_argument("--replications", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--cache-dir", default=".sweep_cache")
+    parser.add_argument("--prune", action="store_true",
+                        help="answer unstable (rho >= 1) and nearly idle scenarios from the "
+                             "M/G/c formulas instead of simulating them")
+    parser.add_argument("--target-wait", type=float, default=None,
+                        help="report the fewest counters whose mean wait CI stays below this")
+    args = parser.parse_args(argv)
+
+    scenarios = expand_grid({
+        'NUMBER_OF_COUNTERS': args.counters,
+        'ARRIVAL_INTERVAL_MEAN': args.arrival_mean,
+        'SERVICE_TIME_MEAN': args.service_mean
+    })
+    rows = run_sweep(scenarios, replications=args.replications,
+                     max_workers=args.workers, cache_dir=args.cache_dir, prune=args.prune)
+    summary = summarize_sweep(rows)
+
+    print(f"{'Counters':>8} {'Arrival':>8} {'Service':>8} {'Avg wait':>10} {'± CI':>8} {'Util %':>8}")
+    for entry in summary:
+        print(f"{entry['NUMBER_OF_COUNTERS']:>8} {entry['ARRIVAL_INTERVAL_MEAN']:>8.2f} "
+              f"{entry['SERVICE_TIME_MEAN']:>8.2f} {entry['average_waiting_time_mean']:>10.2f} "
+              f"{entry['average_waiting_time_half_width']:>8.2f} {entry['average_utilization_mean']:>8.1f}"
+              f"{'  (analytic)' if entry['analytic'] else ''}")
+
+    cached = sum(1 for row in rows if row['cached'])
+    analytic = sum(1 for row in rows if row['analytic'])
+    print(f"\n{len(rows)} runs, {cached} served from cache, {analytic} answered analytically")
+
+    if args.target_wait is not None:
+        print(f"\nMinimum counters for average wait <= {args.target_wait} minutes:")
+        for entry in minimum_counters(summary, args.target_wait):
+            scenario = ", ".join(f"{key}={value}" for key, value in entry.items()
+                                 if key != 'NUMBER_OF_COUNTERS' and key.isupper())
+            print(f"  {scenario}: {entry['NUMBER_OF_COUNTERS']} counters")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,12 @@
 import sys
 import os
+import subprocess
+import csv
+import gzip
+import json
+
+import numpy as np
+import pytest
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
@@ -8,7 +15,25 @@ from simulation.environment import SimulationEnvironment
 from simulation.monitor import SimulationMonitor
 from simulation.process import SimulationProcess
 from analytics.analyzer import SimulationAnalyzer
-from analytics.visualizer import SimulationVisualizer
+from analytics.collector import StatisticsCollector
+from analytics.visualizer import SimulationVisualizer, binned_kde
+from analytics.exporter import ResultExporter
+from analytics.confidence import t_quantile
+from simulation.replication import run_replication, run_replications, run_until_precision, compare_scenarios
+from simulation.runner import simulate, resume, build_analyzer
+from simulation.network import run_network
+from analytics.steady_state import mser_truncation
+from analytics.queueing_theory import erlang_c, mgc_estimate
+from analytics.timeline import queue_timeline, timeline_averages, resample_timeline
+from analytics.streaming import StreamingSeries
+from simulation.sweep import expand_grid, run_sweep, summarize_sweep, minimum_counters
+from models.patient_table import PatientTable
+from simulation.event_log import EventLog, EventType, read_event_log
+from simulation.reporter import ProgressReporter, realtime_monitoring_enabled
+from utils.log_writer import BackgroundLogWriter
+from utils.schedule import ArrivalRateSchedule, staffing_schedule
+from utils.generator import RandomGenerator
+from benchmarks.bench_suite import run_scenario, compare_results
 
 
 def test_simulation():
@@ -92,6 +117,722 @@ def test_simulation():
         return False
 
 
+def test_replications():
+    settings = SimulationSettings()
+    settings.SIMULATION_TIME = 60
+
+    result = run_replications(settings, replications=3, max_workers=1)
+    assert result['replications'] == 3
+    assert len({report['seed'] for report in result['reports']}) == 3
+
+    wait = result['summary']['average_waiting_time']
+    assert wait['lower'] <= wait['mean'] <= wait['upper']
+
+    assert abs(t_quantile(0.975, 10) - 2.228) < 1e-3
+    assert abs(t_quantile(0.975, 2) - 4.303) < 1e-3
+    # Reference t tables, including the small df where Cornish-Fisher alone runs low
+    for p, df, expected in [(0.975, 3, 3.1824), (0.995, 3, 5.8409), (0.975, 5, 2.5706), (0.95, 4, 2.1318),
+                            (0.975, 30, 2.0423), (0.995, 29, 2.7564), (0.025, 3, -3.1824)]:
+        assert abs(t_quantile(p, df) - expected) < 1e-4
+
+
+def test_run_until_precision():
+    settings = SimulationSettings()
+    settings.SIMULATION_TIME = 60
+
+    loose = run_until_precision(settings, targets={'throughput': 0.5}, min_replications=3,
+                                max_replications=20, batch_size=2, max_workers=1)
+    assert loose['converged'] and loose['replications'] < 20
+    assert loose['precision']['throughput'] <= 0.5
+
+    strict = run_until_precision(settings, targets={'average_waiting_time': 1e-6}, min_replications=3,
+                                 max_replications=6, batch_size=2, max_workers=1)
+    assert not strict['converged'] and strict['replications'] == 6
+
+
+def test_sweep_cache(tmp_path):
+    settings = SimulationSettings()
+    settings.SIMULATION_TIME = 120
+    scenarios = expand_grid({'NUMBER_OF_COUNTERS': [3, 5], 'ARRIVAL_INTERVAL_MEAN': [3.0]})
+    assert len(scenarios) == 2
+
+    rows = run_sweep(scenarios, settings, replications=2, max_workers=1, cache_dir=str(tmp_path))
+    assert len(rows) == 4 and not any(row['cached'] for row in rows)
+
+    again = run_sweep(scenarios, settings, replications=2, max_workers=1, cache_dir=str(tmp_path))
+    assert all(row['cached'] for row in again)
+    assert [row['average_waiting_time'] for row in again] == [row['average_waiting_time'] for row in rows]
+
+    best = minimum_counters(summarize_sweep(rows), target_wait=1e9)
+    assert best[0]['NUMBER_OF_COUNTERS'] == 3
+
+
+def test_patient_table():
+    table = PatientTable(capacity=2)
+    records = [table.add(float(t)) for t in range(5)]
+    assert len(table) == 5 and table.capacity >= 5
+
+    record = records[3]
+    record.service_start_time = 4.5
+    record.service_end_time = 6.0
+    record.assigned_counter = 2
+    record.calculate_metrics()
+    assert (record.waiting_time, record.service_time, record.total_time_in_system) == (1.5, 1.5, 3.0)
+    assert table[3].to_dict()['counter'] == 2
+    assert table[0].waiting_time is None and table[0].assigned_counter is None
+    assert list(table.column('waiting_time')[3:4]) == [1.5]
+
+
+def test_incremental_counters():
+    settings = SimulationSettings()
+    settings.SIMULATION_TIME = 120
+    settings.WARMUP_TIME = 0  # counter totals would otherwise restart after warm-up
+    settings.SNAPSHOT_INTERVAL = 1.0
+    settings.ENABLE_REALTIME_MONITORING = False
+    settings.ENABLE_REALTIME_MONITOR = False
+    sim_env, monitor = simulate(settings)
+
+    assert sim_env.total_arrivals == len(sim_env.patients)
+    assert sim_env.total_served == sum(c.total_patients_served for c in sim_env.counter_list)
+    assert monitor.queue_snapshots[-1]['total_arrivals'] <= sim_env.total_arrivals
+
+    # One-minute snapshots should roughly track the exact time average
+    sampled = sum(s['queue_length'] for s in monitor.queue_snapshots) / len(monitor.queue_snapshots)
+    assert abs(sim_env.average_queue_length() - sampled) < 1.0
+
+
+def test_warmup_truncation():
+    rng = np.random.default_rng(1)
+    series = np.concatenate([np.linspace(50, 5, 100), 5 + rng.normal(0, 1, 900)])
+    assert 50 <= mser_truncation(series) <= 150
+
+    settings = SimulationSettings()
+    settings.SIMULATION_TIME = 300
+    settings.WARMUP_TIME = 60
+    settings.ENABLE_REALTIME_MONITORING = False
+    sim_env, monitor = simulate(settings)
+
+    analyzer = build_analyzer(sim_env, monitor, settings)
+    arrivals = sim_env.patients.column('arrival_time')
+    assert analyzer.get_essential_report()['total_arrivals'] == int(np.sum(arrivals >= 60))
+    assert analyzer.observation_time == 240
+    assert all(0 <= u <= 100 for u in analyzer.counter_utilization())
+    assert sim_env.statistics_start == 60
+
+    settings.AUTO_WARMUP = True
+    assert 0 <= build_analyzer(sim_env, monitor, settings).warmup_time < settings.SIMULATION_TIME
+
+    # Counter totals follow a detected warm-up, so their utilization covers the analyzer's window
+    settings.SIMULATION_TIME = 3000
+    settings.NUMBER_OF_COUNTERS = 4
+    settings.ARRIVAL_INTERVAL_MEAN = 2.6
+    sim_env, monitor = simulate(settings)
+    analyzer = build_analyzer(sim_env, monitor, settings)
+    assert analyzer.warmup_time > settings.WARMUP_TIME
+    collector = StatisticsCollector()
+    collector.collect_from_counters(sim_env.counter_list, settings.SIMULATION_TIME, analyzer.warmup_time)
+    # Only the services still running at the horizon are left out of the counter totals
+    for row, utilization in zip(collector.data['counter_utilization'], analyzer.counter_utilization()):
+        assert utilization - 1.0 <= row['utilization'] <= utilization
+
+
+def test_streaming_statistics():
+    rng = np.random.default_rng(7)
+    values = rng.exponential(5.0, 20000)
+
+    first, second = StreamingSeries(), StreamingSeries()
+    for value in values[:5000].tolist():
+        first.add(value)
+    second.add_batch(values[5000:])
+    summary = first.merge(second).summary()
+
+    assert summary['count'] == len(values)
+    assert abs(summary['mean'] - values.mean()) < 1e-9
+    assert abs(summary['std'] - values.std()) < 1e-9
+    for name, q in (('median', 0.5), ('p95', 0.95), ('p99', 0.99)):
+        assert abs(summary[name] / np.quantile(values, q) - 1) < 0.02
+
+    settings = SimulationSettings()
+    settings.SIMULATION_TIME = 2000
+    settings.ENABLE_REALTIME_MONITORING = False
+    result = run_replications(settings, replications=2, max_workers=1, with_statistics=True)
+    assert 'statistics' not in result['reports'][0]
+    merged = result['statistics'].get_data_summary()['waiting_times']
+    assert merged['count'] > 0 and merged['p99'] <= merged['max']
+
+    # With a detected warm-up the sketches cover the same patients as the report
+    settings.AUTO_WARMUP = True
+    report = run_replication(settings.to_dict(), 5, with_statistics=True)
+    settings.RANDOM_SEED = 5
+    settings.ENABLE_REALTIME_MONITOR = False
+    sim_env, monitor = simulate(settings)
+    analyzer = build_analyzer(sim_env, monitor, settings)
+    assert monitor.statistics is None
+    assert report['statistics'].warmup_time == analyzer.warmup_time
+    assert report['statistics'].get_data_summary()['waiting_times']['count'] == len(analyzer.waiting_times)
+
+    # Patients still in service at the horizon are closed out in the sketches as in the report
+    settings.AUTO_WARMUP = False
+    for engine in ('simpy', 'event'):
+        settings.SIMULATION_ENGINE = engine
+        sim_env, monitor = simulate(settings)
+        analyzer = build_analyzer(sim_env, monitor, settings)
+        waits = monitor.statistics.get_data_summary()['waiting_times']
+        assert waits['count'] == len(analyzer.waiting_times)
+        assert abs(waits['mean'] - analyzer.waiting_times.mean()) < 1e-9
+    report = run_replication(settings.to_dict(), 5, with_statistics=True)
+    assert report['statistics'].get_data_summary()['waiting_times']['count'] == len(analyzer.waiting_times)
+
+
+def test_event_log(tmp_path):
+    ring = EventLog(capacity=4)
+    for i in range(10):
+        ring.append(float(i), EventType.ARRIVAL, i + 1, 0, i)
+    assert len(ring) == 4 and ring.dropped_events == 6
+    assert list(ring.to_array()['patient_id']) == [7, 8, 9, 10]
+
+    path = str(tmp_path / "events.npy")
+    spill = EventLog(capacity=4, spill_path=path)
+    for i in range(10):
+        spill.append(float(i), EventType.SERVICE_END, i + 1, 2, 0)
+    spill.close()
+
+    records = read_event_log(path)
+    assert len(records) == 10 and list(records['time']) == [float(i) for i in range(10)]
+    assert next(iter(spill))['event'] == 'service_end'
+
+
+def test_progress_reporting(tmp_path, capsys):
+    settings = SimulationSettings()
+    settings.MONITOR_SAMPLE_EVERY = 5
+    assert realtime_monitoring_enabled(settings)
+
+    reporter = ProgressReporter(settings)
+    for i in range(20):
+        reporter.arrival(float(i), i + 1, 0)
+    assert reporter.reports_written == 4
+    assert capsys.readouterr().out.count("arrived") == 4
+
+    settings.ENABLE_REALTIME_MONITOR = False
+    assert not realtime_monitoring_enabled(settings)
+
+    path = tmp_path / "log.txt"
+    writer = BackgroundLogWriter(str(path), batch_size=16)
+    for i in range(100):
+        writer.write(f"line {i}\n")
+    writer.close()
+    assert path.read_text().splitlines()[-1] == "line 99"
+
+
+def test_idle_counter_pool():
+    settings = SimulationSettings()
+    settings.NUMBER_OF_COUNTERS = 3
+    sim_env = SimulationEnvironment(settings)
+
+    taken = [sim_env.get_available_counter() for _ in range(3)]
+    assert [c.id for c in taken] == [1, 2, 3] and sim_env.idle_counters == 0
+    with pytest.raises(RuntimeError):
+        sim_env.get_available_counter()
+
+    sim_env.release_counter(taken[1])
+    assert sim_env.get_available_counter().id == 2
+
+
+def test_vectorized_engine_matches_simpy():
+    settings = SimulationSettings()
+    settings.SIMULATION_TIME = 240
+    settings.ENABLE_REALTIME_MONITORING = False
+    settings.ENABLE_REALTIME_MONITOR = False
+
+    # With deterministic inputs both engines must agree patient for patient
+    settings.ARRIVAL_DISTRIBUTION = "deterministic"
+    settings.SERVICE_TIME_DISTRIBUTION = "deterministic"
+    for counters in (1, 3):
+        settings.NUMBER_OF_COUNTERS = counters
+        settings.SIMULATION_ENGINE = "simpy"
+        sim_env, _ = simulate(settings)
+        settings.SIMULATION_ENGINE = "vectorized"
+        fast, _ = simulate(settings)
+
+        assert len(fast.patients) == len(sim_env.patients)
+        for p, q in zip(sim_env.patients, fast.patients):
+            assert (p.waiting_time, p.assigned_counter) == (q.waiting_time, q.assigned_counter)
+        for c, d in zip(sim_env.counter_list, fast.counter_list):
+            assert (c.total_busy_time, c.total_patients_served) == (d.total_busy_time, d.total_patients_served)
+
+    # With random inputs the mean waits should agree within sampling noise
+    settings = SimulationSettings()
+    settings.SIMULATION_TIME = 2000
+    settings.NUMBER_OF_COUNTERS = 4
+    settings.SNAPSHOT_INTERVAL = 0
+    results = {}
+    for engine in ("simpy", "vectorized"):
+        settings.SIMULATION_ENGINE = engine
+        settings.ENABLE_REALTIME_MONITORING = False
+        settings.ENABLE_REALTIME_MONITOR = False
+        results[engine] = run_replications(settings, replications=10, max_workers=1)['summary']
+
+    a = results['simpy']['average_waiting_time']
+    b = results['vectorized']['average_waiting_time']
+    assert abs(a['mean'] - b['mean']) < 3 * (a['std'] ** 2 / a['n'] + b['std'] ** 2 / b['n']) ** 0.5
+
+
+def test_event_engine_matches_simpy():
+    # Same random draws in the same order, so the engines agree patient for patient
+    settings = SimulationSettings()
+    settings.SIMULATION_TIME = 480
+    settings.SNAPSHOT_INTERVAL = 1.0
+    settings.ENABLE_REALTIME_MONITORING = False
+    settings.ENABLE_REALTIME_MONITOR = False
+
+    results = {}
+    for engine in ("simpy", "event"):
+        settings.SIMULATION_ENGINE = engine
+        results[engine] = simulate(settings)
+
+    (sim_env, monitor), (event_env, event_monitor) = results['simpy'], results['event']
+    assert len(event_env.patients) == len(sim_env.patients)
+    for name in ('arrival_time', 'service_start_time', 'service_end_time', 'assigned_counter'):
+        assert np.array_equal(sim_env.patients.column(name), event_env.patients.column(name), equal_nan=True)
+    for c, d in zip(sim_env.counter_list, event_env.counter_list):
+        assert (c.total_busy_time, c.total_patients_served) == (d.total_busy_time, d.total_patients_served)
+
+    assert len(event_monitor.queue_snapshots) == len(monitor.queue_snapshots)
+    assert event_env.average_queue_length() == sim_env.average_queue_length()
+    assert event_monitor.statistics.get_data_summary() == monitor.statistics.get_data_summary()
+
+
+def test_time_varying_schedules():
+    schedule = ArrivalRateSchedule([(0, 0.0), (420, 0.6), (720, 0.3), (1200, 0.05)])
+    cumulative = np.linspace(0, 3 * schedule.total, 500)
+    assert np.allclose(schedule.cumulative(schedule.times(cumulative)), cumulative)
+    assert abs(schedule.time_at(schedule.cumulative_at(1000.0)) - 1000.0) < 1e-9
+
+    settings = SimulationSettings()
+    settings.SIMULATION_TIME = 3 * 1440
+    settings.ENABLE_REALTIME_MONITORING = False
+    settings.ENABLE_REALTIME_MONITOR = False
+    settings.ARRIVAL_RATE_SCHEDULE = [(0, 0.0), (420, 0.6), (720, 0.3), (1200, 0.05)]
+    settings.STAFFING_SCHEDULE = [(0, 1), (420, 3), (720, 2), (1200, 1)]
+
+    results = {}
+    for engine in ("simpy", "event"):
+        settings.SIMULATION_ENGINE = engine
+        results[engine], _ = simulate(settings)
+    sim_env = results['simpy']
+    for name in ('arrival_time', 'service_start_time', 'assigned_counter'):
+        assert np.array_equal(sim_env.patients.column(name), results['event'].patients.column(name), equal_nan=True)
+
+    # No arrivals while the rate is zero, and about the expected number overall
+    arrivals = sim_env.patients.column('arrival_time')
+    assert not ((arrivals % 1440) < 420).any()
+    assert abs(len(arrivals) - 3 * schedule.total) < 4 * (3 * schedule.total) ** 0.5
+
+    # Never more patients in service than counters on duty
+    staffing = staffing_schedule(settings)
+    starts = sim_env.patients.column('service_start_time')
+    ends = sim_env.patients.column('service_end_time')
+    for start in starts[~np.isnan(starts)]:
+        assert ((starts <= start) & (ends > start)).sum() <= staffing.value_at(start)
+
+
+def test_analyzer_cache_and_update():
+    settings = SimulationSettings()
+    settings.ENABLE_REALTIME_MONITORING = False
+    settings.ENABLE_REALTIME_MONITOR = False
+    sim_env, monitor = simulate(settings)
+    analyzer = build_analyzer(sim_env, monitor, settings)
+
+    report = analyzer.get_essential_report()
+    report['seed'] = 1
+    assert 'seed' not in analyzer.get_essential_report()
+
+    # Changing the patient set invalidates the cached report
+    late = sim_env.patients.add(settings.SIMULATION_TIME - 1)
+    assert analyzer.get_essential_report()['total_arrivals'] == report['total_arrivals'] + 1
+    late.service_start_time = settings.SIMULATION_TIME - 0.5
+    late.service_end_time = settings.SIMULATION_TIME
+    late.assigned_counter = 1
+    late.calculate_metrics()
+    assert analyzer.get_essential_report()['total_served'] == report['total_served'] + 1
+
+    # Feeding the same patients in batches gives the same report as one full pass
+    full = analyzer.get_essential_report()
+    patients = list(sim_env.patients)
+    incremental = SimulationAnalyzer([], sim_env.counter_list, settings.SIMULATION_TIME, analyzer.warmup_time)
+    for start in range(0, len(patients), 50):
+        incremental.update(patients[start:start + 50])
+    for key, value in incremental.get_essential_report().items():
+        assert abs(value - full[key]) < 1e-9
+    assert np.allclose(incremental.counter_utilization(), analyzer.counter_utilization())
+
+    # update() appends to the analyzer's own copy, never to the simulation's table
+    size = len(sim_env.patients)
+    analyzer.update(patients[:10])
+    assert len(sim_env.patients) == size and len(analyzer.patients) == size + 10
+
+
+def test_plot_export(tmp_path):
+    values = np.random.default_rng(1).gamma(2.0, 5.0, 5000)
+    grid, density = binned_kde(values)
+    bandwidth = values.std() * len(values) ** (-1 / 5)
+    exact = np.exp(-0.5 * ((grid[:, None] - values[None, :]) / bandwidth) ** 2).sum(axis=1) \
+        / (len(values) * bandwidth * np.sqrt(2 * np.pi))
+    assert np.abs(density - exact).max() < 0.01 * exact.max()
+
+    settings = SimulationSettings()
+    settings.ENABLE_REALTIME_MONITORING = False
+    settings.ENABLE_REALTIME_MONITOR = False
+    sim_env, monitor = simulate(settings)
+    analyzer = build_analyzer(sim_env, monitor, settings)
+
+    # Asynchronous export in worker processes, then in-process rendering in another format
+    export = SimulationVisualizer(analyzer, str(tmp_path / "png"), dpi=50).generate_all(wait=False)
+    paths = export.wait()
+    assert len(paths) == 3 and all(os.path.getsize(path) > 0 for path in paths)
+
+    SimulationVisualizer(analyzer, str(tmp_path / "svg"), dpi=50, fmt="svg", max_workers=0).generate_all()
+    assert sorted(os.listdir(tmp_path / "svg")) == ['counter_performance.svg', 'summary_report.svg', 'waiting_time.svg']
+
+
+def test_headless_startup(tmp_path, monkeypatch):
+    # Headless entry points must not import the plotting or dataframe stacks
+    check = ("import sys, run_simulation, simulation.sweep; "
+             "print([m for m in ('matplotlib', 'seaborn', 'pandas') if m in sys.modules])")
+    result = subprocess.run([sys.executable, '-c', check], cwd=os.path.dirname(os.path.abspath(__file__)),
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
+
+    import run_simulation
+    monkeypatch.chdir(tmp_path)
+    run_simulation.main(["--no-plots"])
+    assert not list(tmp_path.rglob("*.png"))
+    assert os.path.exists(tmp_path / "output" / "patients.csv")
+
+
+def test_result_export(tmp_path):
+    settings = SimulationSettings()
+    settings.ENABLE_REALTIME_MONITORING = False
+    settings.ENABLE_REALTIME_MONITOR = False
+    settings.EVENT_LOG_CAPACITY = 64
+    settings.EVENT_LOG_PATH = str(tmp_path / "events.npy")
+    sim_env, monitor = simulate(settings)
+    analyzer = build_analyzer(sim_env, monitor, settings)
+
+    exporter = ResultExporter(str(tmp_path / "out"), ["csv", "json"], compression="gzip", chunk_size=50)
+    exporter.export(sim_env, monitor, analyzer)
+
+    with gzip.open(tmp_path / "out" / "patients.csv.gz", "rt") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == len(sim_env.patients)
+    assert float(rows[0]['arrival_time']) == sim_env.patients[0].arrival_time
+    unfinished = [row for row in rows if row['service_end_time'] == '']
+    assert len(unfinished) == int(np.isnan(sim_env.patients.column('service_end_time')).sum())
+
+    # The spilled event log is streamed back in chunks, in full
+    with gzip.open(tmp_path / "out" / "events.json.gz", "rt") as f:
+        events = json.load(f)
+    assert len(events) == monitor.events_log.total_events
+    assert events[0]['event'] == 'arrival'
+    with gzip.open(tmp_path / "out" / "metadata.csv.gz", "rt") as f:
+        assert int(next(csv.DictReader(f))['dropped_events']) == 0
+
+    # A ring-mode log keeps only its newest events; the export warns and records how many were dropped
+    settings.EVENT_LOG_PATH = None
+    sim_env, monitor = simulate(settings)
+    with pytest.warns(UserWarning, match="truncated"):
+        ResultExporter(str(tmp_path / "ring"), ["csv"]).export(sim_env, monitor)
+    with open(tmp_path / "ring" / "metadata.csv") as f:
+        metadata = next(csv.DictReader(f))
+    assert int(metadata['dropped_events']) == monitor.events_log.dropped_events > 0
+    with open(tmp_path / "ring" / "events.csv") as f:
+        assert len(list(csv.DictReader(f))) == int(metadata['exported_events']) == 64
+
+    # Every replication writes its own files from its worker
+    settings.EVENT_LOG_PATH = None
+    settings.EXPORT_DIR = str(tmp_path / "replications")
+    settings.EXPORT_FORMAT = ["csv"]
+    result = run_replications(settings, replications=2, max_workers=2)
+    for report in result['reports']:
+        assert os.path.exists(tmp_path / "replications" / f"seed_{report['seed']}_patients.csv")
+
+
+def test_checkpoint_resume(tmp_path):
+    settings = SimulationSettings()
+    settings.SIMULATION_TIME = 3 * 1440
+    settings.ENABLE_REALTIME_MONITORING = False
+    settings.ENABLE_REALTIME_MONITOR = False
+    settings.ARRIVAL_RATE_SCHEDULE = [(0, 0.05), (420, 0.6), (720, 0.3), (1200, 0.1)]
+    settings.STAFFING_SCHEDULE = [(0, 1), (420, 3), (720, 2), (1200, 1)]
+    settings.SNAPSHOT_INTERVAL = 1.0
+    settings.EVENT_LOG_CAPACITY = 500
+    settings.EVENT_LOG_PATH = str(tmp_path / "events.npy")
+    settings.CHECKPOINT_PATH = str(tmp_path / "run.ckpt")
+    settings.CHECKPOINT_INTERVAL = 1000
+
+    sim_env, monitor = simulate(settings)
+    events = np.array(read_event_log(settings.EVENT_LOG_PATH, mmap=False))
+    summary = monitor.statistics.get_data_summary()
+
+    # Continuing from the last checkpoint (t=4000) replays the tail of the run exactly
+    resumed_env, resumed_monitor = resume(settings.CHECKPOINT_PATH)
+    for name in sim_env.patients.columns:
+        assert np.array_equal(sim_env.patients.column(name), resumed_env.patients.column(name), equal_nan=True)
+    assert np.array_equal(read_event_log(settings.EVENT_LOG_PATH, mmap=False), events)
+    assert resumed_monitor.queue_snapshots == monitor.queue_snapshots
+    assert resumed_monitor.statistics.get_data_summary() == summary
+    assert resumed_env.env.now == sim_env.env.now
+
+    # Same history as the uncheckpointed simpy run
+    settings.CHECKPOINT_PATH = None
+    settings.EVENT_LOG_PATH = None
+    simpy_env, _ = simulate(settings)
+    assert np.array_equal(simpy_env.patients.column('service_start_time'),
+                          resumed_env.patients.column('service_start_time'), equal_nan=True)
+
+
+def test_benchmark_comparison():
+    result = run_scenario({'patients': 500, 'snapshot_interval': 1}, plots=False)
+    assert set(result['phases']) == {'simulation', 'analyzer', 'collector'}
+    assert result['events'] > result['patients'] and result['events_per_second'] > 0
+
+    baseline = {'results': {'s': result}}
+    slower = {**result, 'phases': {**result['phases'], 'simulation': result['phases']['simulation'] * 2 + 0.01},
+              'events_per_second': result['events_per_second'] / 2}
+    rows = compare_results(baseline, {'results': {'s': slower}})
+    flagged = {row['metric'] for row in rows if row['regression']}
+    assert {'simulation', 'events_per_second'} <= flagged
+    assert not any(row['regression'] for row in compare_results(baseline, baseline))
+
+    # Halving the rate of a phase that only moved within the timing noise is not a regression
+    jitter = {**result, 'phases': {**result['phases'], 'simulation': result['phases']['simulation'] + 0.001},
+              'events_per_second': result['events_per_second'] / 2}
+    rows = compare_results(baseline, {'results': {'s': jitter}})
+    assert not any(row['regression'] for row in rows if row['metric'] == 'events_per_second')
+
+
+def test_seeded_random_streams():
+    settings = SimulationSettings()
+    settings.ENABLE_REALTIME_MONITORING = False
+    settings.ENABLE_REALTIME_MONITOR = False
+
+    def draws(buffer_size):
+        settings.RANDOM_BUFFER_SIZE = buffer_size
+        generator = RandomGenerator(settings)
+        arrivals = [generator.get_arrival_time() for _ in range(50)]
+        # Touching numpy's global generator between draws must not shift the streams
+        np.random.seed(12345)
+        np.random.random(10)
+        return arrivals, [generator.get_service_time() for _ in range(50)]
+
+    first = draws(0)
+    np.random.seed(0)
+    assert draws(0) == first
+    # Buffered pools hand out the same values as single draws
+    assert draws(16) == first
+
+    settings.RANDOM_SEED += 1
+    assert draws(0)[0] != first[0]
+    settings.RANDOM_SEED -= 1
+
+    settings.RANDOM_BUFFER_SIZE = 0
+    run, _ = simulate(settings)
+    np.random.seed(99)
+    np.random.standard_normal(1000)
+    rerun, _ = simulate(settings)
+    for name in ('arrival_time', 'service_demand', 'service_start_time'):
+        assert np.array_equal(run.patients.column(name), rerun.patients.column(name), equal_nan=True)
+
+
+def test_common_random_numbers():
+    settings = SimulationSettings()
+    settings.ENABLE_REALTIME_MONITORING = False
+    settings.ENABLE_REALTIME_MONITOR = False
+
+    # Same seed, different staffing: every patient keeps their arrival time and service demand
+    three, _ = simulate(settings)
+    settings.NUMBER_OF_COUNTERS = 4
+    four, _ = simulate(settings)
+    for name in ('arrival_time', 'service_demand'):
+        assert np.array_equal(three.patients.column(name), four.patients.column(name))
+
+    # Separate substreams also make the vectorized engine see the same patients
+    settings.SIMULATION_ENGINE = "vectorized"
+    vectorized, _ = simulate(settings)
+    assert np.array_equal(four.patients.column('service_start_time'),
+                          vectorized.patients.column('service_start_time'), equal_nan=True)
+
+    # Antithetic runs mirror the uniforms: exponential gaps are negatively correlated
+    settings.SIMULATION_ENGINE = "simpy"
+    settings.ANTITHETIC = True
+    mirrored, _ = simulate(settings)
+    n = min(len(four.patients), len(mirrored.patients)) - 1
+    gaps = np.diff(four.patients.column('arrival_time'))[:n]
+    assert np.corrcoef(gaps, np.diff(mirrored.patients.column('arrival_time'))[:n])[0, 1] < -0.5
+
+    settings.ANTITHETIC = False
+    settings.NUMBER_OF_COUNTERS = 3
+    result = compare_scenarios(settings, {'NUMBER_OF_COUNTERS': 4}, replications=4, max_workers=1)
+    diff = result['difference']['average_waiting_time']
+    assert result['difference']['total_arrivals']['half_width'] == 0
+    assert diff['upper'] < 0 and diff['half_width'] < diff['independent_half_width']
+
+    paired = run_replications(settings, replications=4, max_workers=1, antithetic=True)
+    assert paired['replications'] == 4 and paired['summary']['throughput']['n'] == 2
+
+
+def test_triage_classes():
+    settings = SimulationSettings()
+    settings.SIMULATION_TIME = 2000
+    settings.ENABLE_REALTIME_MONITORING = False
+    settings.ENABLE_REALTIME_MONITOR = False
+    settings.PATIENT_CLASSES = [("urgent", 0.2), ("standard", 0.5), ("minor", 0.3)]
+    settings.STAFFING_SCHEDULE = [(0, 3), (500, 2), (1000, 3)]
+
+    # PriorityResource in simpy and the per-class queues of the event engine agree
+    results = {}
+    for engine in ("simpy", "event"):
+        settings.SIMULATION_ENGINE = engine
+        results[engine], monitor = simulate(settings)
+    for name in ('priority', 'service_start_time', 'assigned_counter'):
+        assert np.array_equal(results['simpy'].patients.column(name), results['event'].patients.column(name),
+                              equal_nan=True)
+
+    sim_env = results['event']
+    analyzer = build_analyzer(sim_env, monitor, settings)
+    classes = analyzer.class_report()
+    assert list(classes) == ["urgent", "standard", "minor"]
+    assert sum(stats['total_arrivals'] for stats in classes.values()) == analyzer.get_essential_report()['total_arrivals']
+    assert classes['urgent']['average_waiting_time'] < classes['standard']['average_waiting_time'] \
+        < classes['minor']['average_waiting_time']
+    assert analyzer.get_essential_report()['average_waiting_time_urgent'] == classes['urgent']['average_waiting_time']
+
+    collector = StatisticsCollector()
+    collector.collect_from_patients(sim_env.patients, analyzer.warmup_time, analyzer.class_names)
+    patients = sim_env.patients
+    minor_waits = (patients.column('priority') == 2) & ~np.isnan(patients.column('waiting_time')) \
+        & (patients.column('arrival_time') >= analyzer.warmup_time)
+    assert collector.get_data_summary()['waiting_times_minor']['count'] == minor_waits.sum()
+
+    # A restricted counter (event engine) only ever serves its classes
+    settings.SIMULATION_ENGINE = "simpy"
+    settings.COUNTER_CLASSES = {1: ["urgent"]}
+    with pytest.warns(UserWarning, match="event engine"):
+        restricted, _ = simulate(settings)
+    on_first = restricted.patients.column('assigned_counter') == 1
+    assert on_first.any() and set(restricted.patients.column('priority')[on_first].tolist()) == {0}
+
+
+def test_patient_pathways():
+    settings = SimulationSettings()
+    settings.SIMULATION_TIME = 5000
+    settings.ARRIVAL_INTERVAL_MEAN = 2.0
+    settings.STATIONS = {
+        "registration": {"counters": 1, "service_mean": 1.5, "service_std": 0.3, "routes": {"doctor": 0.9}},
+        "doctor": {"counters": 4, "service_mean": 6.0, "routes": {"pharmacy": 0.5}},
+        "pharmacy": {"counters": 1, "service_mean": 1.0, "distribution": "exponential"}
+    }
+    process = run_network(settings)
+    report = process.get_report()
+    stations = report['stations']
+    assert list(stations) == ["registration", "doctor", "pharmacy"]
+    assert report['total_arrivals'] == report['total_served'] + report['total_remaining']
+
+    # Routing splits the flow by the table's probabilities
+    registered = stations['registration']['total_served']
+    assert abs(stations['doctor']['total_arrivals'] / registered - 0.9) < 0.03
+    assert abs(stations['pharmacy']['total_arrivals'] / stations['doctor']['total_served'] - 0.5) < 0.04
+    assert abs(stations['registration']['average_utilization'] - 75.0) < 5.0
+
+    # Pathway waits add up the station waits, and the same seed repeats the run exactly
+    departed = ~np.isnan(process.patients.column('service_end_time'))
+    times = process.patients.column('total_time_in_system')[departed]
+    parts = process.patients.column('waiting_time')[departed] + process.patients.column('service_time')[departed]
+    assert np.allclose(times, parts)
+    assert run_network(settings).get_report() == report
+
+    # Patients arriving during the warm-up are left out of every total, including those still in the system
+    overloaded = SimulationSettings.from_dict({**settings.to_dict(), 'SIMULATION_TIME': 300, 'WARMUP_TIME': 250,
+                                               'ARRIVAL_INTERVAL_MEAN': 0.5})
+    totals = run_network(overloaded).get_report()
+    assert totals['total_arrivals'] == totals['total_served'] + totals['total_remaining']
+
+    with pytest.raises(ValueError):
+        simulate(settings)
+    settings.STATIONS["doctor"]["routes"] = {"pharmacy": 0.7, "radiology": 0.2}
+    with pytest.raises(ValueError):
+        run_network(settings)
+
+
+def test_queueing_theory():
+    assert abs(erlang_c(2, 1.0) - 1 / 3) < 1e-12
+    mm1 = mgc_estimate(0.5, 1.0, 1)
+    assert mm1['method'] == "erlang_c" and abs(mm1['expected_waiting_time'] - 1.0) < 1e-12
+    assert mgc_estimate(1.0, 3.0, 3)['unstable'] and mgc_estimate(1.0, 3.0, 3)['expected_waiting_time'] == float('inf')
+
+    # Allen-Cunneen for normal service times agrees with a long simulation
+    settings = SimulationSettings()
+    settings.SIMULATION_ENGINE = "vectorized"
+    settings.SIMULATION_TIME = 100000
+    settings.NUMBER_OF_COUNTERS = 4
+    settings.ARRIVAL_INTERVAL_MEAN = 3.0
+    sim_env, monitor = simulate(settings)
+    analyzer = build_analyzer(sim_env, monitor, settings)
+    assert analyzer.analytic['method'] == "allen_cunneen"
+    analytic, simulated = analyzer.analytic_comparison()['average_waiting_time']
+    assert abs(simulated - analytic) / analytic < 0.15
+    analytic, simulated = analyzer.analytic_comparison()['average_utilization']
+    assert abs(simulated - analytic) < 2.0
+
+    # Pruned sweeps answer unstable and nearly idle scenarios without simulating them
+    settings.SIMULATION_TIME = 1000
+    rows = run_sweep(expand_grid({'NUMBER_OF_COUNTERS': [3, 4, 12]}), settings, replications=2,
+                     max_workers=1, cache_dir=None, prune=True)
+    summary = summarize_sweep(rows)
+    assert [entry['analytic'] for entry in summary] == [True, False, True]
+    assert summary[0]['average_waiting_time_upper'] == float('inf')
+    assert [entry['NUMBER_OF_COUNTERS'] for entry in minimum_counters(summary, 1.0)] == [12]
+
+
+def test_time_weighted_metrics():
+    settings = SimulationSettings()
+    settings.ENABLE_REALTIME_MONITORING = False
+    settings.ENABLE_REALTIME_MONITOR = False
+    settings.NUMBER_OF_COUNTERS = 4
+    sim_env, monitor = simulate(settings)
+    assert monitor.queue_snapshots == []
+
+    # Integrated at every event by the engine, and rebuilt exactly from the patient table
+    exact = sim_env.time_averages()
+    timeline = queue_timeline(sim_env.patients, settings.SIMULATION_TIME)
+    rebuilt = timeline_averages(timeline, settings.WARMUP_TIME, settings.SIMULATION_TIME)
+    for name, value in exact.items():
+        assert abs(rebuilt[name] - value) < 1e-9
+    assert abs(exact['average_number_in_system']
+               - exact['average_queue_length'] - exact['average_busy_counters']) < 1e-9
+
+    # The vectorized engine has no event loop; its analyzer rebuilds the same averages
+    report = build_analyzer(sim_env, monitor, settings).get_essential_report()
+    settings.SIMULATION_ENGINE = "vectorized"
+    fast_env, _ = simulate(settings)
+    fast_report = build_analyzer(fast_env, None, settings).get_essential_report()
+    for name in exact:
+        assert abs(report[name] - exact[name]) < 1e-9 and abs(fast_report[name] - exact[name]) < 1e-9
+
+    # Bin averages at any resolution keep the exact mean
+    for interval in (0.5, 7.0, 40.0):
+        series = resample_timeline(sim_env.patients, interval, settings.SIMULATION_TIME,
+                                   settings.WARMUP_TIME, timeline)
+        widths = np.diff(np.append(series['time'], settings.SIMULATION_TIME))
+        assert abs(np.average(series['queue_length'], weights=widths) - exact['average_queue_length']) < 1e-9
+
+    collector = StatisticsCollector()
+    collector.collect_from_timeline(sim_env.patients, settings.SIMULATION_TIME, settings.WARMUP_TIME, interval=2.0)
+    summary = collector.get_data_summary()
+    assert abs(summary['time_averages']['average_busy_counters'] - exact['average_busy_counters']) < 1e-9
+    assert summary['queue_lengths']['count'] == (settings.SIMULATION_TIME - settings.WARMUP_TIME) / 2.0
+
+
 if __name__ == "__main__":
     success = test_simulation()
     sys.exit(0 if success else 1)
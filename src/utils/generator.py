@@ -1,28 +1,199 @@
 import numpy as np
 
+from utils.schedule import arrival_rate_schedule
+from utils.triage import triage_classes
+
+
+class _VariatePool:
+    """Hands out pre-drawn variates one at a time, refilling in vectorized blocks"""
+    __slots__ = ('sampler', 'block_size', 'values', 'index')
+
+    def __init__(self, sampler, block_size):
+        self.sampler = sampler
+        self.block_size = block_size
+        self.values = []
+        self.index = 0
+
+    def next(self):
+        if self.index >= len(self.values):
+            # tolist() so callers get plain floats instead of numpy scalars
+            self.values = self.sampler(self.block_size).tolist()
+            self.index = 0
+        value = self.values[self.index]
+        self.index += 1
+        return value
+
+
+# Shifts rng.random()'s [0, 1) grid to the open interval, so U and 1 - U are both valid
+HALF_ULP = 2.0 ** -54
+
+
 class RandomGenerator:
-    def __init__(self, settings):
+    """Arrival and service variates from separate substreams of one seed
+
+    Arrivals and service times never share a stream, and each patient's service time
+    is drawn when they arrive. Patient k therefore gets the same service time in every
+    scenario run with the same seed (common random numbers), whatever the counters or
+    staffing. Variates come from inverse transforms, so ANTITHETIC mirrors every draw
+    (U -> 1 - U, Z -> -Z) to make the negatively correlated partner of a run.
+    """
+
+    def __init__(self, settings, seed=None):
         self.settings = settings
-        np.random.seed(settings.RANDOM_SEED)
+        self.seed = settings.RANDOM_SEED if seed is None else seed
+        # spawn() children depend only on their index, so adding streams keeps the earlier ones
+        arrival_seed, service_seed, class_seed, routing_seed = np.random.SeedSequence(self.seed).spawn(4)
+        self.arrival_rng = np.random.default_rng(arrival_seed)
+        self.service_rng = np.random.default_rng(service_seed)
+        self.class_rng = np.random.default_rng(class_seed)
+        self.routing_rng = np.random.default_rng(routing_seed)
+        self.antithetic = bool(getattr(settings, 'ANTITHETIC', False))
+        self.arrival_schedule = arrival_rate_schedule(settings)
+        self.triage = triage_classes(settings)
+
+        # Resolve the distributions once instead of on every draw
+        self._sample_arrivals = self._make_arrival_sampler()
+        self._sample_services = self._make_service_sampler()
+        self._sample_classes = self._make_class_sampler()
+
+        self.buffer_size = getattr(settings, 'RANDOM_BUFFER_SIZE', 0) or 0
+        if self.buffer_size > 0:
+            self._arrival_pool = _VariatePool(self._sample_arrivals, self.buffer_size)
+            self._service_pool = _VariatePool(self._sample_services, self.buffer_size)
+            self._class_pool = _VariatePool(self._sample_classes, self.buffer_size) if self.triage else None
+        else:
+            self._arrival_pool = None
+            self._service_pool = None
+            self._class_pool = None
+        # Only network runs route patients, so that pool is made on first use
+        self._routing_pool = None
+
+    def _uniform_sampler(self, rng):
+        if self.antithetic:
+            return lambda size=None: 1.0 - (rng.random(size) + HALF_ULP)
+        return lambda size=None: rng.random(size) + HALF_ULP
+
+    def _normal_sampler(self, rng):
+        if self.antithetic:
+            return lambda size=None: -rng.standard_normal(size)
+        return rng.standard_normal
+
+    def _make_arrival_sampler(self):
+        # With a rate schedule, gaps have unit mean on the cumulative-rate clock
+        mean = self.settings.ARRIVAL_INTERVAL_MEAN if self.arrival_schedule is None else 1.0
+        uniform = self._uniform_sampler(self.arrival_rng)
 
-    def get_arrival_time(self):
         if self.settings.ARRIVAL_DISTRIBUTION == "exponential":
-            return np.random.exponential(self.settings.ARRIVAL_INTERVAL_MEAN)
+            return lambda size=None: -mean * np.log(uniform(size))
         elif self.settings.ARRIVAL_DISTRIBUTION == "uniform":
-            low = self.settings.ARRIVAL_INTERVAL_MEAN * 0.5
-            high = self.settings.ARRIVAL_INTERVAL_MEAN * 1.5
-            return np.random.uniform(low, high)
+            low = mean * 0.5
+            return lambda size=None: low + mean * uniform(size)
         else:
-            return self.settings.ARRIVAL_INTERVAL_MEAN
+            return lambda size=None: mean if size is None else np.full(size, float(mean))
+
+    def _make_service_sampler(self):
+        mean = self.settings.SERVICE_TIME_MEAN
 
-    def get_service_time(self):
         if self.settings.SERVICE_TIME_DISTRIBUTION == "normal":
-            time = np.random.normal(
-                self.settings.SERVICE_TIME_MEAN,
-                self.settings.SERVICE_TIME_STD
-            )
-            return max(0.1, time)
+            std = self.settings.SERVICE_TIME_STD
+            normal = self._normal_sampler(self.service_rng)
+
+            def sample(size=None):
+                if size is None:
+                    return max(0.1, mean + std * normal())
+                return np.maximum(mean + std * normal(size), 0.1)
+            return sample
         elif self.settings.SERVICE_TIME_DISTRIBUTION == "exponential":
-            return np.random.exponential(self.settings.SERVICE_TIME_MEAN)
+            uniform = self._uniform_sampler(self.service_rng)
+            return lambda size=None: -mean * np.log(uniform(size))
         else:
-            return self.settings.SERVICE_TIME_MEAN
\ No newline at end of file
+            return lambda size=None: mean if size is None else np.full(size, float(mean))
+
+    def _make_class_sampler(self):
+        if self.triage is None:
+            return lambda size=None: 0 if size is None else np.zeros(size, dtype=np.int64)
+        uniform = self._uniform_sampler(self.class_rng)
+        classes_of = self.triage.classes_of
+        return lambda size=None: int(classes_of(uniform())) if size is None else classes_of(uniform(size))
+
+    def get_arrival_time(self, now=0.0):
+        # Time until the next arrival after `now`
+        if self._arrival_pool is not None:
+            gap = self._arrival_pool.next()
+        else:
+            gap = self._sample_arrivals()
+
+        schedule = self.arrival_schedule
+        if schedule is None:
+            return gap
+        return schedule.time_at(schedule.cumulative_at(now) + gap) - now
+
+    def get_first_arrival_time(self):
+        # The constant-rate process starts with a patient at time 0
+        if self.arrival_schedule is None:
+            return 0.0
+        return self.get_arrival_time(0.0)
+
+    def get_service_time(self):
+        if self._service_pool is not None:
+            return self._service_pool.next()
+        return self._sample_services()
+
+    def get_patient_class(self):
+        # Triage class of the next arrival, from its own substream; always 0 without classes
+        if self._class_pool is not None:
+            return self._class_pool.next()
+        return self._sample_classes()
+
+    def get_routing_uniform(self):
+        # Uniform on (0, 1) from the routing substream, for the next-station decision
+        if self._routing_pool is None:
+            self._routing_pool = _VariatePool(self._uniform_sampler(self.routing_rng), max(self.buffer_size, 1))
+        return self._routing_pool.next()
+
+    def draw_patient_classes(self, size):
+        return self._sample_classes(size)
+
+    def draw_arrival_times(self, size):
+        return self._sample_arrivals(size)
+
+    def _pools(self):
+        return (('arrival', self._arrival_pool), ('service', self._service_pool), ('class', self._class_pool))
+
+    def get_state(self):
+        # Bit generator states plus the unused part of each pool, enough to continue the exact streams
+        pools = {}
+        for name, pool in self._pools():
+            if pool is not None:
+                pools[name] = np.array(pool.values[pool.index:])
+        return {
+            'arrival': self.arrival_rng.bit_generator.state,
+            'service': self.service_rng.bit_generator.state,
+            'class': self.class_rng.bit_generator.state,
+            'pools': pools
+        }
+
+    def set_state(self, state):
+        # The samplers close over the generators, so their states are restored in place
+        self.arrival_rng.bit_generator.state = state['arrival']
+        self.service_rng.bit_generator.state = state['service']
+        self.class_rng.bit_generator.state = state['class']
+        for name, pool in self._pools():
+            if pool is not None and name in state['pools']:
+                pool.values = state['pools'][name].tolist()
+                pool.index = 0
+
+    def draw_arrival_epochs(self, horizon):
+        # All scheduled arrival times before the horizon, inverted in one vectorized pass
+        schedule = self.arrival_schedule
+        expected = schedule.cumulative_at(horizon)
+        block = int(expected * 1.1) + 64
+        gaps = self._sample_arrivals(block)
+        while gaps.sum() < expected:
+            gaps = np.concatenate([gaps, self._sample_arrivals(block)])
+
+        epochs = schedule.times(np.cumsum(gaps))
+        return epochs[epochs < horizon]
+
+    def draw_service_times(self, size):
+        return self._sample_services(size)
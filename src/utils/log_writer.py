@@ -0,0 +1,55 @@
+import queue
+import threading
+
+
+class BackgroundLogWriter:
+    """Writes text to a file from a background thread; write() never blocks on disk"""
+
+    def __init__(self, file_path, max_queue=1024, batch_size=64 * 1024):
+        self.file_path = file_path
+        self.batch_size = batch_size
+        self.dropped_batches = 0
+
+        self._pending = []
+        self._pending_size = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._file = open(file_path, 'w', encoding='utf-8')
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, text):
+        self._pending.append(text)
+        self._pending_size += len(text)
+        if self._pending_size >= self.batch_size:
+            self._submit()
+
+    def _submit(self):
+        if not self._pending:
+            return
+        batch = ''.join(self._pending)
+        self._pending = []
+        self._pending_size = 0
+        try:
+            self._queue.put_nowait(batch)
+        except queue.Full:
+            # The disk is behind: drop the batch rather than stall the simulation
+            self.dropped_batches += 1
+
+    def flush(self):
+        self._submit()
+
+    def _run(self):
+        while True:
+            batch = self._queue.get()
+            if batch is None:
+                break
+            self._file.write(batch)
+        self._file.flush()
+
+    def close(self):
+        self._submit()
+        if self.dropped_batches:
+            self._queue.put(f"\n[log writer dropped {self.dropped_batches} batches]\n")
+        self._queue.put(None)
+        self._thread.join()
+        self._file.close()
@@ -0,0 +1,98 @@
+import bisect
+
+import numpy as np
+
+
+class PiecewiseSchedule:
+    """Piecewise-constant values given as (start_time, value) steps, repeating every period"""
+
+    def __init__(self, steps, period=1440):
+        steps = sorted(steps)
+        self.starts = [float(start) for start, _ in steps]
+        self.values = [value for _, value in steps]
+        self.period = float(period)
+
+        if not steps or self.starts[0] != 0:
+            raise ValueError("schedule must start at time 0")
+        if len(set(self.starts)) != len(self.starts) or self.starts[-1] >= self.period:
+            raise ValueError("schedule steps must be distinct and fall inside one period")
+
+    def value_at(self, time):
+        offset = time % self.period
+        return self.values[bisect.bisect_right(self.starts, offset) - 1]
+
+    def change(self, index):
+        # The index-th step start counted across periods, as (time, value)
+        cycle, step = divmod(index, len(self.starts))
+        return cycle * self.period + self.starts[step], self.values[step]
+
+    def changes(self):
+        # Endless (time, value) sequence of step starts, period after period
+        index = 0
+        while True:
+            yield self.change(index)
+            index += 1
+
+
+class ArrivalRateSchedule(PiecewiseSchedule):
+    """Arrival rates (patients per minute) with cumulative-rate tables for inversion
+
+    An arrival process with cumulative rate L(t) is a unit-rate process run on the
+    clock L: the next arrival after t is L^-1(L(t) + E) for a unit-mean gap E.
+    """
+
+    def __init__(self, steps, period=1440):
+        super().__init__(steps, period)
+        rates = np.array(self.values, dtype=float)
+        if (rates < 0).any():
+            raise ValueError("arrival rates must be non-negative")
+
+        widths = np.diff(np.append(self.starts, self.period))
+        self.rates = rates
+        self.cumulative_starts = np.concatenate([[0.0], np.cumsum(rates * widths)[:-1]])
+        self.total = float((rates * widths).sum())
+        if self.total <= 0:
+            raise ValueError("arrival rate schedule has no arrivals")
+
+        self._starts_array = np.array(self.starts)
+        self._rates = rates.tolist()
+        self._cumulative = self.cumulative_starts.tolist()
+
+    def cumulative_at(self, time):
+        cycles, offset = divmod(time, self.period)
+        k = bisect.bisect_right(self.starts, offset) - 1
+        return cycles * self.total + self._cumulative[k] + self._rates[k] * (offset - self.starts[k])
+
+    def time_at(self, cumulative):
+        # Searching the cumulative table with bisect_right skips zero-rate steps,
+        # whose cumulative value equals that of the next step
+        cycles, remainder = divmod(cumulative, self.total)
+        k = bisect.bisect_right(self._cumulative, remainder) - 1
+        return cycles * self.period + self.starts[k] + (remainder - self._cumulative[k]) / self._rates[k]
+
+    def cumulative(self, times):
+        cycles, offset = np.divmod(np.asarray(times, dtype=float), self.period)
+        k = np.searchsorted(self._starts_array, offset, side='right') - 1
+        return cycles * self.total + self.cumulative_starts[k] + self.rates[k] * (offset - self._starts_array[k])
+
+    def times(self, cumulative):
+        cycles, remainder = np.divmod(np.asarray(cumulative, dtype=float), self.total)
+        k = np.searchsorted(self.cumulative_starts, remainder, side='right') - 1
+        return cycles * self.period + self._starts_array[k] + (remainder - self.cumulative_starts[k]) / self.rates[k]
+
+
+def arrival_rate_schedule(settings):
+    steps = getattr(settings, 'ARRIVAL_RATE_SCHEDULE', None)
+    if not steps:
+        return None
+    return ArrivalRateSchedule(steps, getattr(settings, 'SCHEDULE_PERIOD', 1440))
+
+
+def staffing_schedule(settings):
+    steps = getattr(settings, 'STAFFING_SCHEDULE', None)
+    if not steps:
+        return None
+    schedule = PiecewiseSchedule(steps, getattr(settings, 'SCHEDULE_PERIOD', 1440))
+    if any(not 0 <= count <= settings.NUMBER_OF_COUNTERS for count in schedule.values):
+        raise ValueError("staffed counters must be between 0 and NUMBER_OF_COUNTERS")
+    return schedule
@@ -0,0 +1,77 @@
+import bisect
+
+import numpy as np
+
+
+class StationNetwork:
+    """Named service stations and the routing between them
+
+    Patients enter at the first station. After each service they move to the next station
+    drawn from its routing table, and leave once the leftover probability is drawn.
+    Stations are referred to by index everywhere else.
+    """
+
+    def __init__(self, stations, settings):
+        self.names = list(stations)
+        if not self.names:
+            raise ValueError("STATIONS must name at least one station")
+        index = {name: i for i, name in enumerate(self.names)}
+
+        self.counters = []
+        self.service = []
+        self.cumulative = []
+        self.destinations = []
+        for name, spec in stations.items():
+            counters = spec.get('counters', settings.NUMBER_OF_COUNTERS)
+            if counters < 1:
+                raise ValueError(f"Station {name} needs at least one counter")
+            self.counters.append(counters)
+            self.service.append((spec.get('distribution', settings.SERVICE_TIME_DISTRIBUTION),
+                                 spec.get('service_mean', settings.SERVICE_TIME_MEAN),
+                                 spec.get('service_std', settings.SERVICE_TIME_STD)))
+
+            routes = spec.get('routes') or {}
+            unknown = set(routes) - set(index)
+            if unknown:
+                raise ValueError(f"Station {name} routes to unknown stations: {sorted(unknown)}")
+            probabilities = np.array(list(routes.values()), dtype=float)
+            if (probabilities < 0).any() or probabilities.sum() > 1 + 1e-9:
+                raise ValueError(f"Routing probabilities of station {name} must be >= 0 and sum to at most 1")
+
+            # Cumulative probabilities are searched once per service; past the last one the patient leaves
+            cumulative = np.cumsum(probabilities)
+            if len(cumulative) and cumulative[-1] > 1 - 1e-9:
+                cumulative[-1] = 1.0
+            self.cumulative.append(cumulative.tolist())
+            self.destinations.append([index[target] for target in routes])
+
+    def __len__(self):
+        return len(self.names)
+
+    def route(self, station, uniform):
+        # Next station index for a uniform draw on (0, 1), or None to leave the system
+        k = bisect.bisect_right(self.cumulative[station], uniform)
+        destinations = self.destinations[station]
+        return destinations[k] if k < len(destinations) else None
+
+    def station_settings(self, settings, station):
+        # The run's settings with this station's counters and service distribution
+        distribution, mean, std = self.service[station]
+        return type(settings).from_dict({
+            **settings.to_dict(),
+            'NUMBER_OF_COUNTERS': self.counters[station],
+            'SERVICE_TIME_DISTRIBUTION': distribution,
+            'SERVICE_TIME_MEAN': mean,
+            'SERVICE_TIME_STD': std
+        })
+
+    def station_seed(self, settings, station):
+        # Each station draws service and routing variates from its own seed, derived from the run's
+        return (np.random.SeedSequence(settings.RANDOM_SEED).entropy, station + 1)
+
+
+def station_network(settings):
+    stations = getattr(settings, 'STATIONS', None)
+    if not stations:
+        return None
+    return StationNetwork(stations, settings)
@@ -0,0 +1,64 @@
+import numpy as np
+
+
+class TriageClasses:
+    """Patient priority classes, highest priority first, and the counters allowed to serve each
+
+    Classes are referred to by index everywhere else: 0 is the most urgent.
+    """
+
+    def __init__(self, classes, counter_classes=None, number_of_counters=1):
+        names = [name for name, _ in classes]
+        shares = np.array([share for _, share in classes], dtype=float)
+        if not names or len(set(names)) != len(names):
+            raise ValueError("patient classes must have distinct names")
+        if (shares <= 0).any():
+            raise ValueError("patient class shares must be positive")
+
+        self.names = names
+        self.shares = shares / shares.sum()
+        self.cumulative = np.cumsum(self.shares)
+        self.cumulative[-1] = 1.0
+
+        # Class indices each counter may serve, in priority order; unlisted counters serve all
+        index = {name: i for i, name in enumerate(names)}
+        counter_classes = {int(counter_id): allowed for counter_id, allowed in (counter_classes or {}).items()}
+        self.counter_classes = {}
+        for counter_id in range(1, number_of_counters + 1):
+            allowed = counter_classes.get(counter_id)
+            if allowed is None:
+                self.counter_classes[counter_id] = tuple(range(len(names)))
+                continue
+            unknown = set(allowed) - set(index)
+            if unknown:
+                raise ValueError(f"Unknown patient classes for counter {counter_id}: {sorted(unknown)}")
+            self.counter_classes[counter_id] = tuple(sorted(index[name] for name in allowed))
+
+        unknown_counters = set(counter_classes) - set(self.counter_classes)
+        if unknown_counters:
+            raise ValueError(f"COUNTER_CLASSES names unknown counters: {sorted(unknown_counters)}")
+        served = set().union(*self.counter_classes.values())
+        if len(served) < len(names):
+            missing = [names[i] for i in range(len(names)) if i not in served]
+            raise ValueError(f"No counter serves patient classes: {missing}")
+
+    @property
+    def restricted(self):
+        return any(len(allowed) < len(self.names) for allowed in self.counter_classes.values())
+
+    def classes_of(self, uniforms):
+        return np.searchsorted(self.cumulative, uniforms, side='right')
+
+
+def triage_classes(settings):
+    classes = getattr(settings, 'PATIENT_CLASSES', None)
+    if not classes:
+        if getattr(settings, 'COUNTER_CLASSES', None):
+            raise ValueError("COUNTER_CLASSES needs PATIENT_CLASSES")
+        return None
+    return TriageClasses(classes, getattr(settings, 'COUNTER_CLASSES', None), settings.NUMBER_OF_COUNTERS)
+
+
+def class_names(settings):
+    triage = triage_classes(settings)
+    return triage.names if triage is not None else None